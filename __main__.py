@@ -1,10 +1,28 @@
-from interpreter.interpreter.interpreter import Interpreter
+from interpreter.interpreter.interpreter import Interpreter, ENGINES
+from interpreter.interpreter.memory import STACK_SIZE
+from interpreter.interpreter.memo import MEMO_SIZE
+from interpreter.utils.output import BUFFER_SIZE
+from interpreter.utils import registry
 import argparse
 
 
 parser = argparse.ArgumentParser(description='Execute .c file')
 parser.add_argument('-f', '--file', help='File with C code')
 parser.add_argument('-c', '--code', help='Code of C code')
+parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default='tree', help='Execution engine')
+parser.add_argument('-O', dest='level', type=int, choices=(0, 1, 2), default=0, help='Optimization level')
+parser.add_argument('-v', '--verbose', action='store_true', help='Report what the optimizations changed')
+parser.add_argument('-s', '--stack-size', type=int, default=STACK_SIZE, help='Stack size in variables')
+parser.add_argument(
+    '-m', '--memoize', type=int, nargs='?', const=MEMO_SIZE, default=0, metavar='SIZE',
+    help='Remember up to SIZE results of every pure function'
+)
+parser.add_argument('-o', '--output', type=argparse.FileType('wb'), help='File receiving output of the program')
+parser.add_argument('-b', '--buffer-size', type=int, default=BUFFER_SIZE, help='Output buffer size in characters')
+parser.add_argument(
+    '-I', dest='include', action='append', default=[], metavar='DIR',
+    help='Directory searched for extension libraries, name.py for #include <name.h>'
+)
 
 args = parser.parse_args()
 if not args.file and not args.code:
@@ -13,10 +31,16 @@ if not args.file and not args.code:
 elif args.file and args.code:
     argparse.ArgumentParser().error('You can choose only one argument [-f or -c]')
 
-code = ''
+# searched before the directories of SCI_PATH
+registry.PATH[:0] = args.include
+
 if args.file:
-    with open(args.file, 'r') as file:
-        code = file.read()
+    # source is lexed straight from the file, chunk by chunk
+    with open(args.file, 'rb') as file:
+        Interpreter.run(
+            file, args.engine, args.level, args.verbose, args.stack_size, args.memoize, args.output, args.buffer_size
+        )
 else:
-    code = args.code
-Interpreter.run(code)
+    Interpreter.run(
+        args.code, args.engine, args.level, args.verbose, args.stack_size, args.memoize, args.output, args.buffer_size
+    )
@@ -0,0 +1,67 @@
+###############################################################################
+#  Engine benchmark - execution time of every engine on the same programs.    #
+#                                                                             #
+#  Programs are parsed and analyzed once, only `interpret` is measured (it    #
+#  includes compiling for the compiling engines). Output is discarded.        #
+#  Run from the repository root:                                              #
+#      $ python -m benchmarks.bench_engines [-e ENGINE ...] [file.c ...]      #
+#                                                                             #
+###############################################################################
+import argparse
+import contextlib
+import glob
+import io
+import sys
+
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.optimization.optimizer import Optimizer
+from interpreter.interpreter.interpreter import ENGINES
+from benchmarks.bench_lexer import best_of
+
+# Standard input the bundled examples read
+INPUTS = {
+    'example1.c': '12345\n987\n0\n',
+    'example2.c': 'a1b22c3x4\n',
+    'example3.c': '60\n',
+}
+
+
+def analyze(fname, level):
+    with open(fname, 'r') as file:
+        tree = Parser(RegexLexer(file.read())).parse()
+    with contextlib.redirect_stdout(io.StringIO()):
+        SemanticAnalyzer.analyze(tree)
+        return Optimizer.optimize(tree, level)
+
+
+def interpret(engine, tree, stdin):
+    sys.stdin = io.StringIO(stdin)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine().interpret(tree)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compare execution engines.')
+    argparser.add_argument('files', nargs='*', help='C source files (default: bundled examples)')
+    argparser.add_argument('-e', '--engines', nargs='+', choices=sorted(ENGINES), default=list(ENGINES))
+    argparser.add_argument('-r', '--runs', type=int, default=5, help='Best of how many runs is reported')
+    argparser.add_argument('-O', dest='level', type=int, choices=(0, 1, 2), default=0, help='Optimization level')
+    args = argparser.parse_args()
+
+    stdin = sys.stdin
+    print('{:<14}'.format('program') + ''.join('{:>12}'.format(engine) for engine in args.engines))
+    for fname in args.files or sorted(glob.glob('example*.c')):
+        tree = analyze(fname, args.level)
+        timings = []
+        for engine in args.engines:
+            _, elapsed = best_of(args.runs, interpret, ENGINES[engine], tree, INPUTS.get(fname, ''))
+            timings.append(elapsed)
+        sys.stdin = stdin
+        print('{:<14}'.format(fname) + ''.join('{:>10.2f}ms'.format(elapsed * 1000) for elapsed in timings))
+        print('{:<14}'.format('  speedup') + ''.join('{:>11.1f}x'.format(timings[0] / elapsed) for elapsed in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+###############################################################################
+#  Lexer benchmark - compares tokens/sec of `Lexer` and `RegexLexer`.         #
+#                                                                             #
+#  Run from the repository root:                                              #
+#      $ python -m benchmarks.bench_lexer [-n STATEMENTS] [file.c ...]        #
+#                                                                             #
+###############################################################################
+import argparse
+import time
+
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.lexical_analysis.token_type import EOF
+
+STATEMENT = """    /* step {i} */
+    total = total + counter{i} * 1234 - (other / 7.5);
+    if (total >= 100000 && counter{i} != 'x') {{ total -= 99991; }}  // keep it small
+"""
+
+
+def generate_source(statements):
+    """ Large generated program, similar to machine generated inputs """
+    return 'int main(){\n' + ''.join(STATEMENT.format(i=i) for i in range(statements)) + '    return 0;\n}\n'
+
+
+def lex_with_property(lexer_class, text):
+    lexer = lexer_class(text)
+    count = 0
+    while lexer.get_next_token.type != EOF:
+        count += 1
+    return count
+
+
+def lex_with_generator(lexer_class, text):
+    return sum(1 for _ in lexer_class(text).tokens()) - 1
+
+
+def best_of(runs, function, *args):
+    """ Return result of the function and the best time of all runs """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compare lexer throughput.')
+    argparser.add_argument('files', nargs='*', help='C source files (default: generated program)')
+    argparser.add_argument('-n', '--statements', type=int, default=10000, help='Size of generated program')
+    argparser.add_argument('-r', '--runs', type=int, default=5, help='Best of how many runs is reported')
+    args = argparser.parse_args()
+
+    if args.files:
+        text = '\n'.join(open(fname, 'r').read() for fname in args.files)
+    else:
+        text = generate_source(args.statements)
+    print('Source: {} chars, {} lines'.format(len(text), text.count('\n')))
+
+    baseline = None
+    for name, function, lexer_class in (
+        ('Lexer', lex_with_property, Lexer),
+        ('RegexLexer', lex_with_property, RegexLexer),
+        ('RegexLexer.tokens()', lex_with_generator, RegexLexer),
+    ):
+        count, elapsed = best_of(args.runs, function, lexer_class, text)
+        baseline = baseline or elapsed
+        print('{:<20} {:>9} tokens {:>8.3f}s {:>12.0f} tokens/sec {:>6.1f}x'.format(
+            name, count, elapsed, count / elapsed, baseline / elapsed
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+###############################################################################
+#  Parser benchmark - parse throughput on expression heavy programs.          #
+#                                                                             #
+#  Tokens are read in advance into `CompactTokens`, so only parsing is        #
+#  measured. Run from the repository root:                                    #
+#      $ python -m benchmarks.bench_parser [-n STATEMENTS] [file.c ...]       #
+#                                                                             #
+###############################################################################
+import argparse
+
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.lexical_analysis.compact import CompactTokens
+from interpreter.syntax_analysis.parser import Parser
+from benchmarks.bench_lexer import best_of
+
+STATEMENT = """    a = b * {i} + c / (d - 3) % 7 - e * f + g;
+    b = (a < b) == (c >= d) || e && f != 0 | g ^ h & 1;
+    c = -a + !b * (double)c - d-- + ++e;
+    d = a > b ? c + 1 : d - 1;
+    e = f(a + b, c * d, e - 1);
+"""
+
+
+def generate_source(statements):
+    """ Program made mostly of binary expressions """
+    return 'int f(int a, int b, int c){ return a; }\nint main(){\n    int a, b, c, d, e, g, h;\n' + \
+        ''.join(STATEMENT.format(i=i) for i in range(statements)) + '    return 0;\n}\n'
+
+
+def parse(tokens):
+    return Parser(tokens.reader()).parse()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measure parser throughput.')
+    argparser.add_argument('files', nargs='*', help='C source files (default: generated program)')
+    argparser.add_argument('-n', '--statements', type=int, default=2000, help='Size of generated program')
+    argparser.add_argument('-r', '--runs', type=int, default=5, help='Best of how many runs is reported')
+    args = argparser.parse_args()
+
+    if args.files:
+        text = '\n'.join(open(fname, 'r').read() for fname in args.files)
+    else:
+        text = generate_source(args.statements)
+    tokens = CompactTokens.from_lexer(RegexLexer(text))
+    lines = text.count('\n')
+
+    _, elapsed = best_of(args.runs, parse, tokens)
+    print('{} tokens, {} lines parsed in {:.3f}s: {:.0f} tokens/sec, {:.0f} lines/sec'.format(
+        len(tokens), lines, elapsed, len(tokens) / elapsed, lines / elapsed
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+###############################################################################
+#  Token memory benchmark - bytes per token of a list of `Token` objects      #
+#  compared with `CompactTokens` parallel arrays.                             #
+#                                                                             #
+#  Run from the repository root:                                              #
+#      $ python -m benchmarks.bench_tokens [-n STATEMENTS] [file.c ...]       #
+#                                                                             #
+###############################################################################
+import argparse
+import tracemalloc
+
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.lexical_analysis.compact import CompactTokens
+from interpreter.lexical_analysis.token_type import EOF
+from benchmarks.bench_lexer import generate_source
+
+
+def token_list(text):
+    lexer = Lexer(text)
+    tokens = []
+    while True:
+        token = lexer.get_next_token
+        tokens.append((token, lexer.line))
+        if token.type == EOF:
+            return tokens
+
+
+def compact_tokens(text):
+    return CompactTokens.from_lexer(Lexer(text))
+
+
+def measure(function, text):
+    """ Return number of tokens and bytes still allocated by the result """
+    tracemalloc.start()
+    result = function(text)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(result), size
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compare memory used by token streams.')
+    argparser.add_argument('files', nargs='*', help='C source files (default: generated program)')
+    argparser.add_argument('-n', '--statements', type=int, default=10000, help='Size of generated program')
+    args = argparser.parse_args()
+
+    if args.files:
+        text = '\n'.join(open(fname, 'r').read() for fname in args.files)
+    else:
+        text = generate_source(args.statements)
+
+    for name, function in (('list of Token', token_list), ('CompactTokens', compact_tokens)):
+        count, size = measure(function, text)
+        print('{:<15} {:>9} tokens {:>12} bytes {:>8.1f} bytes/token'.format(name, count, size, size / count))
+
+
+if __name__ == '__main__':
+    main()
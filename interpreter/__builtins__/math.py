@@ -1,10 +1,211 @@
 """
-This module file supports basic functions from math.h library
+This module file supports functions from math.h library
 """
 
 from ..utils.utils import definition
 import math
 
-@definition(return_type='double', arg_types=['double'])
+# Functions are called as `native`, the function of the math module, when it computes the same
+# result for float arguments; engines convert int arguments to double before the call.
+# Domain and range errors stop the program instead of returning NaN or HUGE_VAL.
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.sqrt)
 def sqrt(a):
-    return math.sqrt(a)
\ No newline at end of file
+    return math.sqrt(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=getattr(math, 'cbrt', None))
+def cbrt(a):
+    return math.copysign(abs(a) ** (1 / 3), a)
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True, native=math.pow)
+def pow(a, b):
+    return math.pow(a, b)
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True, native=math.hypot)
+def hypot(a, b):
+    return math.hypot(a, b)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.exp)
+def exp(a):
+    return math.exp(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=getattr(math, 'exp2', None))
+def exp2(a):
+    return 2.0 ** a
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.expm1)
+def expm1(a):
+    return math.expm1(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.log)
+def log(a):
+    return math.log(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.log10)
+def log10(a):
+    return math.log10(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.log2)
+def log2(a):
+    return math.log2(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.log1p)
+def log1p(a):
+    return math.log1p(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.sin)
+def sin(a):
+    return math.sin(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.cos)
+def cos(a):
+    return math.cos(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.tan)
+def tan(a):
+    return math.tan(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.asin)
+def asin(a):
+    return math.asin(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.acos)
+def acos(a):
+    return math.acos(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.atan)
+def atan(a):
+    return math.atan(a)
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True, native=math.atan2)
+def atan2(a, b):
+    return math.atan2(a, b)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.sinh)
+def sinh(a):
+    return math.sinh(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.cosh)
+def cosh(a):
+    return math.cosh(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.tanh)
+def tanh(a):
+    return math.tanh(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.asinh)
+def asinh(a):
+    return math.asinh(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.acosh)
+def acosh(a):
+    return math.acosh(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.atanh)
+def atanh(a):
+    return math.atanh(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.fabs)
+def fabs(a):
+    return math.fabs(a)
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True, native=math.fmod)
+def fmod(a, b):
+    return math.fmod(a, b)
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True, native=math.copysign)
+def copysign(a, b):
+    return math.copysign(a, b)
+
+
+@definition(return_type='double', arg_types=['double', 'int'], pure=True, native=math.ldexp)
+def ldexp(a, exponent):
+    return math.ldexp(a, exponent)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.erf)
+def erf(a):
+    return math.erf(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.erfc)
+def erfc(a):
+    return math.erfc(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.gamma)
+def tgamma(a):
+    return math.gamma(a)
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native=math.lgamma)
+def lgamma(a):
+    return math.lgamma(a)
+
+
+# math.floor, ceil and trunc give an int, C gives a double
+
+@definition(return_type='double', arg_types=['double'], pure=True)
+def floor(a):
+    return float(math.floor(a))
+
+
+@definition(return_type='double', arg_types=['double'], pure=True)
+def ceil(a):
+    return float(math.ceil(a))
+
+
+@definition(return_type='double', arg_types=['double'], pure=True)
+def trunc(a):
+    return float(math.trunc(a))
+
+
+@definition(return_type='double', arg_types=['double'], pure=True)
+def round(a):
+    """ Halfway cases away from zero, unlike Python's round """
+    whole = math.floor(abs(a))
+    return math.copysign(whole + 1.0 if abs(a) - whole >= 0.5 else float(whole), a)
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True)
+def fmin(a, b):
+    """ The other argument if one is NaN """
+    return b if a != a or b < a else a
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True)
+def fmax(a, b):
+    """ The other argument if one is NaN """
+    return b if a != a or b > a else a
+
+
+@definition(return_type='double', arg_types=['double', 'double'], pure=True)
+def fdim(a, b):
+    return a - b if a > b else 0.0
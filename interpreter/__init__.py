@@ -2,5 +2,6 @@ from . import utils
 from . import lexical_analysis
 from . import syntax_analysis
 from . import semantic_analysis
+from . import optimization
 
 
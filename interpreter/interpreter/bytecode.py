@@ -0,0 +1,433 @@
+""" SCI - Simple C Interpreter """
+import operator
+
+from .number import *
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.table import GLOBAL_FRAME
+from ..utils.registry import library
+
+###############################################################################
+#                                                                             #
+#  OPCODES                                                                    #
+#                                                                             #
+###############################################################################
+
+OPNAMES = (
+    'LOAD_LOCAL',               # push values[arg]
+    'LOAD_GLOBAL',              # push globals[arg]
+    'LOAD_CONST',               # push arg
+    'STORE_LOCAL',              # values[arg] = pop()
+    'STORE_GLOBAL',             # globals[arg] = pop()
+    'BINARY',                   # right = pop(); top = arg(top, right)
+    'UNARY',                    # top = arg(top)
+    'JUMP',                     # pc = arg
+    'JUMP_IF_FALSE',            # if not pop(): pc = arg
+    'JUMP_IF_TRUE',             # if pop(): pc = arg
+    'JUMP_IF_FALSE_OR_POP',     # if not top: pc = arg else pop()
+    'JUMP_IF_TRUE_OR_POP',      # if top: pc = arg else pop()
+    'DUP',                      # push(top)
+    'POP',                      # pop()
+    'CALL',                     # arg = (code, argc), push result of the call
+    'CALL_BUILTIN',             # arg = (function, argc), push result of the call
+    'RETURN',                   # return pop()
+    'TAIL_CALL',                # arg = (code, argc), replace the frame by the frame of the call
+    'CALL_PURE',                # arg = (code, argc, cache), push the remembered result or call and remember it
+    'STORE_RESULT',             # arg = (cache, key), remember the result on the top and return to the caller
+    # superinstructions, fused by the compiler from the most frequent sequences
+    'BINARY_LOCALS',            # arg = (slot, slot, function), push(function(values[slot], values[slot]))
+    'BINARY_LOCAL_CONST',       # arg = (slot, const, function), push(function(values[slot], const))
+    'INPLACE_LOCAL_CONST',      # arg = (slot, const, function), values[slot] = function(values[slot], const)
+)
+
+(LOAD_LOCAL, LOAD_GLOBAL, LOAD_CONST, STORE_LOCAL, STORE_GLOBAL, BINARY, UNARY,
+ JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP,
+ DUP, POP, CALL, CALL_BUILTIN, RETURN, TAIL_CALL, CALL_PURE, STORE_RESULT,
+ BINARY_LOCALS, BINARY_LOCAL_CONST, INPLACE_LOCAL_CONST) = range(len(OPNAMES))
+
+# Nodes leaving a value on the stack
+EXPRESSIONS = (Num, String, Var, BinOp, UnOp, TerOp, Assign, Expression, FunctionCall)
+
+
+class CompileError(Exception):
+    pass
+
+
+def tested(tree):
+    """ Comparisons and negations of the tree whose value is only tested for truth: conditions of
+    statements and of ?:, operands of &&, || and !. Engines compute them with `TESTS`, a Python bool
+    is cheaper than 0 or 1 there. """
+    tests = set()
+    for node in walk(tree):
+        if isinstance(node, (IfStmt, WhileStmt, DoWhileStmt, ForStmt, TerOp)):
+            children = (node.condition, )
+        elif isinstance(node, BinOp) and node.op.type in (LOG_AND_OP, LOG_OR_OP):
+            children = (node.left, node.right)
+        elif isinstance(node, UnOp) and node.op.type == LOG_NEG:
+            children = (node.expr, )
+        else:
+            continue
+        for child in children:
+            while isinstance(child, Expression):
+                child = child.children[-1]
+            if isinstance(child, (BinOp, UnOp)) and child.op.type in TESTS:
+                tests.add(child)
+    return tests
+
+
+def bind(builtin, node):
+    """ Bind the builtin (`registry.Signature`) to the call `node`, once per call site: return the function
+    to call, the argument nodes it takes and the conversion of every argument to the type of its parameter,
+    None where none is needed. A builtin specialized for a string literal first argument, e.g. printf
+    translating its format, takes the other arguments. """
+    args = node.args
+    if builtin.specialize is not None and args and isinstance(args[0], String):
+        return builtin.specialize(args[0].value, len(args) - 1), args[1:], [None] * (len(args) - 1)
+    if builtin.arg_types is None:
+        return builtin.function, args, [None] * len(args)
+    return builtin.function, args, [conversion(ctype, arg.ctype) for ctype, arg in zip(builtin.arg_types, args)]
+
+
+class Code(object):
+    """ Compiled function.
+    Instruction `i` is the opcode `ops[i]` with the operand `args[i]`, jump operands
+    are indexes of the target instruction. """
+
+    def __init__(self, name, frame_size=0, arg_types=(), pure=False):
+        self.name = name
+        self.frame_size = frame_size
+        self.arg_types = arg_types      # C types of the parameters
+        self.pure = pure                # result depends only on the arguments, see `FunctionDecl.pure`
+        self.ops = []
+        self.args = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __repr__(self):
+        lines = ['Code: {} (frame size {})'.format(self.name, self.frame_size)]
+        for i, (op, arg) in enumerate(zip(self.ops, self.args)):
+            if op in (CALL, CALL_BUILTIN, TAIL_CALL, CALL_PURE):
+                arg = '{} argc={}'.format(getattr(arg[0], 'name', None) or arg[0].__name__, arg[1])
+            elif op in (BINARY, UNARY):
+                arg = arg.__name__
+            elif op in (BINARY_LOCALS, BINARY_LOCAL_CONST, INPLACE_LOCAL_CONST):
+                arg = '{} {} {}'.format(arg[0], arg[1], arg[2].__name__)
+            lines.append('{:>5} {:<22}{}'.format(i, OPNAMES[op], '' if arg is None else arg))
+        return '\n'.join(lines)
+
+
+###############################################################################
+#                                                                             #
+#  COMPILER                                                                   #
+#                                                                             #
+###############################################################################
+
+class Compiler(NodeVisitor):
+    """ Compile analyzed AST to bytecode.
+    Expression nodes leave exactly one value on the stack, statements leave none. """
+
+    def __init__(self, memo=None):
+        self.code = None
+        self.memo = memo            # calls of pure functions look their results up in `memo.Memo`
+        self.barrier = 0            # last position of self.code a jump can land on
+        self.functions = dict()     # function name -> Code or builtin function
+        self.loops = []             # (break jumps, continue jumps) of enclosing loops
+        self.return_type = None     # C type of the compiled function
+        self.tested = set()         # comparisons and negations computed as Python bool, see `tested`
+
+    def error(self, message):
+        raise CompileError(message)
+
+    def emit(self, op, arg=None):
+        """ Append instruction and return its position.
+        Instruction is fused with the preceding ones, unless a jump lands among them. """
+        ops, args = self.code.ops, self.code.args
+        start = len(ops) - 2
+        if op == BINARY and start >= self.barrier and ops[start] == LOAD_LOCAL:
+            if ops[start + 1] in (LOAD_LOCAL, LOAD_CONST):
+                op = BINARY_LOCALS if ops[start + 1] == LOAD_LOCAL else BINARY_LOCAL_CONST
+                arg = (args[start], args[start + 1], arg)
+                del ops[start:], args[start:]
+        elif op == STORE_LOCAL and start + 1 >= self.barrier and ops and ops[-1] == BINARY_LOCAL_CONST:
+            if args[-1][0] == arg:
+                op, arg = INPLACE_LOCAL_CONST, args[-1]
+                del ops[-1], args[-1]
+        ops.append(op)
+        args.append(arg)
+        return len(ops) - 1
+
+    def label(self):
+        """ Position of the next instruction, it becomes a jump target """
+        self.barrier = len(self.code.ops)
+        return self.barrier
+
+    def begin(self, code):
+        """ Start emitting instructions to `code` """
+        self.code = code
+        self.barrier = 0
+
+    def patch(self, position, target=None):
+        """ Point jump at `position` to `target`, by default to the next instruction """
+        self.code.args[position] = self.label() if target is None else target
+
+    def statement(self, node):
+        """ Compile node whose value is not used """
+        if isinstance(node, Expression):
+            for child in node.children:
+                self.statement(child)
+        elif isinstance(node, Assign):
+            self.assign(node, keep=False)
+        elif isinstance(node, UnOp) and node.op.type in (INC_OP, DEC_OP):
+            self.increment(node, keep=False)
+        elif isinstance(node, EXPRESSIONS):
+            self.visit(node)
+            self.emit(POP)
+        elif not isinstance(node, NoOp):
+            self.visit(node)
+
+    def convert(self, function):
+        """ Convert the value on the top of the stack, if a conversion is needed """
+        if function is not None:
+            self.emit(UNARY, function)
+
+    def load(self, var):
+        self.emit(LOAD_GLOBAL if var.frame == GLOBAL_FRAME else LOAD_LOCAL, var.slot)
+
+    def store(self, var):
+        self.emit(STORE_GLOBAL if var.frame == GLOBAL_FRAME else STORE_LOCAL, var.slot)
+
+    def visit_Program(self, node):
+        for child in filter(lambda o: isinstance(o, IncludeLibrary), node.children):
+            self.visit(child)
+        for child in filter(lambda o: isinstance(o, FunctionDecl), node.children):
+            self.functions[child.func_name] = Code(
+                child.func_name, child.frame_size, [param.type_node.value for param in child.params], child.pure
+            )
+
+        self.begin(Code('GLOBAL_MEMORY', node.frame_size))
+        for child in filter(lambda o: not isinstance(o, (FunctionDecl, IncludeLibrary)), node.children):
+            self.statement(child)
+        self.emit(LOAD_CONST)
+        self.emit(RETURN)
+        code = self.code
+
+        for child in filter(lambda o: isinstance(o, FunctionDecl), node.children):
+            self.visit(child)
+        return code
+
+    def visit_IncludeLibrary(self, node):
+        self.functions.update(library(node.library_name).signatures)
+
+    def visit_FunctionDecl(self, node):
+        self.begin(self.functions[node.func_name])
+        self.return_type = node.type_node.value
+        self.visit(node.body)
+        self.emit(LOAD_CONST)
+        self.emit(RETURN)
+
+    def visit_FunctionBody(self, node):
+        for child in node.children:
+            self.statement(child)
+
+    def visit_CompoundStmt(self, node):
+        for child in node.children:
+            self.statement(child)
+
+    def visit_VarDecl(self, node):
+        """ Slot of the variable is preallocated with the frame """
+        pass
+
+    def visit_NoOp(self, node):
+        """ Empty expression, e.g. missing condition of the for loop """
+        self.emit(LOAD_CONST)
+
+    def visit_ReturnStmt(self, node):
+        expression = node.expression
+        while isinstance(expression, Expression) and len(expression.children) == 1:
+            expression = expression.children[0]
+        convert = conversion(self.return_type, node.expression.ctype)
+        if isinstance(expression, FunctionCall) and isinstance(self.functions[expression.name], Code) and \
+                convert is None and not self.memoized(self.functions[expression.name]):
+            # the callee returns the result of the caller, it can take the frame of the caller
+            self.call(expression)
+            self.emit(TAIL_CALL, (self.functions[expression.name], len(expression.args)))
+            return
+        self.visit(node.expression)
+        self.convert(convert)
+        self.emit(RETURN)
+
+    def visit_IfStmt(self, node):
+        self.visit(node.condition)
+        to_else = self.emit(JUMP_IF_FALSE)
+        self.statement(node.tbody)
+        if isinstance(node.fbody, NoOp):
+            self.patch(to_else)
+            return
+        to_end = self.emit(JUMP)
+        self.patch(to_else)
+        self.statement(node.fbody)
+        self.patch(to_end)
+
+    def loop(self, body, increment):
+        """ Body is placed before the condition, so an iteration executes a single jump.
+        `continue` jumps to the increment, `break` jumps behind the condition. """
+        self.loops.append(([], []))
+        start = self.label()
+        self.statement(body)
+        breaks, continues = self.loops.pop()
+        for jump in continues:
+            self.patch(jump)
+        if increment is not None:
+            self.statement(increment)
+        return start, breaks
+
+    def visit_WhileStmt(self, node):
+        to_condition = self.emit(JUMP)
+        start, breaks = self.loop(node.body, None)
+        self.patch(to_condition)
+        self.visit(node.condition)
+        self.emit(JUMP_IF_TRUE, start)
+        for jump in breaks:
+            self.patch(jump)
+
+    def visit_DoWhileStmt(self, node):
+        start, breaks = self.loop(node.body, None)
+        self.visit(node.condition)
+        self.emit(JUMP_IF_TRUE, start)
+        for jump in breaks:
+            self.patch(jump)
+
+    def visit_ForStmt(self, node):
+        self.statement(node.setup)
+        to_condition = self.emit(JUMP)
+        start, breaks = self.loop(node.body, node.increment)
+        self.patch(to_condition)
+        self.visit(node.condition)
+        self.emit(JUMP_IF_TRUE, start)
+        for jump in breaks:
+            self.patch(jump)
+
+    def visit_BreakStmt(self, node):
+        if not self.loops:
+            self.error("'break' statement not in loop at line {}".format(node.line))
+        self.loops[-1][0].append(self.emit(JUMP))
+
+    def visit_ContinueStmt(self, node):
+        if not self.loops:
+            self.error("'continue' statement not in loop at line {}".format(node.line))
+        self.loops[-1][1].append(self.emit(JUMP))
+
+    def visit_Expression(self, node):
+        for child in node.children[:-1]:
+            self.statement(child)
+        self.visit(node.children[-1])
+
+    def visit_Num(self, node):
+        self.emit(LOAD_CONST, node.value)
+
+    def visit_String(self, node):
+        self.emit(LOAD_CONST, node.value)
+
+    def visit_Var(self, node):
+        self.load(node)
+
+    def visit_Assign(self, node):
+        self.assign(node, keep=True)
+
+    def assign(self, node, keep):
+        """ Compile assignment, its value is left on the stack only if `keep` is set """
+        if node.op.type == ASSIGN:
+            self.visit(node.right)
+        elif node.op.type in COMPOUND_OPERATORS:
+            self.load(node.left)
+            self.visit(node.right)
+            self.emit(BINARY, OPERATORS[COMPOUND_OPERATORS[node.op.type], node.left.ctype, node.right.ctype])
+        else:
+            self.error("Unsupported assignment operator '{}' at line {}".format(node.op.value, node.line))
+        self.convert(assignment_conversion(node))
+        if keep:
+            self.emit(DUP)
+        self.store(node.left)
+
+    def visit_UnOp(self, node):
+        op = node.op.type
+        if op in (INC_OP, DEC_OP):
+            self.increment(node, keep=True)
+        elif not node.prefix:
+            self.visit(node.expr)
+        elif op == AND_OP:
+            self.emit(LOAD_CONST, (node.expr.frame, node.expr.slot))
+        elif op == ADD_OP:
+            self.visit(node.expr)
+        else:
+            self.visit(node.expr)
+            self.emit(UNARY, TESTS[op] if node in self.tested else UNARY_OPERATORS[op])
+
+    def increment(self, node, keep):
+        """ Compile ++ or --, value before (postfix) or after (prefix) is left on the stack if `keep` is set """
+        self.load(node.expr)
+        if keep and not node.prefix:
+            self.emit(DUP)
+        self.emit(LOAD_CONST, 1)
+        self.emit(BINARY, operator.add if node.op.type == INC_OP else operator.sub)
+        if keep and node.prefix:
+            self.emit(DUP)
+        self.store(node.expr)
+
+    def visit_BinOp(self, node):
+        op = node.op.type
+        if op in (LOG_AND_OP, LOG_OR_OP):
+            # the operand which decided is left on the stack and turned into 0 or 1
+            self.visit(node.left)
+            jump = self.emit(JUMP_IF_FALSE_OR_POP if op == LOG_AND_OP else JUMP_IF_TRUE_OR_POP)
+            self.visit(node.right)
+            self.patch(jump)
+            self.emit(UNARY, truth)
+        elif op in BINARY_OPERATORS:
+            self.visit(node.left)
+            self.visit(node.right)
+            self.emit(BINARY, TESTS[op] if node in self.tested else OPERATORS[op, node.left.ctype, node.right.ctype])
+        else:
+            self.error("Unsupported operator '{}' at line {}".format(node.op.value, node.line))
+
+    def visit_TerOp(self, node):
+        self.visit(node.condition)
+        to_else = self.emit(JUMP_IF_FALSE)
+        self.visit(node.texpression)
+        to_end = self.emit(JUMP)
+        self.patch(to_else)
+        self.visit(node.fexpression)
+        self.patch(to_end)
+
+    def call(self, node):
+        """ Compile arguments of the call, converted to the types of the parameters """
+        function = self.functions[node.name]
+        for i, arg in enumerate(node.args):
+            self.visit(arg)
+            if isinstance(function, Code):
+                self.convert(conversion(function.arg_types[i], arg.ctype))
+
+    def memoized(self, function):
+        """ Whether the results of the function are remembered """
+        return self.memo is not None and function.pure
+
+    def visit_FunctionCall(self, node):
+        function = self.functions[node.name]
+        if not isinstance(function, Code):
+            builtin, args, conversions = bind(function, node)
+            for arg, convert in zip(args, conversions):
+                self.visit(arg)
+                self.convert(convert)
+            self.emit(CALL_BUILTIN, (builtin, len(args)))
+            return
+        self.call(node)
+        if self.memoized(function):
+            self.emit(CALL_PURE, (function, len(node.args), self.memo.cache(function.name)))
+        else:
+            self.emit(CALL, (function, len(node.args)))
+
+    def compile(self, tree):
+        """ Compile program, return code initializing globals; functions are in `self.functions` """
+        self.tested = tested(tree)
+        return self.visit(tree)
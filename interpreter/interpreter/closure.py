@@ -0,0 +1,468 @@
+""" SCI - Simple C Interpreter """
+from .memory import Memory, STACK_SIZE
+from .number import *
+from .bytecode import EXPRESSIONS, CompileError, bind, tested
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.table import GLOBAL_FRAME
+from ..utils.output import stdout
+from ..utils.registry import library
+
+# Status returned by a statement, None means that execution goes on with the next statement
+BREAK, CONTINUE, RETURN = 1, 2, 3
+
+
+def skip(values):
+    """ Empty statement """
+    pass
+
+
+class Function(object):
+    """ User defined function, `body` is set once its declaration is compiled.
+    Frame of a call has one slot more than the function has variables, the last
+    slot receives the return value. """
+
+    def __init__(self, name, frame_size, arg_types, pure=False):
+        self.name = name
+        self.frame_size = frame_size
+        self.arg_types = arg_types
+        self.pure = pure
+        self.body = None
+
+
+class ClosureInterpreter(NodeVisitor):
+    """ Compile every node of the analyzed tree to a Python closure, once, and run the program
+    by calling them. Expression closures take slots of the current frame and return the value,
+    statement closures take the same slots and return None or BREAK, CONTINUE, RETURN status. """
+
+    def __init__(self, stack_size=STACK_SIZE, memo=None):
+        self.memory = None
+        self.stack_size = stack_size
+        self.memo = memo                # memo.Memo of the results of pure functions, None to call them always
+        self.globals = None             # slots of the global frame
+        self.functions = dict()         # function name -> Function or builtin function
+        self.return_slot = None         # slot receiving return value of the compiled function
+        self.return_type = None         # C type of the compiled function
+        self.tested = set()             # comparisons and negations computed as Python bool, see `bytecode.tested`
+
+    def error(self, message):
+        raise CompileError(message)
+
+    def statement(self, node):
+        """ Compile node whose value is not used """
+        if isinstance(node, Expression):
+            return self.block(node.children)
+        if isinstance(node, Assign):
+            return self.assign(node, keep=False)
+        if isinstance(node, UnOp) and node.op.type in (INC_OP, DEC_OP):
+            return self.increment(node, keep=False)
+        if isinstance(node, EXPRESSIONS):
+            return self.discard(self.visit(node))
+        if isinstance(node, (NoOp, VarDecl)):
+            return skip
+        return self.visit(node)
+
+    @staticmethod
+    def discard(expression):
+        """ Turn expression into a statement """
+        def statement(values):
+            expression(values)
+        return statement
+
+    @staticmethod
+    def convert(expression, function):
+        """ Apply conversion `function` to the value of expression """
+        def conversion(values):
+            return function(expression(values))
+        return conversion
+
+    def block(self, nodes):
+        statements = tuple(filter(lambda o: o is not skip, map(self.statement, nodes)))
+        if not statements:
+            return skip
+        if len(statements) == 1:
+            return statements[0]
+
+        def block(values):
+            for statement in statements:
+                status = statement(values)
+                if status:
+                    return status
+        return block
+
+    def visit_Program(self, node):
+        for child in filter(lambda o: isinstance(o, IncludeLibrary), node.children):
+            self.visit(child)
+        for child in filter(lambda o: isinstance(o, FunctionDecl), node.children):
+            self.functions[child.func_name] = Function(
+                child.func_name, child.frame_size, [param.type_node.value for param in child.params], child.pure
+            )
+
+        init = self.block(filter(lambda o: not isinstance(o, (FunctionDecl, IncludeLibrary)), node.children))
+        for child in filter(lambda o: isinstance(o, FunctionDecl), node.children):
+            self.visit(child)
+        return init
+
+    def visit_IncludeLibrary(self, node):
+        self.functions.update(library(node.library_name).signatures)
+
+    def visit_FunctionDecl(self, node):
+        self.return_slot, self.return_type = node.frame_size, node.type_node.value
+        self.functions[node.func_name].body = self.visit(node.body)
+
+    def visit_FunctionBody(self, node):
+        return self.block(node.children)
+
+    def visit_CompoundStmt(self, node):
+        return self.block(node.children)
+
+    def visit_ReturnStmt(self, node):
+        expression, slot = self.visit(node.expression), self.return_slot
+        convert = conversion(self.return_type, node.expression.ctype)
+        if convert is not None:
+            expression = self.convert(expression, convert)
+
+        def return_stmt(values):
+            values[slot] = expression(values)
+            return RETURN
+        return return_stmt
+
+    def visit_BreakStmt(self, node):
+        def break_stmt(values):
+            return BREAK
+        return break_stmt
+
+    def visit_ContinueStmt(self, node):
+        def continue_stmt(values):
+            return CONTINUE
+        return continue_stmt
+
+    def visit_IfStmt(self, node):
+        condition, tbody, fbody = self.visit(node.condition), self.statement(node.tbody), self.statement(node.fbody)
+        if fbody is skip:
+            def if_stmt(values):
+                if condition(values):
+                    return tbody(values)
+        else:
+            def if_stmt(values):
+                if condition(values):
+                    return tbody(values)
+                return fbody(values)
+        return if_stmt
+
+    def visit_WhileStmt(self, node):
+        condition, body = self.visit(node.condition), self.statement(node.body)
+
+        def while_stmt(values):
+            while condition(values):
+                status = body(values)
+                if status:
+                    if status == BREAK:
+                        break
+                    if status == RETURN:
+                        return status
+        return while_stmt
+
+    def visit_DoWhileStmt(self, node):
+        condition, body = self.visit(node.condition), self.statement(node.body)
+
+        def do_while_stmt(values):
+            while True:
+                status = body(values)
+                if status:
+                    if status == BREAK:
+                        break
+                    if status == RETURN:
+                        return status
+                if not condition(values):
+                    break
+        return do_while_stmt
+
+    def visit_ForStmt(self, node):
+        setup, condition = self.statement(node.setup), self.visit(node.condition)
+        increment, body = self.statement(node.increment), self.statement(node.body)
+
+        def for_stmt(values):
+            setup(values)
+            while condition(values):
+                status = body(values)
+                if status:
+                    if status == BREAK:
+                        break
+                    if status == RETURN:
+                        return status
+                increment(values)
+        return for_stmt
+
+    def visit_NoOp(self, node):
+        """ Empty expression, e.g. missing condition of the for loop """
+        def nothing(values):
+            return None
+        return nothing
+
+    def visit_Expression(self, node):
+        if len(node.children) == 1:
+            return self.visit(node.children[0])
+        statements, last = self.block(node.children[:-1]), self.visit(node.children[-1])
+
+        def expression(values):
+            statements(values)
+            return last(values)
+        return expression
+
+    def visit_Num(self, node):
+        value = node.value
+
+        def constant(values):
+            return value
+        return constant
+
+    def visit_String(self, node):
+        value = node.value
+
+        def string(values):
+            return value
+        return string
+
+    def visit_Var(self, node):
+        slot = node.slot
+        if node.frame == GLOBAL_FRAME:
+            frame = self.globals
+
+            def global_var(values):
+                return frame[slot]
+            return global_var
+
+        def local_var(values):
+            return values[slot]
+        return local_var
+
+    def visit_Assign(self, node):
+        return self.assign(node, keep=True)
+
+    def assign(self, node, keep):
+        """ Compile assignment, its closure returns the assigned value only if `keep` is set """
+        slot, right = node.left.slot, self.visit(node.right)
+        if node.op.type == ASSIGN:
+            function = None
+        elif node.op.type in COMPOUND_OPERATORS:
+            function = OPERATORS[COMPOUND_OPERATORS[node.op.type], node.left.ctype, node.right.ctype]
+        else:
+            self.error("Unsupported assignment operator '{}' at line {}".format(node.op.value, node.line))
+        convert = assignment_conversion(node)
+        if convert is not None:
+            if function is None:
+                right = self.convert(right, convert)
+            else:
+                function = self.convert_result(function, convert)
+
+        if node.left.frame == GLOBAL_FRAME:
+            frame = self.globals
+            if function is None:
+                def assign(values):
+                    frame[slot] = value = right(values)
+                    return value
+            else:
+                def assign(values):
+                    frame[slot] = value = function(frame[slot], right(values))
+                    return value
+            return assign if keep else self.discard(assign)
+
+        if function is None:
+            if keep:
+                def assign(values):
+                    values[slot] = value = right(values)
+                    return value
+            else:
+                def assign(values):
+                    values[slot] = right(values)
+        else:
+            if keep:
+                def assign(values):
+                    values[slot] = value = function(values[slot], right(values))
+                    return value
+            else:
+                def assign(values):
+                    values[slot] = function(values[slot], right(values))
+        return assign
+
+    @staticmethod
+    def convert_result(operation, function):
+        """ Apply conversion `function` to the result of binary `operation` """
+        def conversion(left, right):
+            return function(operation(left, right))
+        return conversion
+
+    def increment(self, node, keep):
+        """ Compile ++ or --, closure returns value before (postfix) or after (prefix) only if `keep` is set """
+        slot, step = node.expr.slot, 1 if node.op.type == INC_OP else -1
+
+        if node.expr.frame == GLOBAL_FRAME:
+            frame = self.globals
+            if node.prefix:
+                def increment(values):
+                    frame[slot] = value = frame[slot] + step
+                    return value
+            else:
+                def increment(values):
+                    value = frame[slot]
+                    frame[slot] = value + step
+                    return value
+            return increment if keep else self.discard(increment)
+
+        if not keep:
+            def increment(values):
+                values[slot] = values[slot] + step
+        elif node.prefix:
+            def increment(values):
+                values[slot] = value = values[slot] + step
+                return value
+        else:
+            def increment(values):
+                value = values[slot]
+                values[slot] = value + step
+                return value
+        return increment
+
+    def visit_UnOp(self, node):
+        op = node.op.type
+        if op in (INC_OP, DEC_OP):
+            return self.increment(node, keep=True)
+        if not node.prefix or op == ADD_OP:
+            return self.visit(node.expr)
+        if op == AND_OP:
+            address = node.expr.frame, node.expr.slot
+
+            def address_of(values):
+                return address
+            return address_of
+
+        expression = self.visit(node.expr)
+        if op == SUB_OP:
+            def negative(values):
+                return -expression(values)
+            return negative
+        if op == LOG_NEG and node in self.tested:
+            def negation(values):
+                return not expression(values)
+            return negation
+        return self.convert(expression, UNARY_OPERATORS[op])
+
+    def visit_BinOp(self, node):
+        op = node.op.type
+        left, right = self.visit(node.left), self.visit(node.right)
+        if op == LOG_AND_OP:
+            def log_and(values):
+                return 1 if left(values) and right(values) else 0
+            return log_and
+        if op == LOG_OR_OP:
+            def log_or(values):
+                return 1 if left(values) or right(values) else 0
+            return log_or
+        if op not in BINARY_OPERATORS:
+            self.error("Unsupported operator '{}' at line {}".format(node.op.value, node.line))
+
+        function = TESTS[op] if node in self.tested else OPERATORS[op, node.left.ctype, node.right.ctype]
+        if isinstance(node.left, Var) and node.left.frame != GLOBAL_FRAME:
+            # the most frequent shapes read the local variable directly
+            slot = node.left.slot
+            if isinstance(node.right, Num):
+                value = right(None)
+
+                def binary_local_const(values):
+                    return function(values[slot], value)
+                return binary_local_const
+            if isinstance(node.right, Var) and node.right.frame != GLOBAL_FRAME:
+                right_slot = node.right.slot
+
+                def binary_locals(values):
+                    return function(values[slot], values[right_slot])
+                return binary_locals
+
+        def binary(values):
+            return function(left(values), right(values))
+        return binary
+
+    def visit_TerOp(self, node):
+        condition, texpression, fexpression = (
+            self.visit(node.condition), self.visit(node.texpression), self.visit(node.fexpression)
+        )
+
+        def ternary(values):
+            return texpression(values) if condition(values) else fexpression(values)
+        return ternary
+
+    def visit_FunctionCall(self, node):
+        function, memory = self.functions[node.name], self.memory
+        if not isinstance(function, Function):
+            return self.call_builtin(node, function)
+
+        args = tuple(map(self.visit, node.args))
+        args = tuple(
+            arg if convert is None else self.convert(arg, convert)
+            for arg, convert in zip(args, map(conversion, function.arg_types, (arg.ctype for arg in node.args)))
+        )
+        name, size, return_slot = function.name, function.frame_size + 1, function.frame_size
+
+        def execute(*arguments):
+            frame = memory.new_frame(name, size)
+            frame[:len(arguments)] = arguments
+            function.body(frame)
+            memory.del_frame()
+            return frame[return_slot]
+
+        if self.memo is not None and function.pure:
+            execute = self.memo.cache(name).memoized(execute)
+
+            def call_pure(values):
+                return execute(*[arg(values) for arg in args])
+            return call_pure
+
+        def call(values):
+            arguments = [arg(values) for arg in args]
+            frame = memory.new_frame(name, size)
+            frame[:len(arguments)] = arguments
+            function.body(frame)
+            memory.del_frame()
+            return frame[return_slot]
+        return call
+
+    def call_builtin(self, node, signature):
+        builtin, args, conversions = bind(signature, node)
+        args = tuple(
+            self.visit(arg) if convert is None else self.convert(self.visit(arg), convert)
+            for arg, convert in zip(args, conversions)
+        )
+        if node.name == 'scanf':
+            memory = self.memory
+
+            def call_builtin(values):
+                return builtin(*[arg(values) for arg in args], memory)
+        elif len(args) == 1:
+            arg, = args
+
+            def call_builtin(values):
+                return builtin(arg(values))
+        elif len(args) == 2:
+            left, right = args
+
+            def call_builtin(values):
+                return builtin(left(values), right(values))
+        else:
+            def call_builtin(values):
+                return builtin(*[arg(values) for arg in args])
+        return call_builtin
+
+    def interpret(self, tree):
+        self.memory = Memory(tree.frame_size, self.stack_size)
+        self.globals = self.memory.global_frame.values
+        self.tested = tested(tree)
+        init = self.visit(tree)
+        try:
+            init(self.globals)
+            main = self.functions['main']
+            values = self.memory.new_frame(main.name, main.frame_size + 1)
+            main.body(values)
+            self.memory.del_frame()
+        finally:
+            stdout.flush()
+        return values[main.frame_size]
@@ -1,47 +1,83 @@
 from .memory import *
-from .number import Number
-from ..lexical_analysis.lexer import Lexer
+from .memo import MISSING, Memo
+from .bytecode import bind, tested
+from .number import *
+from .vm import VirtualMachine
+from .closure import ClosureInterpreter
+from .transpiler import PythonInterpreter
+from ..lexical_analysis.regex_lexer import RegexLexer
+from ..lexical_analysis.stream_lexer import StreamLexer
 from ..lexical_analysis.token_type import *
 from ..syntax_analysis.parser import Parser
 from ..syntax_analysis.tree import *
 from ..semantic_analysis.analyzer import SemanticAnalyzer
-from ..utils.utils import get_functions, MessageColor
+from ..utils.input import stdin
+from ..utils.output import BUFFER_SIZE, stdout
+from ..utils.registry import library
+from ..utils.utils import MessageColor
+
+# Status returned by a statement, None means that execution goes on with the next statement
+BREAK, CONTINUE, RETURN = 1, 2, 3
+
+# Nodes visited as statements, visitors of the other nodes return values instead of a status
+STATEMENTS = frozenset((
+    CompoundStmt, IfStmt, WhileStmt, DoWhileStmt, ForStmt, ReturnStmt, BreakStmt, ContinueStmt
+))
 
 class Interpreter(NodeVisitor):
 
-    def __init__(self):
+    def __init__(self, stack_size=STACK_SIZE, memo=None):
         self.memory = Memory()
+        self.stack_size = stack_size
+        self.memo = memo                # memo.Memo of the results of pure functions, None to call them always
+        self.result = None              # value of the last executed return statement
+        self.functions = dict()
 
     def load_libraries(self, tree):
         for node in filter(lambda o: isinstance(o, IncludeLibrary), tree.children):
-            functions = get_functions('interpreter.__builtins__.{}'.format(
-                node.library_name
-            ))
-
-            for function in functions:
-                self.memory[function.__name__] = function
+            self.functions.update(library(node.library_name).signatures)
 
     def load_functions(self, tree):
         for node in filter(lambda o: isinstance(o, FunctionDecl), tree.children):
-            self.memory[node.func_name] = node
+            self.functions[node.func_name] = node
+
+    def load_operators(self, tree):
+        """ Bind operator function to every operator node, None where the operator is executed by the visitor,
+        and the function of the builtin to every call of a builtin, None for calls of user functions """
+        tests = tested(tree)
+        for node in walk(tree):
+            if isinstance(node, FunctionCall):
+                function = self.functions[node.name]
+                node.builtin = None if isinstance(function, Node) else self.bind_builtin(node, function)
+            elif node in tests:
+                node.operator = TESTS[node.op.type]
+            elif isinstance(node, BinOp):
+                node.operator = None if node.op.type in (LOG_AND_OP, LOG_OR_OP) else OPERATORS[
+                    node.op.type, node.left.ctype, node.right.ctype
+                ]
+            elif isinstance(node, UnOp):
+                node.operator = UNARY_OPERATORS.get(node.op.type) if node.prefix else None
+            elif isinstance(node, Assign):
+                node.operator = None if node.op.type == ASSIGN else OPERATORS[
+                    COMPOUND_OPERATORS[node.op.type], node.left.ctype, node.right.ctype
+                ]
+                node.conversion = assignment_conversion(node)
 
     def visit_Program(self, node):
         for var in filter(lambda self: not isinstance(self, (FunctionDecl, IncludeLibrary)), node.children):
             self.visit(var)
 
     def visit_VarDecl(self, node):
-        self.memory.declare(node.var_node.value)
+        """ Slot of the variable is preallocated with the frame """
+        pass
 
     def visit_FunctionDecl(self, node):
-        for i, param in enumerate(node.params):
-            self.memory[param.var_node.value] = self.memory.stack.current_frame.current_scope._values.pop(i)
+        """ Arguments are already bound to the first slots of the frame, returns RETURN if the
+        function returned `self.result` """
         return self.visit(node.body)
 
     def visit_FunctionBody(self, node):
-        for child in node.children:
-            if isinstance(child, ReturnStmt):
-                return self.visit(child)
-            self.visit(child)
+        return self.visit_CompoundStmt(node)
 
     def visit_Expression(self, node):
         expr = None
@@ -49,167 +85,194 @@ class Interpreter(NodeVisitor):
             expr = self.visit(child)
         return expr
 
-    def visit_FunctionCall(self, node):
-
-        args = [self.visit(arg) for arg in node.args]
+    def bind_builtin(self, node, signature):
+        """ Function executing the call `node` of a builtin on the values of the arguments `node.params` """
+        builtin, node.params, conversions = bind(signature, node)
+        memory = self.memory
         if node.name == 'scanf':
-            args.append(self.memory)
-
-        if isinstance(self.memory[node.name], Node):
-            self.memory.new_frame(node.name)
+            def call_scanf(*args):
+                return builtin(*args, memory)
+            return call_scanf
+        if any(conversions):
+            def call_converted(*args):
+                return builtin(*[arg if convert is None else convert(arg) for arg, convert in zip(args, conversions)])
+            return call_converted
+        return builtin
 
-            for i, arg in enumerate(args):
-                self.memory.declare(i)
-                self.memory[i] = arg
+    def visit_FunctionCall(self, node):
+        if node.builtin is not None:
+            return node.builtin(*[self.visit(arg) for arg in node.params])
 
-            res = self.visit(self.memory[node.name])
-            self.memory.del_frame()
-            return res
-        else:
-            return Number(self.memory[node.name].return_type, self.memory[node.name](*args))
+        args = [self.visit(arg) for arg in node.args]
+        function = self.functions[node.name]
+        for i, (param, arg) in enumerate(zip(function.params, node.args)):
+            convert = conversion(param.type_node.value, arg.ctype)
+            if convert is not None:
+                args[i] = convert(args[i])
+        if self.memo is not None and function.pure:
+            cache, key = self.memo.cache(node.name), tuple(args)
+            result = cache.get(key)
+            if result is MISSING:
+                result = self.call(function, args)
+                cache.put(key, result)
+            return result
+        return self.call(function, args)
+
+    def call(self, function, args):
+        """ Execute function on a new frame holding the converted arguments """
+        values = self.memory.new_frame(function.func_name, function.frame_size)
+        values[:len(args)] = args
+        res = self.result if self.visit(function) == RETURN else None
+        self.memory.del_frame()
+        convert = TYPES.get(function.type_node.value)
+        return res if convert is None or res is None else convert(res)
 
     def visit_UnOp(self, node):
-        if node.prefix:
-            if node.op.type == AND_OP:
-                return node.expr.value
-            elif node.op.type == INC_OP :
-                self.memory[node.expr.value] += Number('int', 1)
-                return self.memory[node.expr.value]
-            elif node.op.type == DEC_OP:
-                self.memory[node.expr.value] -= Number('int', 1)
-                return self.memory[node.expr.value]
-            elif node.op.type == SUB_OP:
-                return Number('int', -1) * self.visit(node.expr)
-            elif node.op.type == ADD_OP:
-                return self.visit(node.expr)
-            elif node.op.type == LOG_NEG:
-                res = self.visit(node.expr)
-                return res._not()
-            else:
-                res = self.visit(node.expr)
-                return Number(node.op.value, res.value)
-        else:
-            if node.op.type == INC_OP :
-                var = self.memory[node.expr.value]
-                self.memory[node.expr.value] += Number('int', 1)
-                return var
-            elif node.op.type == DEC_OP:
-                var = self.memory[node.expr.value]
-                self.memory[node.expr.value] -= Number('int', 1)
-                return var
-
-        return self.visit(node.expr)
+        if node.operator is not None:
+            return node.operator(self.visit(node.expr))
+        if node.op.type == AND_OP:
+            return node.expr.frame, node.expr.slot
+        values, slot = self.memory.frames[node.expr.frame], node.expr.slot
+        value = values[slot]
+        values[slot] = value + 1 if node.op.type == INC_OP else value - 1
+        return values[slot] if node.prefix else value
 
     def visit_CompoundStmt(self, node):
-        self.memory.new_scope()
-
         for child in node.children:
-            self.visit(child)
-
-        self.memory.del_scope()
+            status = self.visit(child)
+            if status is not None and child.__class__ in STATEMENTS:
+                return status
 
     def visit_ReturnStmt(self, node):
-        return self.visit(node.expression)
+        self.result = self.visit(node.expression)
+        return RETURN
+
+    def visit_BreakStmt(self, node):
+        return BREAK
+
+    def visit_ContinueStmt(self, node):
+        return CONTINUE
 
     def visit_Num(self, node):
-        if node.token.type == INTEGER_CONST:
-            return Number(ttype="int", value=node.value)
-        elif node.token.type == CHAR_CONST:
-            return Number(ttype="char", value=node.value)
-        else:
-            return Number(ttype="float", value=node.value)
+        return node.value
 
     def visit_Var(self, node):
-        return self.memory[node.value]
+        return self.memory.frames[node.frame][node.slot]
 
     def visit_Assign(self, node):
-        var_name = node.left.value
-        if node.op.type == ADD_ASSIGN:
-            self.memory[var_name] += self.visit(node.right)
-        elif node.op.type == SUB_ASSIGN:
-            self.memory[var_name] -= self.visit(node.right)
-        elif node.op.type == MUL_ASSIGN:
-            self.memory[var_name] *= self.visit(node.right)
-        elif node.op.type == DIV_ASSIGN:
-            self.memory[var_name] /= self.visit(node.right)
+        values, slot = self.memory.frames[node.left.frame], node.left.slot
+        if node.operator is None:
+            value = self.visit(node.right)
         else:
-            self.memory[var_name] = self.visit(node.right)
-        return self.memory[var_name]
+            value = node.operator(values[slot], self.visit(node.right))
+        if node.conversion is not None:
+            value = node.conversion(value)
+        values[slot] = value
+        return value
 
     def visit_NoOp(self, node):
         pass
 
     def visit_BinOp(self, node):
-        if node.op.type == ADD_OP:
-            return self.visit(node.left) + self.visit(node.right)
-        elif node.op.type == SUB_OP:
-            return self.visit(node.left) - self.visit(node.right)
-        elif node.op.type == MUL_OP:
-            return self.visit(node.left) * self.visit(node.right)
-        elif node.op.type == DIV_OP:
-            return self.visit(node.left) / self.visit(node.right)
-        elif node.op.type == MOD_OP:
-            return self.visit(node.left) % self.visit(node.right)
-        elif node.op.type == LT_OP:
-            return self.visit(node.left) < self.visit(node.right)
-        elif node.op.type == GT_OP:
-            return self.visit(node.left) > self.visit(node.right)
-        elif node.op.type == LE_OP:
-            return self.visit(node.left) <= self.visit(node.right)
-        elif node.op.type == GE_OP:
-            return self.visit(node.left) >= self.visit(node.right)
-        elif node.op.type == EQ_OP:
-            return self.visit(node.left) == self.visit(node.right)
-        elif node.op.type == NE_OP:
-            return self.visit(node.left) != self.visit(node.right)
-        elif node.op.type == LOG_AND_OP:
-            return self.visit(node.left) and self.visit(node.right)
-        elif node.op.type == LOG_OR_OP:
-            return self.visit(node.left) or self.visit(node.right)
-        elif node.op.type == AND_OP:
-            return self.visit(node.left) & self.visit(node.right)
-        elif node.op.type == OR_OP:
-            return self.visit(node.left) | self.visit(node.right)
-        elif node.op.type == XOR_OP:
-            return self.visit(node.left) ^ self.visit(node.right)
+        if node.operator is not None:
+            return node.operator(self.visit(node.left), self.visit(node.right))
+        # && and || evaluate the right operand only if it decides
+        if node.op.type == LOG_AND_OP:
+            return truth(self.visit(node.left) and self.visit(node.right))
+        return truth(self.visit(node.left) or self.visit(node.right))
+
+    def visit_TerOp(self, node):
+        if self.visit(node.condition):
+            return self.visit(node.texpression)
+        return self.visit(node.fexpression)
 
     def visit_String(self, node):
         return node.value
 
     def visit_IfStmt(self, node):
-        if self.visit(node.condition):
-            self.visit(node.tbody)
-        else:
-            self.visit(node.fbody)
+        body = node.tbody if self.visit(node.condition) else node.fbody
+        status = self.visit(body)
+        if status is not None and body.__class__ in STATEMENTS:
+            return status
 
     def visit_WhileStmt(self, node):
-        while self.visit(node.condition):
-            self.visit(node.body)
+        visit, condition, body = self.visit, node.condition, node.body
+        if body.__class__ not in STATEMENTS:
+            while visit(condition):
+                visit(body)
+            return
+        while visit(condition):
+            status = visit(body)
+            if status:
+                if status == BREAK:
+                    break
+                if status == RETURN:
+                    return status
+
+    def visit_DoWhileStmt(self, node):
+        visit, condition, body = self.visit, node.condition, node.body
+        statement = body.__class__ in STATEMENTS
+        while True:
+            status = visit(body)
+            if statement and status:
+                if status == BREAK:
+                    break
+                if status == RETURN:
+                    return status
+            if not visit(condition):
+                break
 
     def visit_ForStmt(self, node):
-        self.visit(node.setup)
-        while self.visit(node.condition):
-            self.visit(node.body)
-            self.visit(node.increment)
+        visit, condition, increment, body = self.visit, node.condition, node.increment, node.body
+        statement = body.__class__ in STATEMENTS
+        visit(node.setup)
+        while visit(condition):
+            status = visit(body)
+            if statement and status:
+                if status == BREAK:
+                    break
+                if status == RETURN:
+                    return status
+            visit(increment)
 
     def interpret(self, tree):
+        self.memory = Memory(tree.frame_size, self.stack_size)
         self.load_libraries(tree)
         self.load_functions(tree)
-        self.visit(tree)
-        self.memory.new_frame('main')
-        node = self.memory['main']
-        res = self.visit(node)
-        self.memory.del_frame()
+        self.load_operators(tree)
+        try:
+            self.visit(tree)
+            # converted to the return type of main, as every call
+            res = self.call(self.functions['main'], [])
+        finally:
+            stdout.flush()
         return res
 
     @staticmethod
-    def run(program):
+    def run(program, engine='tree', level=0, verbose=False, stack_size=STACK_SIZE, memo_size=0,
+            output=None, buffer_size=BUFFER_SIZE):
+        """ Execute program given as a string or as a file object (text, binary or mmap)
+        with one of the ENGINES, optimized at the optimization `level`. The optimizations
+        report what they changed if `verbose`. Engines keeping frames in the memory hold
+        at most `stack_size` variables on the stack. Results of pure functions are memoized
+        if `memo_size` is set, up to that many per function, and the statistics are reported.
+        Output of the program goes to the binary file object `output`, the standard output
+        if None, buffered up to `buffer_size` characters. """
+        from ..optimization.optimizer import Optimizer     # optimization imports number of this package
+        memo = Memo(memo_size) if memo_size else None
+        stdout.open(output, buffer_size)
+        stdin.open()
         try:
-            lexer = Lexer(program)
-            parser = Parser(lexer)
-            tree = parser.parse()
-            SemanticAnalyzer.analyze(tree)
-            status = Interpreter().interpret(tree)
+            if engine == 'python':
+                # cached programs skip lexing, parsing and analysis
+                status = PythonInterpreter(memo=memo).run_cached(program, level, verbose)
+            else:
+                lexer = RegexLexer(program) if isinstance(program, str) else StreamLexer(program)
+                parser = Parser(lexer)
+                tree = parser.parse()
+                SemanticAnalyzer.analyze(tree)
+                tree = Optimizer.optimize(tree, level, verbose)
+                status = ENGINES[engine](stack_size, memo).interpret(tree)
         except Exception as message:
             print("{}[{}] {} {}".format(
                 MessageColor.FAIL,
@@ -218,7 +281,17 @@ class Interpreter(NodeVisitor):
                 MessageColor.ENDC
             ))
             status = -1
+        if memo is not None:
+            print()
+            memo.report()
         print()
         print(MessageColor.OKBLUE + "Process terminated with status {}".format(status) + MessageColor.ENDC)
 
 
+# Execution engines, all of them run the analyzed tree with the same results
+ENGINES = dict(
+    tree=Interpreter,           # walks the tree
+    vm=VirtualMachine,          # compiles the tree to bytecode for a stack machine, calls do not use the Python stack
+    closure=ClosureInterpreter, # compiles every node to a Python closure
+    python=PythonInterpreter,   # translates the program to Python, cached on the disk
+)
@@ -0,0 +1,73 @@
+""" SCI - Simple C Interpreter """
+from collections import OrderedDict
+
+from ..utils.utils import MessageColor
+
+# Default number of results remembered per function
+MEMO_SIZE = 1 << 16
+
+# Result of a lookup of arguments not in the cache
+MISSING = object()
+
+
+class Cache(object):
+    """ Results of a pure function keyed by the tuple of its arguments, the least recently
+    used result is dropped when more than `size` are kept """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """ Result of the call with the arguments `key`, MISSING if it is not known """
+        results = self.results
+        if key in results:
+            self.hits += 1
+            results.move_to_end(key)
+            return results[key]
+        self.misses += 1
+        return MISSING
+
+    def put(self, key, result):
+        results = self.results
+        results[key] = result
+        if len(results) > self.size:
+            results.popitem(last=False)
+
+    def memoized(self, function):
+        """ Python function calling `function` only for arguments not in the cache """
+        get, put = self.get, self.put
+
+        def call(*args):
+            result = get(args)
+            if result is MISSING:
+                result = function(*args)
+                put(args, result)
+            return result
+        return call
+
+
+class Memo(object):
+    """ Caches of the pure functions of the program (`FunctionDecl.pure`), engines look calls of
+    those functions up before executing them """
+
+    def __init__(self, size=MEMO_SIZE):
+        self.size = size
+        self.caches = dict()        # function name -> Cache
+
+    def cache(self, name):
+        if name not in self.caches:
+            self.caches[name] = Cache(name, self.size)
+        return self.caches[name]
+
+    def report(self):
+        for cache in self.caches.values():
+            print(MessageColor.OKGREEN + "Memoization of {}: {} hits, {} misses, {} results kept".format(
+                cache.name,
+                cache.hits,
+                cache.misses,
+                len(cache.results)
+            ) + MessageColor.ENDC)
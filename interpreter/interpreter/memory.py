@@ -1,62 +1,33 @@
-import random
+from ..semantic_analysis.table import LOCAL_FRAME
 
-class Scope(object):
-    def __init__(self, scope_name, parent_scope=None):
-        self.scope_name = scope_name
-        self.parent_scope = parent_scope
-        self._values = dict()
+# Default limit of the stack, in variables, a frame takes its variables and one more
+STACK_SIZE = 1 << 22
 
-    def __setitem__(self, key, value):
-        self._values[key] = value
 
-    def __getitem__(self, item):
-        return self._values[item]
-
-    def __contains__(self, key):
-        return key in self._values
-
-    def __repr__(self):
-        lines = [
-            '{}:{}'.format(key, val) for key, val in self._values.items()
-        ]
-        title = '{}\n'.format(self.scope_name)
-        return title + '\n'.join(lines)
+class StackOverflowError(Exception):
+    pass
 
 
 class Frame(object):
-    def __init__(self, frame_name, global_scope):
+    """ Activation record, every variable declared in the function
+    (parameters included) owns one slot assigned by the semantic analyzer """
+
+    def __init__(self, frame_name, size):
         self.frame_name = frame_name
-        self.current_scope = Scope(
-            '{}.scope_00'.format(frame_name),
-            global_scope
-        )
-        self.scopes = [self.current_scope]
-
-    def new_scope(self):
-        self.current_scope = Scope(
-            '{}{:02d}'.format(
-                self.current_scope.scope_name[:-2],
-                int(self.current_scope.scope_name[-2:]) + 1
-            ),
-            self.current_scope
-        )
-        self.scopes.append(self.current_scope)
+        self.values = [None] * size
+
+    def __getitem__(self, slot):
+        return self.values[slot]
 
-    def del_scope(self):
-        current_scope = self.current_scope
-        self.current_scope = current_scope.parent_scope
-        self.scopes.pop(-1)
-        del current_scope
+    def __setitem__(self, slot, value):
+        self.values[slot] = value
 
-    def __contains__(self, key):
-        return key in self.current_scope
+    def __len__(self):
+        return len(self.values)
 
     def __repr__(self):
         lines = [
-            '{}\n{}'.format(
-                scope,
-                '-' * 40
-            ) for scope in self.scopes
+            '{}:{}'.format(slot, val) for slot, val in enumerate(self.values)
         ]
 
         title = 'Frame: {}\n{}\n'.format(
@@ -75,14 +46,15 @@ class Stack(object):
     def __bool__(self):
         return bool(self.frames)
 
-    def new_frame(self, frame_name, global_scope=None):
-        frame = Frame(frame_name, global_scope=global_scope)
+    def new_frame(self, frame_name, size):
+        frame = Frame(frame_name, size)
         self.frames.append(frame)
         self.current_frame = frame
+        return frame
 
     def del_frame(self):
         self.frames.pop(-1)
-        self.current_frame = len(self.frames) and self.frames[-1] or None
+        self.current_frame = self.frames[-1] if self.frames else None
 
     def __repr__(self):
         lines = [
@@ -92,39 +64,43 @@ class Stack(object):
 
 
 class Memory(object):
-    def __init__(self):
-        self.global_frame = Frame('GLOBAL_MEMORY', None)
-        self.stack = Stack()
-
-    def declare(self, key, value=random.randint(0, 2**32)):
-        ins_scope = self.stack.current_frame.current_scope if self.stack.current_frame else self.global_frame.current_scope
-        ins_scope[key] = value
-
-    def __setitem__(self, key, value):
-        ins_scope = self.stack.current_frame.current_scope if self.stack.current_frame else self.global_frame.current_scope
-        curr_scope = ins_scope
-        while curr_scope and key not in curr_scope:
-            curr_scope = curr_scope.parent_scope
-        ins_scope = curr_scope if curr_scope else ins_scope
-        ins_scope[key] = value
-
-    def __getitem__(self, item):
-        curr_scope = self.stack.current_frame.current_scope if self.stack.current_frame else self.global_frame.current_scope
-        while curr_scope and item not in curr_scope:
-            curr_scope = curr_scope.parent_scope
-        return curr_scope[item]
+    """ Variables are addressed by (frame, slot) pairs resolved by the semantic analyzer.
+    `frames` holds values of the global frame and of the frame on top of the stack,
+    so every access is two list indexings, whatever the nesting of blocks. """
 
-    def new_frame(self, frame_name):
-        self.stack.new_frame(frame_name, self.global_frame.current_scope)
+    def __init__(self, global_size=0, stack_size=STACK_SIZE):
+        self.global_frame = Frame('GLOBAL_MEMORY', global_size)
+        self.stack = Stack()
+        self.frames = [self.global_frame.values, self.global_frame.values]
+        self.stack_size = stack_size        # at most this many variables on the stack
+        self.free = stack_size
+
+    def __setitem__(self, address, value):
+        frame, slot = address
+        self.frames[frame][slot] = value
+
+    def __getitem__(self, address):
+        frame, slot = address
+        return self.frames[frame][slot]
+
+    def new_frame(self, frame_name, size):
+        """ Push frame for a call and return list of its slots, parameters come first """
+        self.free -= size + 1
+        if self.free < 0:
+            self.free += size + 1
+            raise StackOverflowError("Stack overflow calling '{}', the stack holds {} variables".format(
+                frame_name,
+                self.stack_size
+            ))
+        values = self.stack.new_frame(frame_name, size).values
+        self.frames[LOCAL_FRAME] = values
+        return values
 
     def del_frame(self):
+        self.free += len(self.stack.current_frame) + 1
         self.stack.del_frame()
-
-    def new_scope(self):
-        self.stack.current_frame.new_scope()
-
-    def del_scope(self):
-        self.stack.current_frame.del_scope()
+        frame = self.stack.current_frame
+        self.frames[LOCAL_FRAME] = (frame if frame is not None else self.global_frame).values
 
     def __repr__(self):
         return "{}\nStack\n{}\n{}".format(
@@ -135,5 +111,3 @@ class Memory(object):
 
     def __str__(self):
         return self.__repr__()
-
-
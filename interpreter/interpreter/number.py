@@ -1,131 +1,181 @@
-class Number(object):
-    types = dict(char=int, int=int, float=float, double=float)
-    order = ('char', 'int', 'float', 'double')
-
-    def __init__(self, ttype, value):
-        self.type = ttype
-        self.value = Number.types[ttype](value)
-
-    def _get_res_type(self, other):
-        left_order = Number.order.index(self.type)
-        right_order = Number.order.index(other.type)
-        ttype = Number.order[max(left_order, right_order)]
-        return ttype, Number.types[ttype]
-
-    def __add__(self, other):
-        """ self + other """
-        ttype, ctype = self._get_res_type(other)
-        return Number(ttype, ctype(self.value) + ctype(other.value))
-
-    def __sub__(self, other):
-        """ self - other """
-        ttype, ctype = self._get_res_type(other)
-        return Number(ttype, ctype(self.value) - ctype(other.value))
-
-    def __mul__(self, other):
-        """ self * other """
-        ttype, ctype = self._get_res_type(other)
-        return Number(ttype, ctype(self.value) * ctype(other.value))
-
-    def __truediv__(self, other):
-        """ self / other """
-        ttype, ctype = self._get_res_type(other)
-        if ctype == int:
-            return Number(ttype, ctype(self.value) // ctype(other.value))
-        return Number(ttype, ctype(self.value) / ctype(other.value))
-
-    def __mod__(self, other):
-        """ self % other """
-        ttype, ctype = self._get_res_type(other)
-
-        if ctype != int:
-            raise TypeError("invalid operands of types '{}' and '{}' to binary ‘operator %’".format(
-                self.type,
-                other.type
-            ))
-        return Number(ttype, ctype(self.value) % ctype(other.value))
-
-    def __gt__(self, other):
-        """ self > other """
-        ttype, ctype = self._get_res_type(other)
-        return Number('int', int(ctype(self.value) > ctype(other.value)))
-
-    def __ge__(self, other):
-        """ self >= other """
-        ttype, ctype = self._get_res_type(other)
-        return Number('int', int(ctype(self.value) >= ctype(other.value)))
-
-    def __lt__(self, other):
-        """ self < other """
-        ttype, ctype = self._get_res_type(other)
-        return Number('int', int(ctype(self.value) < ctype(other.value)))
-
-    def __le__(self, other):
-        """ self <= other """
-        ttype, ctype = self._get_res_type(other)
-        return Number('int', int(ctype(self.value) <= ctype(other.value)))
-
-    def __eq__(self, other):
-        """ self == other """
-        ttype, ctype = self._get_res_type(other)
-        return Number('int', int(ctype(self.value) == ctype(other.value)))
-
-    def __ne__(self, other):
-        """ self != other """
-        ttype, ctype = self._get_res_type(other)
-        return Number('int', int(ctype(self.value) != ctype(other.value)))
-
-    def __iadd__(self, other):
-        """ self += other """
-        ctype = Number.types[self.type]
-        result = self + other
-        return Number(self.type, ctype(result.value))
-
-    def __isub__(self, other):
-        """ self -= other """
-        ctype = Number.types[self.type]
-        result = self - other
-        return Number(self.type, ctype(result.value))
-
-    def __imul__(self, other):
-        """ self *= other """
-        ctype = Number.types[self.type]
-        result = self * other
-        return Number(self.type, ctype(result.value))
-
-    def __itruediv__(self, other):
-        """ self /= other """
-        ctype = Number.types[self.type]
-        result = self / other
-        return Number(self.type, ctype(result.value))
-
-    def __and__(self, other):
-        """ self & other """
-        ttype, ctype = self._get_res_type(other)
-        return Number(ttype, int(ctype(self.value) & ctype(other.value)))
-
-    def __or__(self, other):
-        """ self | other """
-        ttype, ctype = self._get_res_type(other)
-        return Number(ttype, int(ctype(self.value) | ctype(other.value)))
-
-    def __xor__(self, other):
-        """ self ^ other """
-        ttype, ctype = self._get_res_type(other)
-        return Number(ttype, int(ctype(self.value) ^ ctype(other.value)))
-
-
-    def __bool__(self):
-        return bool(self.value)
-
-    def _not(self):
-        return Number('int', 0) if self.value else Number('int', 1)
-
-    def __repr__(self):
-        return '{} ({})'.format(
-            self.type,
-            self.value
-        )
-
-    def __str__(self):
-        return self.__repr__()
\ No newline at end of file
+""" C arithmetic on plain Python values.
+Values of char and int are Python int, values of float and double are Python float.
+Types are not carried by the values, the analyzer records the C type of every
+expression as `node.ctype` and the engines convert values where C would. """
+import operator
+
+from ..lexical_analysis.token_type import *
+
+# Python type holding values of the C type
+TYPES = dict(char=int, int=int, float=float, double=float)
+
+# Usual arithmetic conversions, result has the later of both operand types
+ORDER = ('char', 'int', 'float', 'double')
+
+
+def promote(ltype, rtype):
+    """ C type of an arithmetic operation on operands of types `ltype` and `rtype` """
+    return ltype if ORDER.index(ltype) >= ORDER.index(rtype) else rtype
+
+
+def conversion(target, source):
+    """ Return function converting a value of the C type `source` to the C type `target`,
+    None if the value can be used as it is or either type is not arithmetic """
+    ctype = TYPES.get(target)
+    if ctype is None or TYPES.get(source, ctype) is ctype:
+        return None
+    return ctype
+
+
+def int_divide(left, right):
+    """ Integer division, truncates toward zero """
+    quotient = left // right
+    if quotient < 0 and quotient * right != left:
+        quotient += 1
+    return quotient
+
+
+def int_modulo(left, right):
+    """ Integer remainder, has the sign of the dividend """
+    return left - right * int_divide(left, right)
+
+
+def divide(left, right):
+    """ left / right for operands of unknown types """
+    if isinstance(left, float) or isinstance(right, float):
+        return left / right
+    return int_divide(left, right)
+
+
+def modulo(left, right):
+    """ left % right for operands of unknown types """
+    if isinstance(left, float) or isinstance(right, float):
+        raise TypeError("invalid operands of types '{}' and '{}' to binary ‘operator %’".format(
+            type(left).__name__,
+            type(right).__name__
+        ))
+    return int_modulo(left, right)
+
+
+def truth(value):
+    """ Result of && and || """
+    return 1 if value else 0
+
+
+# Comparisons and ! give int 1 or 0 as in C, not a Python bool
+
+def less(left, right):
+    return 1 if left < right else 0
+
+
+def greater(left, right):
+    return 1 if left > right else 0
+
+
+def less_equal(left, right):
+    return 1 if left <= right else 0
+
+
+def greater_equal(left, right):
+    return 1 if left >= right else 0
+
+
+def equal(left, right):
+    return 1 if left == right else 0
+
+
+def not_equal(left, right):
+    return 1 if left != right else 0
+
+
+def negation(value):
+    return 0 if value else 1
+
+
+# Binary operators, same operations as `Interpreter.visit_BinOp` performs,
+# shared by the compiling engines
+BINARY_OPERATORS = {
+    ADD_OP: operator.add,
+    SUB_OP: operator.sub,
+    MUL_OP: operator.mul,
+    DIV_OP: divide,
+    MOD_OP: modulo,
+    LT_OP: less,
+    GT_OP: greater,
+    LE_OP: less_equal,
+    GE_OP: greater_equal,
+    EQ_OP: equal,
+    NE_OP: not_equal,
+    AND_OP: operator.and_,
+    OR_OP: operator.or_,
+    XOR_OP: operator.xor,
+    LEFT_OP: operator.lshift,
+    RIGHT_OP: operator.rshift,
+}
+
+# Prefix operators computing a value of their operand, casts are added below
+UNARY_OPERATORS = {
+    ADD_OP: operator.pos,
+    SUB_OP: operator.neg,
+    LOG_NEG: negation,
+}
+UNARY_OPERATORS.update({ttype: TYPES[ttype.lower()] for ttype in (CHAR, INT, FLOAT, DOUBLE)})
+
+# Comparisons and ! giving a Python bool, where the value is only tested for truth (`bytecode.tested`)
+TESTS = {
+    LT_OP: operator.lt,
+    GT_OP: operator.gt,
+    LE_OP: operator.le,
+    GE_OP: operator.ge,
+    EQ_OP: operator.eq,
+    NE_OP: operator.ne,
+    LOG_NEG: operator.not_,
+}
+
+# Compound assignments and their binary operators, the result is converted to the type of the variable
+COMPOUND_OPERATORS = {
+    ADD_ASSIGN: ADD_OP,
+    SUB_ASSIGN: SUB_OP,
+    MUL_ASSIGN: MUL_OP,
+    DIV_ASSIGN: DIV_OP,
+    MOD_ASSIGN: MOD_OP,
+    LEFT_ASSIGN: LEFT_OP,
+    RIGHT_ASSIGN: RIGHT_OP,
+    AND_ASSIGN: AND_OP,
+    XOR_ASSIGN: XOR_OP,
+    OR_ASSIGN: OR_OP,
+}
+
+
+def specialize(op, ltype, rtype):
+    """ Return function computing `left op right` for operands of the C types `ltype` and `rtype`,
+    None stands for a type not known statically """
+    if op not in (DIV_OP, MOD_OP):
+        # Python int and float promote as C does
+        return BINARY_OPERATORS[op]
+    if ltype is None or rtype is None:
+        return BINARY_OPERATORS[op]
+    if TYPES[ltype] is int and TYPES[rtype] is int:
+        return int_divide if op == DIV_OP else int_modulo
+    if op == DIV_OP:
+        return operator.truediv
+
+    def invalid_modulo(left, right):
+        raise TypeError("invalid operands of types '{}' and '{}' to binary ‘operator %’".format(ltype, rtype))
+    return invalid_modulo
+
+
+# Handler of every binary operator for every pair of operand types,
+# engines choose it once by (op, node.left.ctype, node.right.ctype)
+OPERATORS = {
+    (op, ltype, rtype): specialize(op, ltype, rtype)
+    for op in BINARY_OPERATORS for ltype in ORDER + (None, ) for rtype in ORDER + (None, )
+}
+
+
+def assignment_conversion(node):
+    """ Conversion of the value assigned by `node` to the type of the variable, None if not needed """
+    source = node.right.ctype
+    if node.op.type != ASSIGN and source in TYPES:
+        source = promote(node.left.ctype, source)
+    return conversion(node.left.ctype, source)
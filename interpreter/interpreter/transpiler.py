@@ -0,0 +1,485 @@
+""" SCI - Simple C Interpreter """
+import contextlib
+import hashlib
+import importlib.util
+import io
+import marshal
+import os
+
+from .number import *
+from .bytecode import EXPRESSIONS, CompileError, bind, tested
+from ..lexical_analysis.regex_lexer import RegexLexer
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.parser import Parser
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.analyzer import SemanticAnalyzer
+from ..semantic_analysis.table import GLOBAL_FRAME
+from ..utils.output import stdout
+from ..utils.registry import library, signatures
+
+# Compiled programs are cached here, keyed by hash of the source
+CACHE_DIR = os.environ.get('SCI_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'sci'))
+
+# Must change whenever generated code changes, so stale cache entries are not used. That includes changes
+# of RUNTIME, which cached code calls, and of the optimizations, which shape the code.
+VERSION = 13
+
+# Operators having the same meaning for Python int and float as in C
+PYTHON_OPERATORS = {
+    ADD_OP: '+', SUB_OP: '-', MUL_OP: '*',
+    LT_OP: '<', GT_OP: '>', LE_OP: '<=', GE_OP: '>=', EQ_OP: '==', NE_OP: '!=',
+    AND_OP: '&', OR_OP: '|', XOR_OP: '^', LEFT_OP: '<<', RIGHT_OP: '>>',
+}
+
+
+
+###############################################################################
+#                                                                             #
+#  RUNTIME                                                                    #
+#                                                                             #
+###############################################################################
+
+# Generated code works on the same plain int and float values as the other engines,
+# integer division and remainder truncate as in C, so they are not Python operators.
+
+def load_builtin(library_name, name):
+    """ Return builtin function. scanf takes the values of the variables instead of their
+    addresses and returns its result followed by their values, the ones read replaced. """
+    function = library(library_name)[name].function
+    if name == 'scanf':
+        def call_scanf(fmt, *values):
+            memory = list(values)
+            return (function(fmt, *range(len(values)), memory), *memory)
+        return call_scanf
+    return function
+
+
+def specialize_builtin(library_name, name, literal, argc):
+    """ Return builtin function specialized for a call site, see `bytecode.bind` """
+    return library(library_name)[name].specialize(literal, argc)
+
+
+RUNTIME = dict(
+    _div=int_divide,
+    _mod=int_modulo,
+    _anymod=modulo,
+    _builtin=load_builtin,
+    _specialize=specialize_builtin,
+)
+
+
+###############################################################################
+#                                                                             #
+#  TRANSPILER                                                                 #
+#                                                                             #
+###############################################################################
+
+class Transpiler(NodeVisitor):
+    """ Translate analyzed tree to Python source.
+    Names of the variables get the slot as a suffix (`a_3`, globals `a_g`), so blocks
+    can not shadow each other; functions get the suffix `_f` and builtins `_b`.
+    Expression visitors return Python expression, statements are emitted as lines. """
+
+    def __init__(self):
+        self.lines = []
+        self.indent = 0
+        self.globals = []           # Python names of global variables
+        self.builtins = dict()      # builtin name -> library name, registry.Signature
+        self.bound = dict()         # name -> line binding the builtin, for the builtins the program calls
+        self.sites = []             # lines binding builtins specialized for their call sites
+        self.loops = []             # lines executed before `continue` of enclosing loops
+        self.locals = []            # Python names of local variables of the current function
+        self.arg_types = dict()     # function name -> C types of its parameters
+        self.return_type = None     # C type of the current function
+        self.tested = set()         # comparisons and negations left as Python bool, see `bytecode.tested`
+
+    def error(self, message):
+        raise CompileError(message)
+
+    def emit(self, line):
+        self.lines.append('    ' * self.indent + line)
+
+    def capture(self, node):
+        """ Return lines of statement `node` without indentation """
+        lines, indent = self.lines, self.indent
+        self.lines, self.indent = [], 0
+        self.statement(node)
+        captured, self.lines, self.indent = self.lines, lines, indent
+        return captured
+
+    @staticmethod
+    def name(var):
+        if var.frame == GLOBAL_FRAME:
+            return '{}_g'.format(var.value)
+        return '{}_{}'.format(var.value, var.slot)
+
+    @staticmethod
+    def convert(expression, function):
+        """ Apply conversion `function`, int or float, to the Python expression """
+        return expression if function is None else '{}({})'.format(function.__name__, expression)
+
+    @staticmethod
+    def binary(op, left, right, ltype, rtype):
+        """ Python expression of `left op right` for operands of the C types `ltype` and `rtype` """
+        integer = TYPES.get(ltype) is int and TYPES.get(rtype) is int
+        if op == DIV_OP:
+            return '_div({}, {})'.format(left, right) if integer else '({} / {})'.format(left, right)
+        if op == MOD_OP:
+            return '_mod({}, {})'.format(left, right) if integer else '_anymod({}, {})'.format(left, right)
+        return '({} {} {})'.format(left, PYTHON_OPERATORS[op], right)
+
+    def condition(self, node):
+        """ Python expression of a tested condition, && and || need not give 0 or 1 there """
+        if isinstance(node, Expression) and len(node.children) == 1:
+            return self.condition(node.children[0])
+        if isinstance(node, BinOp) and node.op.type in (LOG_AND_OP, LOG_OR_OP):
+            return '({} {} {})'.format(
+                self.condition(node.left),
+                'and' if node.op.type == LOG_AND_OP else 'or',
+                self.condition(node.right)
+            )
+        return self.visit(node)
+
+    def statement(self, node):
+        """ Emit node whose value is not used """
+        if isinstance(node, VarDecl):
+            if node.var_node.frame != GLOBAL_FRAME:
+                self.locals.append(self.name(node.var_node))
+        elif isinstance(node, NoOp):
+            pass
+        elif isinstance(node, Expression):
+            for child in node.children:
+                self.statement(child)
+        elif isinstance(node, Assign):
+            self.emit(self.assignment(node))
+        elif isinstance(node, UnOp) and node.op.type in (INC_OP, DEC_OP):
+            self.emit('{} {}= 1'.format(self.name(node.expr), '+' if node.op.type == INC_OP else '-'))
+        elif isinstance(node, FunctionCall) and node.name == 'scanf':
+            fmt, names = self.scanf(node)
+            self.emit('_, {} = {}({}, {})'.format(', '.join(names), self.builtin('scanf'), fmt, ', '.join(names)))
+        elif isinstance(node, EXPRESSIONS):
+            self.emit(self.visit(node))
+        else:
+            self.visit(node)
+
+    def body(self, node):
+        self.indent += 1
+        lines = len(self.lines)
+        self.statement(node)
+        if len(self.lines) == lines:
+            self.emit('pass')
+        self.indent -= 1
+
+    def visit_Program(self, node):
+        self.globals = [
+            self.name(child.var_node) for child in node.children if isinstance(child, VarDecl)
+        ]
+        for child in filter(lambda o: isinstance(o, FunctionDecl), node.children):
+            self.arg_types[child.func_name] = [param.type_node.value for param in child.params]
+        for child in filter(lambda o: isinstance(o, IncludeLibrary), node.children):
+            self.visit(child)
+        for child in filter(lambda o: isinstance(o, FunctionDecl), node.children):
+            self.visit(child)
+        # functions the engine may memoize
+        self.emit('_pure = {!r}'.format(tuple(
+            child.func_name for child in node.children if isinstance(child, FunctionDecl) and child.pure
+        )))
+        self.lines.extend(self.bound.values())
+        self.lines.extend(self.sites)
+        for name in self.globals:
+            self.emit('{} = None'.format(name))
+        for child in filter(lambda o: not isinstance(o, (FunctionDecl, IncludeLibrary)), node.children):
+            self.statement(child)
+        return '\n'.join(self.lines) + '\n'
+
+    def visit_IncludeLibrary(self, node):
+        for function in library(node.library_name):
+            self.builtins[function.name] = node.library_name, function
+
+    def builtin(self, name):
+        """ Python name of the builtin, bound when the program starts only if it is called """
+        if name not in self.bound:
+            self.bound[name] = '{}_b = _builtin({!r}, {!r})'.format(name, self.builtins[name][0], name)
+        return '{}_b'.format(name)
+
+    def visit_FunctionDecl(self, node):
+        self.emit('')
+        self.emit('def {}_f({}):'.format(
+            node.func_name,
+            ', '.join(self.name(param.var_node) for param in node.params)
+        ))
+        self.indent += 1
+        if self.globals:
+            self.emit('global {}'.format(', '.join(self.globals)))
+        self.indent -= 1
+        self.locals, start = [], len(self.lines)
+        self.return_type = node.type_node.value
+        self.body(node.body)
+        if self.locals:
+            # variables are None until assigned, as slots of the other engines
+            self.lines.insert(start, '    {} = None'.format(' = '.join(self.locals)))
+        self.emit('')
+
+    def visit_FunctionBody(self, node):
+        for child in node.children:
+            self.statement(child)
+
+    def visit_CompoundStmt(self, node):
+        for child in node.children:
+            self.statement(child)
+
+    def visit_ReturnStmt(self, node):
+        if isinstance(node.expression, NoOp):
+            self.emit('return')
+        else:
+            self.emit('return {}'.format(self.convert(
+                self.visit(node.expression),
+                conversion(self.return_type, node.expression.ctype)
+            )))
+
+    def visit_BreakStmt(self, node):
+        if not self.loops:
+            self.error("'break' statement not in loop at line {}".format(node.line))
+        self.emit('break')
+
+    def visit_ContinueStmt(self, node):
+        if not self.loops:
+            self.error("'continue' statement not in loop at line {}".format(node.line))
+        for line in self.loops[-1]:
+            self.emit(line)
+        self.emit('continue')
+
+    def visit_IfStmt(self, node, keyword='if'):
+        self.emit('{} {}:'.format(keyword, self.condition(node.condition)))
+        self.body(node.tbody)
+        if isinstance(node.fbody, IfStmt):
+            self.visit_IfStmt(node.fbody, 'elif')
+        elif not isinstance(node.fbody, NoOp):
+            self.emit('else:')
+            self.body(node.fbody)
+
+    def loop(self, body, before_continue):
+        self.loops.append(before_continue)
+        self.body(body)
+        self.loops.pop()
+
+    def visit_WhileStmt(self, node):
+        self.emit('while {}:'.format(self.condition(node.condition)))
+        self.loop(node.body, [])
+
+    def visit_DoWhileStmt(self, node):
+        check = ['if not {}:'.format(self.condition(node.condition)), '    break']
+        self.emit('while True:')
+        self.loop(node.body, check)
+        self.indent += 1
+        for line in check:
+            self.emit(line)
+        self.indent -= 1
+
+    def visit_ForStmt(self, node):
+        increment = self.capture(node.increment)
+        self.statement(node.setup)
+        self.emit('while {}:'.format(self.condition(node.condition)))
+        self.loop(node.body, increment)
+        self.indent += 1
+        for line in increment:
+            self.emit(line)
+        self.indent -= 1
+
+    def visit_NoOp(self, node):
+        return 'None'
+
+    def visit_Expression(self, node):
+        if len(node.children) == 1:
+            return self.visit(node.children[0])
+        return '({})[-1]'.format(', '.join(map(self.visit, node.children)))
+
+    def visit_Num(self, node):
+        return repr(node.value)
+
+    def visit_String(self, node):
+        return repr(node.value)
+
+    def visit_Var(self, node):
+        return self.name(node)
+
+    def assigned(self, node):
+        """ Value assigned to the variable, converted to its type """
+        if node.op.type == ASSIGN:
+            value = self.visit(node.right)
+        elif node.op.type in COMPOUND_OPERATORS:
+            value = self.binary(
+                COMPOUND_OPERATORS[node.op.type], self.name(node.left), self.visit(node.right),
+                node.left.ctype, node.right.ctype
+            )
+        else:
+            self.error("Unsupported assignment operator '{}' at line {}".format(node.op.value, node.line))
+        return self.convert(value, assignment_conversion(node))
+
+    def assignment(self, node):
+        """ Assignment statement """
+        op = COMPOUND_OPERATORS.get(node.op.type)
+        if op in PYTHON_OPERATORS and assignment_conversion(node) is None:
+            return '{} {}= {}'.format(self.name(node.left), PYTHON_OPERATORS[op], self.visit(node.right))
+        return '{} = {}'.format(self.name(node.left), self.assigned(node))
+
+    def visit_Assign(self, node):
+        return '({} := {})'.format(self.name(node.left), self.assigned(node))
+
+    def visit_UnOp(self, node):
+        op = node.op.type
+        if op in (INC_OP, DEC_OP):
+            name, sign = self.name(node.expr), '+' if op == INC_OP else '-'
+            if node.prefix:
+                return '({0} := {0} {1} 1)'.format(name, sign)
+            return '({0}, ({0} := {0} {1} 1))[0]'.format(name, sign)
+        if not node.prefix or op == ADD_OP:
+            return self.visit(node.expr)
+        if op == AND_OP:
+            self.error("Address of '{}' can be passed only to scanf at line {}".format(node.expr.value, node.line))
+        if op == SUB_OP:
+            return '(-{})'.format(self.visit(node.expr))
+        if op == LOG_NEG:
+            return ('(not {})' if node in self.tested else '(0 if {} else 1)').format(self.visit(node.expr))
+        return self.convert(self.visit(node.expr), TYPES[node.op.value])
+
+    def visit_BinOp(self, node):
+        op = node.op.type
+        if op in (LOG_AND_OP, LOG_OR_OP):
+            return '(1 if {} else 0)'.format(self.condition(node))
+        if op not in PYTHON_OPERATORS and op not in (DIV_OP, MOD_OP):
+            self.error("Unsupported operator '{}' at line {}".format(node.op.value, node.line))
+        value = self.binary(op, self.visit(node.left), self.visit(node.right), node.left.ctype, node.right.ctype)
+        if op in TESTS and node not in self.tested:
+            # a comparison gives 0 or 1, not a Python bool
+            return '(1 if {} else 0)'.format(value)
+        return value
+
+    def visit_TerOp(self, node):
+        return '({} if {} else {})'.format(
+            self.visit(node.texpression),
+            self.condition(node.condition),
+            self.visit(node.fexpression)
+        )
+
+    def scanf(self, node):
+        """ Return format and names of variables read by scanf """
+        fmt, *addresses = node.args
+        for address in addresses:
+            if not (isinstance(address, UnOp) and address.op.type == AND_OP and isinstance(address.expr, Var)):
+                self.error("Arguments of scanf must be addresses of variables at line {}".format(node.line))
+        return self.visit(fmt), [self.name(address.expr) for address in addresses]
+
+    def visit_FunctionCall(self, node):
+        if node.name == 'scanf':
+            fmt, names = self.scanf(node)
+            return '((_s := {}({}, {})), {}, _s[0])[-1]'.format(self.builtin('scanf'), fmt, ', '.join(names), ', '.join(
+                '({} := _s[{}])'.format(name, i) for i, name in enumerate(names, 1)
+            ))
+        if node.name in self.builtins:
+            library_name, signature = self.builtins[node.name]
+            function, args, conversions = bind(signature, node)
+            if function is signature.function:
+                name = self.builtin(node.name)
+            else:
+                # specialized once when the program starts, e.g. for the format of printf
+                name = '_site{}'.format(len(self.sites))
+                self.sites.append('{} = _specialize({!r}, {!r}, {}, {})'.format(
+                    name, library_name, node.name, self.visit(node.args[0]), len(args)
+                ))
+            return '{}({})'.format(name, ', '.join(
+                self.convert(self.visit(arg), convert) for arg, convert in zip(args, conversions)
+            ))
+        return '{}_f({})'.format(node.name, ', '.join(
+            self.convert(self.visit(arg), conversion(ctype, arg.ctype))
+            for arg, ctype in zip(node.args, self.arg_types[node.name])
+        ))
+
+    def transpile(self, tree):
+        self.tested = tested(tree)
+        return self.visit(tree)
+
+
+###############################################################################
+#                                                                             #
+#  ENGINE                                                                     #
+#                                                                             #
+###############################################################################
+
+class PythonInterpreter(object):
+    """ Run program translated to Python. Code objects are cached on the disk by the
+    hash of the source, so running the same program again skips everything up to
+    the execution, like a .pyc file does for Python. """
+
+    def __init__(self, cache_dir=CACHE_DIR, memo=None):
+        self.cache_dir = cache_dir
+        self.memo = memo            # memo.Memo of the results of pure functions, None to call them always
+
+    @staticmethod
+    def compile(tree):
+        return compile(Transpiler().transpile(tree), '<program>', 'exec')
+
+    def execute(self, code):
+        namespace = dict(RUNTIME)
+        try:
+            exec(code, namespace)
+            if self.memo is not None:
+                # calls, recursive ones too, find the functions in the namespace
+                for name in namespace['_pure']:
+                    namespace[name + '_f'] = self.memo.cache(name).memoized(namespace[name + '_f'])
+            return namespace['main_f']()
+        finally:
+            stdout.flush()
+
+    def cache_path(self, source, level=0, verbose=False):
+        key = hashlib.sha256(
+            importlib.util.MAGIC_NUMBER + bytes([VERSION, level, verbose]) + source.encode('utf-8')
+        )
+        return os.path.join(self.cache_dir, key.hexdigest() + '.bin')
+
+    def load(self, path):
+        """ Return cached (warnings, code, included libraries with their `registry.signatures`) or None """
+        try:
+            with open(path, 'rb') as file:
+                return marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def store(self, path, entry):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path + '.tmp', 'wb') as file:
+                marshal.dump(entry, file)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass    # running without cache is still correct
+
+    def run_cached(self, program, level=0, verbose=False):
+        """ Execute program given as a string or as a file object, optimized at the optimization
+        `level`, using the cache. The report of a `verbose` optimization is cached with the warnings. """
+        source = program if isinstance(program, str) else program.read()
+        if not isinstance(source, str):
+            source = source.decode('utf-8')
+
+        from ..optimization.optimizer import Optimizer     # optimization imports number of this package
+        path = self.cache_path(source, level, verbose)
+        entry = self.load(path)
+        if entry is None or any(signatures(name) != described for name, described in entry[2]):
+            # libraries may be extensions of the user, changed since the program was compiled against them
+            tree = Parser(RegexLexer(source)).parse()
+            with contextlib.redirect_stdout(io.StringIO()) as warnings:
+                SemanticAnalyzer.analyze(tree)
+                tree = Optimizer.optimize(tree, level, verbose)
+            libraries = tuple(
+                (child.library_name, signatures(child.library_name))
+                for child in tree.children if isinstance(child, IncludeLibrary)
+            )
+            entry = warnings.getvalue(), self.compile(tree), libraries
+            self.store(path, entry)
+
+        warnings, code, _ = entry
+        print(warnings, end='')
+        return self.execute(code)
+
+    def interpret(self, tree):
+        return self.execute(self.compile(tree))
@@ -0,0 +1,145 @@
+""" SCI - Simple C Interpreter """
+from .memory import Memory, STACK_SIZE
+from .memo import MISSING
+from .bytecode import *
+from ..utils.output import stdout
+
+
+class VirtualMachine(object):
+    """ Stack machine executing code produced by `Compiler`.
+    C calls do not nest Python calls: the caller is saved on an explicit call stack and the callee
+    runs in the same loop, so the recursion depth is limited only by `stack_size` of the memory. """
+
+    def __init__(self, stack_size=STACK_SIZE, memo=None):
+        self.memory = None
+        self.stack_size = stack_size
+        self.memo = memo
+        self.functions = dict()
+
+    def call(self, code, args):
+        values = self.memory.new_frame(code.name, code.frame_size)
+        values[:len(args)] = args
+        result = self.execute(code, values)
+        self.memory.del_frame()
+        return result
+
+    def execute(self, code, values):
+        """ Run code on the frame `values` until it returns. All frames share the value stack,
+        a callee starts with its arguments taken off it and returns with its result pushed on it. """
+        ops, args = code.ops, code.args
+        memory = self.memory
+        globals = memory.global_frame.values
+        stack = []
+        push, pop = stack.append, stack.pop
+        calls = []                  # (ops, args, pc, values) of the callers to return to
+        pc = 0
+        # the most frequent instructions are tested first
+        while True:
+            op = ops[pc]
+            arg = args[pc]
+            pc += 1
+            if op == LOAD_LOCAL:
+                push(values[arg])
+            elif op == LOAD_CONST:
+                push(arg)
+            elif op == BINARY_LOCAL_CONST:
+                slot, const, function = arg
+                push(function(values[slot], const))
+            elif op == BINARY_LOCALS:
+                left, right, function = arg
+                push(function(values[left], values[right]))
+            elif op == INPLACE_LOCAL_CONST:
+                slot, const, function = arg
+                values[slot] = function(values[slot], const)
+            elif op == BINARY:
+                right = pop()
+                stack[-1] = arg(stack[-1], right)
+            elif op == STORE_LOCAL:
+                values[arg] = pop()
+            elif op == JUMP_IF_TRUE:
+                if pop():
+                    pc = arg
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == LOAD_GLOBAL:
+                push(globals[arg])
+            elif op == STORE_GLOBAL:
+                globals[arg] = pop()
+            elif op == POP:
+                pop()
+            elif op == DUP:
+                push(stack[-1])
+            elif op == CALL:
+                function, argc = arg
+                calls.append((ops, args, pc, values))
+                values = memory.new_frame(function.name, function.frame_size)
+                if argc:
+                    values[:argc] = stack[-argc:]
+                    del stack[-argc:]
+                ops, args, pc = function.ops, function.args, 0
+            elif op == CALL_BUILTIN:
+                function, argc = arg
+                call_args = stack[len(stack) - argc:]
+                del stack[len(stack) - argc:]
+                if function.__name__ == 'scanf':
+                    call_args.append(self.memory)
+                push(function(*call_args))
+            elif op == RETURN:
+                if not calls:
+                    return pop()
+                memory.del_frame()
+                ops, args, pc, values = calls.pop()
+            elif op == CALL_PURE:
+                function, argc, cache = arg
+                key = tuple(stack[len(stack) - argc:])
+                result = cache.get(key)
+                if result is not MISSING:
+                    del stack[len(stack) - argc:]
+                    push(result)
+                    continue
+                # the callee returns to STORE_RESULT, which returns to the caller
+                calls.append((ops, args, pc, values))
+                calls.append(([STORE_RESULT], [(cache, key)], 0, values))
+                values = memory.new_frame(function.name, function.frame_size)
+                if argc:
+                    values[:argc] = stack[-argc:]
+                    del stack[-argc:]
+                ops, args, pc = function.ops, function.args, 0
+            elif op == STORE_RESULT:
+                cache, key = arg
+                cache.put(key, stack[-1])
+                ops, args, pc, values = calls.pop()
+            elif op == TAIL_CALL:
+                function, argc = arg
+                memory.del_frame()
+                values = memory.new_frame(function.name, function.frame_size)
+                if argc:
+                    values[:argc] = stack[-argc:]
+                    del stack[-argc:]
+                ops, args, pc = function.ops, function.args, 0
+            elif op == UNARY:
+                stack[-1] = arg(stack[-1])
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = arg
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+
+    def interpret(self, tree):
+        compiler = Compiler(self.memo)
+        init = compiler.compile(tree)
+        self.functions = compiler.functions
+        self.memory = Memory(tree.frame_size, self.stack_size)
+        try:
+            self.execute(init, self.memory.global_frame.values)
+            return self.call(self.functions['main'], [])
+        finally:
+            stdout.flush()
@@ -7,4 +7,7 @@ is that it makes the parser simpler, and decouples it from the character encodin
 """
 from . import token_type
 from . import token
-from . import lexer
\ No newline at end of file
+from . import lexer
+from . import regex_lexer
+from . import compact
+from . import stream_lexer
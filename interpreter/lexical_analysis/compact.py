@@ -0,0 +1,73 @@
+""" SCI - Simple C Interpreter """
+import sys
+from array import array
+from .token import Token
+from .token_type import ID, EOF, TokenKind
+
+KINDS = {kind.name: int(kind) for kind in TokenKind}
+
+
+class CompactTokens(object):
+    """ Whole token stream stored in parallel arrays instead of a list of Token objects.
+        kinds[i]  - integer TokenKind of the i-th token
+        lines[i]  - line the lexer stopped at after reading the i-th token
+        values[i] - position of the i-th token in `table`
+    `table` holds every distinct (type, value) pair only once and identifiers are
+    interned, so a token costs 10 bytes of arrays instead of a separate object. """
+
+    def __init__(self):
+        self.kinds = array('H')
+        self.lines = array('I')
+        self.values = array('I')
+        self.table = []
+        self.positions = dict()
+
+    @classmethod
+    def from_lexer(cls, lexer):
+        """ Read all tokens (up to and including EOF) from the lexer """
+        tokens = cls()
+        while True:
+            token = lexer.get_next_token
+            tokens.append(token, lexer.line)
+            if token.type == EOF:
+                return tokens
+
+    def append(self, token, line):
+        # type of the value is a part of the key, since 1 == 1.0 for the dict
+        key = (token.type, type(token.value), token.value)
+        position = self.positions.get(key)
+        if position is None:
+            value = sys.intern(token.value) if token.type == ID else token.value
+            position = self.positions[key] = len(self.table)
+            self.table.append(Token(token.type, value))
+        self.kinds.append(KINDS[token.type])
+        self.lines.append(line)
+        self.values.append(position)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        return self.table[self.values[index]]
+
+    def reader(self):
+        return TokenReader(self)
+
+
+class TokenReader(object):
+    """ Cursor over CompactTokens with the interface of a lexer, so it can feed the Parser """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.line = 1
+
+    @property
+    def get_next_token(self):
+        """ Return next token, EOF token is repeated once the stream is exhausted """
+        tokens = self.tokens
+        pos = self.pos
+        if pos < len(tokens.kinds) - 1:
+            self.pos = pos + 1
+        self.line = tokens.lines[pos]
+        return tokens.table[tokens.values[pos]]
@@ -103,7 +103,7 @@ class Lexer(object):
         """ Return string written in code without double quotes"""
         result = ''
         self.advance()
-        while self.current_char is not '"':
+        while self.current_char != '"':
             if self.current_char is None:
                 self.error(
                     message='Unfinished string with \'"\' at line {}'.format(self.line)
@@ -293,7 +293,7 @@ class Lexer(object):
 
             if self.current_char == '^':
                 self.advance()
-                return Token(XOR_OP, '|')
+                return Token(XOR_OP, '^')
 
             if self.current_char == '+':
                 self.advance()
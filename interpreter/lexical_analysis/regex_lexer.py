@@ -0,0 +1,100 @@
+""" SCI - Simple C Interpreter """
+import re
+from .token_type import *
+from .token import Token
+from .lexer import RESERVED_KEYWORDS, LexicalError
+
+OPERATORS = {
+    '<<=': LEFT_ASSIGN, '>>=': RIGHT_ASSIGN,
+    '+=': ADD_ASSIGN, '-=': SUB_ASSIGN, '*=': MUL_ASSIGN, '/=': DIV_ASSIGN, '%=': MOD_ASSIGN,
+    '&=': AND_ASSIGN, '^=': XOR_ASSIGN, '|=': OR_ASSIGN,
+    '>>': RIGHT_OP, '<<': LEFT_OP, '++': INC_OP, '--': DEC_OP,
+    '&&': LOG_AND_OP, '||': LOG_OR_OP,
+    '<=': LE_OP, '>=': GE_OP, '==': EQ_OP, '!=': NE_OP,
+    '<': LT_OP, '>': GT_OP, '=': ASSIGN, '!': LOG_NEG,
+    '&': AND_OP, '|': OR_OP, '^': XOR_OP,
+    '+': ADD_OP, '-': SUB_OP, '*': MUL_OP, '/': DIV_OP, '%': MOD_OP,
+    '(': LPAREN, ')': RPAREN, '{': LBRACKET, '}': RBRACKET,
+    ';': SEMICOLON, ':': COLON, ',': COMMA, '.': DOT, '#': HASH, '?': QUESTION_MARK,
+}
+
+# Operator tokens carry no information except their type, so one instance is shared
+OPERATOR_TOKENS = {spelling: Token(token_type, spelling) for spelling, token_type in OPERATORS.items()}
+
+# Order of alternatives matters: complete comments, strings and chars before their
+# unterminated fallbacks, an unterminated comment before the '/' operator, and the
+# longest operators first, so the first alternative that matches is the longest one.
+TOKEN_SPECIFICATION = (
+    ('SKIP', r'(?:\s+|//[^\n]*\n?|/\*(?s:.*?)\*/)+'),
+    ('UNTERMINATED_COMMENT', r'/\*(?s:.*)'),
+    ('ID', r'[^\W\d_][^\W_]*'),
+    ('OPERATOR', '|'.join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True))),
+    ('NUMBER', r'\d+(?:\.\d*)?'),
+    ('STRING', r'"[^"]*"'),
+    ('CHAR', r"'(?:\\n|(?s:.))'"),
+    ('UNTERMINATED_STRING', r'"'),
+    ('UNTERMINATED_CHAR', r"'"),
+    ('INVALID', r'(?s:.)'),
+)
+
+MASTER_PATTERN = re.compile('|'.join(
+    '(?P<{}>{})'.format(name, pattern) for name, pattern in TOKEN_SPECIFICATION
+))
+
+
+class RegexLexer(object):
+    """ Table driven lexer.
+    Produces the same stream of tokens as `Lexer`, but the input is split with one
+    precompiled `MASTER_PATTERN` instead of a chain of character tests. Tokens are
+    immutable, so equal spellings share one Token instance. """
+
+    def __init__(self, text):
+        self.text = text
+        self.line = 1
+        self.stream = self.tokens()
+
+    def error(self, message):
+        raise LexicalError(message)
+
+    def make_token(self, kind, text):
+        """ Create token for spelling `text` matched by alternative `kind` """
+        if kind == 'ID':
+            return Token(ID, text)
+        if kind == 'NUMBER':
+            if '.' in text:
+                return Token(REAL_CONST, float(text))
+            return Token(INTEGER_CONST, int(text))
+        if kind == 'STRING':
+            return Token(STRING, text[1:-1].replace('\\n', '\n'))
+        if kind == 'CHAR':
+            return Token(CHAR_CONST, ord('\n') if text == "'\\n'" else ord(text[1]))
+        if kind == 'UNTERMINATED_COMMENT':
+            self.line += text.count('\n')
+            self.error("Unterminated comment at line {}".format(self.line))
+        if kind == 'UNTERMINATED_STRING':
+            self.error('Unfinished string with \'"\' at line {}'.format(self.line))
+        if kind == 'UNTERMINATED_CHAR':
+            self.error("Unclosed char constant at line {}".format(self.line))
+        self.error("Invalid char {} at line {}".format(text, self.line))
+
+    def tokens(self):
+        """ Generate all tokens from the input, including the closing EOF token """
+        known = dict(OPERATOR_TOKENS)
+        known.update(RESERVED_KEYWORDS)
+
+        for match in MASTER_PATTERN.finditer(self.text):
+            kind = match.lastgroup
+            text = match.group()
+            if kind == 'SKIP':
+                self.line += text.count('\n')
+                continue
+            token = known.get(text)
+            if token is None:
+                token = known[text] = self.make_token(kind, text)
+            yield token
+        yield Token(EOF, None)
+
+    @property
+    def get_next_token(self):
+        """ Return next token from the input, EOF once the input is exhausted """
+        return next(self.stream, None) or Token(EOF, None)
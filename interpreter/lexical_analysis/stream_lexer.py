@@ -0,0 +1,72 @@
+""" SCI - Simple C Interpreter """
+import codecs
+from .token_type import EOF
+from .token import Token
+from .lexer import RESERVED_KEYWORDS
+from .regex_lexer import RegexLexer, MASTER_PATTERN, OPERATOR_TOKENS
+
+# Alternatives which could still grow into a complete token if more input follows
+INCOMPLETE = ('UNTERMINATED_COMMENT', 'UNTERMINATED_STRING', 'UNTERMINATED_CHAR')
+
+# Shared tokens are dropped once there are more distinct spellings than this
+CACHE_SIZE = 4096
+
+
+class StreamLexer(RegexLexer):
+    """ Lexer reading its input lazily, chunk by chunk.
+    `source` is anything with `read(size)`: a text file, a binary file or an `mmap`
+    object (bytes are decoded incrementally). Only the current chunk and the token
+    that crosses its end are kept in memory, so memory used by lexing does not
+    depend on the size of the input. """
+
+    def __init__(self, source, chunk_size=1 << 16, encoding='utf-8'):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.line = 1
+        self.stream = self.tokens()
+
+    def read(self):
+        """ Read next chunk of input as a string, empty string at the end of input """
+        while True:
+            chunk = self.source.read(self.chunk_size)
+            if isinstance(chunk, str):
+                return chunk
+            text = self.decoder.decode(chunk, final=not chunk)
+            if text or not chunk:   # chunk could end in the middle of a multibyte character
+                return text
+
+    def tokens(self):
+        """ Generate all tokens from the input, including the closing EOF token """
+        known = dict(OPERATOR_TOKENS)
+        known.update(RESERVED_KEYWORDS)
+
+        buffer = ''
+        at_end = False
+        while not at_end or buffer:
+            if not at_end:
+                chunk = self.read()
+                at_end = not chunk
+                buffer += chunk
+
+            pos = 0
+            for match in MASTER_PATTERN.finditer(buffer):
+                kind = match.lastgroup
+                if not at_end and (match.end() == len(buffer) or kind in INCOMPLETE):
+                    break   # token may continue in the next chunk
+                pos = match.end()
+                text = match.group()
+                if kind == 'SKIP':
+                    self.line += text.count('\n')
+                    continue
+                token = known.get(text)
+                if token is None:
+                    if len(known) > CACHE_SIZE:
+                        known = dict(OPERATOR_TOKENS)
+                        known.update(RESERVED_KEYWORDS)
+                    token = known[text] = self.make_token(kind, text)
+                yield token
+            else:
+                pos = len(buffer)
+            buffer = buffer[pos:]
+        yield Token(EOF, None)
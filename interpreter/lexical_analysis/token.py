@@ -1,6 +1,7 @@
 class Token(object):
     """ This class represents Token
     Output from Lexical analysis is list of tokens"""
+    __slots__ = ('type', 'value')
 
     def __init__(self, type, value):
         self.type = type
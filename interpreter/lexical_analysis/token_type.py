@@ -1,3 +1,5 @@
+from enum import IntEnum
+
 CHAR, INT, FLOAT, DOUBLE, VOID = 'CHAR', 'INT', 'FLOAT', 'DOUBLE', 'VOID'
 CHAR_CONST, INTEGER_CONST, REAL_CONST = 'CHAR_CONST', 'INTEGER_CONST', 'REAL_CONST'
 STRING = 'STRING'
@@ -29,6 +31,13 @@ BREAK, CONTINUE = 'BREAK', 'CONTINUE'
 
 EOF = 'EOF'
 
-
-
-
+# Integer codes of token types, member names are equal to the string token types above
+TokenKind = IntEnum('TokenKind', [
+    CHAR, INT, FLOAT, DOUBLE, VOID, CHAR_CONST, INTEGER_CONST, REAL_CONST, STRING,
+    ADD_OP, SUB_OP, MUL_OP, DIV_OP, MOD_OP, INC_OP, DEC_OP, AND_OP, OR_OP, XOR_OP, LEFT_OP, RIGHT_OP,
+    LT_OP, GT_OP, LE_OP, GE_OP, EQ_OP, NE_OP, LOG_AND_OP, LOG_OR_OP, LOG_NEG,
+    ASSIGN, MUL_ASSIGN, DIV_ASSIGN, MOD_ASSIGN, ADD_ASSIGN, SUB_ASSIGN,
+    LEFT_ASSIGN, RIGHT_ASSIGN, AND_ASSIGN, XOR_ASSIGN, OR_ASSIGN,
+    LPAREN, RPAREN, LBRACKET, RBRACKET, COMMA, DOT, SEMICOLON, HASH, COLON, QUESTION_MARK,
+    ID, IF, ELSE, FOR, WHILE, RETURN, DO, BREAK, CONTINUE, EOF,
+])
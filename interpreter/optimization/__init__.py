@@ -0,0 +1,12 @@
+""" Optimization rewrites the analyzed abstract syntax tree to a tree computing the same results with less work.
+    Passes run after semantic analysis, so they can rely on the static type of every expression (`node.ctype`)
+and on variables resolved to their slots. Every pass is a tree visitor returning the node which replaces the
+visited one. The optimization level selects the passes, level 0 runs none of them.
+"""
+from . import base
+from . import folding
+from . import ir
+from . import inlining
+from . import ssa
+from . import loops
+from . import optimizer
@@ -0,0 +1,63 @@
+""" SCI - Simple C Interpreter """
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..utils.utils import MessageColor
+
+# Binding strength of C binary operators, for printing expressions
+PRECEDENCE = {
+    MUL_OP: 10, DIV_OP: 10, MOD_OP: 10,
+    ADD_OP: 9, SUB_OP: 9,
+    LEFT_OP: 8, RIGHT_OP: 8,
+    LT_OP: 7, GT_OP: 7, LE_OP: 7, GE_OP: 7,
+    EQ_OP: 6, NE_OP: 6,
+    AND_OP: 5,
+    XOR_OP: 4,
+    OR_OP: 3,
+    LOG_AND_OP: 2,
+    LOG_OR_OP: 1,
+}
+
+
+def source(node):
+    """ C source of expression """
+    if isinstance(node, (Num, Var)):
+        return str(node.value)
+    if isinstance(node, String):
+        return '"{}"'.format(node.value.encode('unicode_escape').decode())
+    if isinstance(node, BinOp):
+        precedence = PRECEDENCE[node.op.type]
+        left, right = source(node.left), source(node.right)
+        if isinstance(node.left, BinOp) and PRECEDENCE[node.left.op.type] < precedence:
+            left = '({})'.format(left)
+        if isinstance(node.right, BinOp) and PRECEDENCE[node.right.op.type] <= precedence:
+            right = '({})'.format(right)
+        return '{} {} {}'.format(left, node.op.value, right)
+    if isinstance(node, UnOp):
+        operand = source(node.expr)
+        if isinstance(node.expr, (BinOp, TerOp, Assign)):
+            operand = '({})'.format(operand)
+        if not node.prefix:
+            return operand + node.op.value
+        if node.op.type in (CHAR, INT, FLOAT, DOUBLE):
+            return '({}){}'.format(node.op.value, operand)
+        return node.op.value + operand
+    if isinstance(node, TerOp):
+        return '{} ? {} : {}'.format(source(node.condition), source(node.texpression), source(node.fexpression))
+    if isinstance(node, Assign):
+        return '{} {} {}'.format(source(node.left), node.op.value, source(node.right))
+    if isinstance(node, FunctionCall):
+        return '{}({})'.format(node.name, ', '.join(map(source, node.args)))
+    if isinstance(node, Expression):
+        return '({})'.format(', '.join(map(source, node.children)))
+    return ''
+
+
+class Pass(NodeVisitor):
+    """ Optimization pass, `verbose` passes report what they changed """
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def report(self, message):
+        if self.verbose:
+            print(MessageColor.OKBLUE + message + MessageColor.ENDC)
@@ -0,0 +1,193 @@
+""" SCI - Simple C Interpreter """
+from ..lexical_analysis.token import Token
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..interpreter.number import *
+from .base import Pass
+
+# Operators whose result is always 0 or 1
+BOOLEAN_OPERATORS = (LT_OP, GT_OP, LE_OP, GE_OP, EQ_OP, NE_OP, LOG_AND_OP, LOG_OR_OP, LOG_NEG)
+
+# Operators leaving the left operand unchanged if the right one is the key
+RIGHT_IDENTITIES = {
+    ADD_OP: 0, SUB_OP: 0, MUL_OP: 1, DIV_OP: 1,
+    OR_OP: 0, XOR_OP: 0, LEFT_OP: 0, RIGHT_OP: 0,
+}
+
+# Operators leaving the right operand unchanged if the left one is the key
+LEFT_IDENTITIES = {ADD_OP: 0, MUL_OP: 1, OR_OP: 0, XOR_OP: 0}
+
+
+def constant(value, ctype, line):
+    """ Num node holding `value` of the C type `ctype` """
+    value = TYPES[ctype](value)
+    if ctype == 'char':
+        ttype = CHAR_CONST
+    else:
+        ttype = INTEGER_CONST if isinstance(value, int) else REAL_CONST
+    node = Num(Token(ttype, value), line)
+    node.ctype = ctype
+    return node
+
+
+def is_boolean(node):
+    """ Whether the value of expression is always 0 or 1 """
+    return isinstance(node, (BinOp, UnOp)) and node.op.type in BOOLEAN_OPERATORS and (
+        isinstance(node, BinOp) or node.prefix
+    )
+
+
+class ConstantFolder(Pass):
+    """ Replace operators over Num literals by their result and drop single child
+    Expression wrappers. Every visit returns the node replacing the visited one. """
+
+    simplify = False
+
+    def statements(self, nodes):
+        return [child for child in map(self.visit, nodes) if not isinstance(child, NoOp)]
+
+    def condition(self, node):
+        """ Visit condition, whose value is only tested for being nonzero """
+        node = self.visit(node)
+        while self.simplify and isinstance(node, UnOp) and node.op.type == LOG_NEG and \
+                isinstance(node.expr, UnOp) and node.expr.op.type == LOG_NEG:
+            node = node.expr.expr
+        return node
+
+    def visit_Program(self, node):
+        node.children = list(map(self.visit, node.children))
+        return node
+
+    def visit_FunctionDecl(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_FunctionBody(self, node):
+        node.children = self.statements(node.children)
+        return node
+
+    def visit_CompoundStmt(self, node):
+        node.children = self.statements(node.children)
+        return node
+
+    def visit_IfStmt(self, node):
+        node.condition = self.condition(node.condition)
+        node.tbody, node.fbody = self.visit(node.tbody), self.visit(node.fbody)
+        if self.simplify and isinstance(node.condition, Num):
+            return node.tbody if node.condition.value else node.fbody
+        return node
+
+    def visit_WhileStmt(self, node):
+        node.condition = self.condition(node.condition)
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_DoWhileStmt(self, node):
+        return self.visit_WhileStmt(node)
+
+    def visit_ForStmt(self, node):
+        node.setup = self.visit(node.setup)
+        node.condition = self.condition(node.condition)
+        node.increment = self.visit(node.increment)
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_ReturnStmt(self, node):
+        node.expression = self.visit(node.expression)
+        return node
+
+    def visit_Expression(self, node):
+        node.children = list(map(self.visit, node.children))
+        if self.simplify:
+            # variables and constants before the last child give unused values
+            node.children = [
+                child for child in node.children[:-1] if not isinstance(child, (Num, String, Var, NoOp))
+            ] + node.children[-1:]
+        return node.children[0] if len(node.children) == 1 else node
+
+    def visit_Assign(self, node):
+        node.right = self.visit(node.right)
+        return node
+
+    def visit_FunctionCall(self, node):
+        node.args = list(map(self.visit, node.args))
+        return node
+
+    def visit_TerOp(self, node):
+        node.condition = self.condition(node.condition)
+        node.texpression, node.fexpression = self.visit(node.texpression), self.visit(node.fexpression)
+        if self.simplify and isinstance(node.condition, Num):
+            return node.texpression if node.condition.value else node.fexpression
+        return node
+
+    def visit_UnOp(self, node):
+        node.expr = self.visit(node.expr)
+        op = node.op.type
+        if not node.prefix or op not in UNARY_OPERATORS:
+            return node
+        if isinstance(node.expr, Num):
+            return constant(UNARY_OPERATORS[op](node.expr.value), node.ctype, node.line)
+        if self.simplify and op == LOG_NEG and is_boolean(node.expr) and node.expr.op.type == LOG_NEG and \
+                is_boolean(node.expr.expr):
+            # !!x is x if x already is 0 or 1
+            return node.expr.expr
+        return node
+
+    def visit_BinOp(self, node):
+        node.left, node.right = self.visit(node.left), self.visit(node.right)
+        op, left, right = node.op.type, node.left, node.right
+
+        if op in (LOG_AND_OP, LOG_OR_OP):
+            if isinstance(left, Num) and (isinstance(right, Num) or bool(left.value) == (op == LOG_OR_OP)):
+                # left operand decides, or both are known
+                value = left.value and right.value if op == LOG_AND_OP else left.value or right.value
+                return constant(truth(value), node.ctype, node.line)
+            return node
+
+        if isinstance(left, Num) and isinstance(right, Num):
+            try:
+                value = OPERATORS[op, left.ctype, right.ctype](left.value, right.value)
+            except (ArithmeticError, TypeError):
+                return node     # the error is reported when executed
+            return constant(value, node.ctype, node.line)
+
+        if self.simplify:
+            # identity must not change the type of the result
+            if isinstance(right, Num) and RIGHT_IDENTITIES.get(op, None) == right.value and \
+                    TYPES.get(left.ctype) is TYPES[node.ctype]:
+                return left
+            if isinstance(left, Num) and LEFT_IDENTITIES.get(op, None) == left.value and \
+                    TYPES.get(right.ctype) is TYPES[node.ctype]:
+                return right
+        return node
+
+    def visit_Num(self, node):
+        return node
+
+    def visit_String(self, node):
+        return node
+
+    def visit_Var(self, node):
+        return node
+
+    def visit_VarDecl(self, node):
+        return node
+
+    def visit_IncludeLibrary(self, node):
+        return node
+
+    def visit_BreakStmt(self, node):
+        return node
+
+    def visit_ContinueStmt(self, node):
+        return node
+
+    def visit_NoOp(self, node):
+        return node
+
+
+class Simplifier(ConstantFolder):
+    """ Constant folding together with algebraic identities (`x*1`, `x+0`, `!!x`) and
+    pruning of `if` branches and `?:` operands behind a constant condition """
+
+    simplify = True
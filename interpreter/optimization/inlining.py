@@ -0,0 +1,204 @@
+""" SCI - Simple C Interpreter """
+import copy
+
+from ..lexical_analysis.token import Token
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.table import LOCAL_FRAME
+from ..interpreter.number import conversion
+from .base import Pass, source
+from .ssa import declare, rewrite
+
+# Largest function inlined, in nodes of the expression replacing its calls
+BUDGET = 40
+
+# Statements which have no equivalent expression
+LOOPS = (WhileStmt, DoWhileStmt, ForStmt, BreakStmt, ContinueStmt)
+
+
+def size(nodes):
+    """ Number of nodes of the trees """
+    return sum(1 for node in nodes for _ in walk(node))
+
+
+def block(node):
+    """ Statements of the branch of if """
+    if node is None or isinstance(node, NoOp):
+        return []
+    return list(node.children) if isinstance(node, CompoundStmt) else [node]
+
+
+class Inliner(Pass):
+    """ Replace calls of small non-recursive functions by their bodies, saving the frame of every call.
+
+    A body made of expressions, declarations, `if` and `return` statements, without loops, is translated
+    to an expression: `if(c) return x; return y;` becomes `c ? x : y`. A call becomes a comma expression
+    assigning the arguments to the parameters, followed by that expression. Parameters and locals of
+    the function get new slots in the frame of the caller at every call, so they never clash with its
+    variables or with another inlined call. Functions are inlined into their callers after the calls in
+    their own bodies are inlined.
+    """
+
+    def visit_Program(self, node):
+        self.functions = {child.func_name: child for child in node.children if isinstance(child, FunctionDecl)}
+        self.bodies = dict()        # name -> expression computing the result, None if the function stays
+        recursive = self.recursive()
+        called = set().union(*(function.calls for function in self.functions.values()))
+        for function in self.order():
+            self.inline(function)
+            if function.func_name not in recursive and function.func_name in called:
+                self.bodies[function.func_name] = self.expression(function)
+        return node
+
+    def order(self):
+        """ Functions, every function after the functions it calls, apart from recursive calls """
+        order, visited = [], set()
+
+        def visit(function):
+            visited.add(function.func_name)
+            for name in sorted(function.calls):
+                if name not in visited:
+                    visit(self.functions[name])
+            order.append(function)
+
+        for function in self.functions.values():
+            if function.func_name not in visited:
+                visit(function)
+        return order
+
+    def recursive(self):
+        """ Names of the functions which may call themselves """
+        recursive = set()
+        for name, function in self.functions.items():
+            seen, stack = set(), list(function.calls)
+            while stack:
+                called = stack.pop()
+                if called not in seen:
+                    seen.add(called)
+                    stack.extend(self.functions[called].calls)
+            if name in seen:
+                recursive.add(name)
+        return recursive
+
+    # -- function bodies as expressions ---------------------------------------
+
+    def expression(self, function):
+        """ Expressions computing the result of the function from its parameters, None if the body
+        has no such translation or it is over the budget """
+        children = self.sequence(function.body.children, function, BUDGET)
+        if children is None or size(children) > BUDGET:
+            return None
+        return children
+
+    def sequence(self, statements, function, budget):
+        """ Translate statements to expressions evaluated in order, the last one giving the result.
+        Give up, returning None, as soon as the expressions take more than `budget` nodes: every `if`
+        translates the statements after it twice. """
+        void = function.type_node.value == 'void'
+        children, used, statements, index = [], 0, list(statements), 0
+        while index < len(statements):
+            statement = statements[index]
+            index += 1
+            if isinstance(statement, (VarDecl, NoOp)):
+                continue
+            if isinstance(statement, LOOPS):
+                return None
+            if isinstance(statement, CompoundStmt):
+                statements[index:index] = statement.children
+                continue
+            if isinstance(statement, ReturnStmt):
+                if isinstance(statement.expression, NoOp):
+                    return children if void else None
+                returned = self.returned(statement.expression, function)
+                return children + [returned] if used + size([returned]) <= budget else None
+            if isinstance(statement, IfStmt):
+                if void:
+                    return None
+                # both branches continue with the rest of the statements
+                rest = statements[index:]
+                used += 1 + size([statement.condition])
+                texpression = self.sequence(block(statement.tbody) + rest, function, budget - used)
+                if not texpression:
+                    return None
+                used += size(texpression)
+                fexpression = self.sequence(block(statement.fbody) + copy.deepcopy(rest), function, budget - used)
+                if not fexpression:
+                    return None
+                ternary = TerOp(
+                    statement.condition, self.join(texpression, function), self.join(fexpression, function),
+                    statement.line
+                )
+                ternary.ctype = function.type_node.value
+                return children + [ternary]
+            used += size([statement])
+            if used > budget:
+                return None
+            children.append(statement)
+        # the end of a function without return gives no value
+        return children if void else None
+
+    @staticmethod
+    def join(children, function):
+        """ Single expression of the expressions """
+        if len(children) == 1:
+            return children[0]
+        expression = Expression(children, children[0].line)
+        expression.ctype = function.type_node.value
+        return expression
+
+    @staticmethod
+    def returned(node, function):
+        """ Returned expression converted to the return type, as the call converts it """
+        ctype = function.type_node.value
+        if conversion(ctype, node.ctype) is None:
+            return node
+        cast = UnOp(Token(ctype.upper(), ctype), node, node.line)
+        cast.ctype = ctype
+        return cast
+
+    # -- calls ----------------------------------------------------------------
+
+    def inline(self, caller):
+        """ Replace the calls of inlined functions in the body of the caller """
+        calls = [
+            node for node in walk(caller.body)
+            if isinstance(node, FunctionCall) and self.bodies.get(node.name) is not None
+        ]
+        for node in calls:
+            self.report('Inlined `{}` in `{}` at line {}'.format(source(node), caller.func_name, node.line))
+        substitutions = dict()
+        for node in reversed(calls):    # calls in the arguments first
+            substitutions[node] = self.call(caller, node, substitutions)
+        rewrite(caller.body, substitutions)
+
+    def call(self, caller, node, substitutions):
+        """ Expression of the call of an inlined function, its variables moved to new slots of the caller.
+        Arguments which are inlined calls are replaced by their `substitutions`. """
+        function = self.functions[node.name]
+        base = caller.frame_size
+        caller.frame_size += function.frame_size
+
+        def moved(var, type_node):
+            moved = Var(var.token, node.line)
+            moved.frame, moved.slot, moved.ctype = LOCAL_FRAME, var.slot + base, type_node.value
+            return moved
+
+        declarations = [(param.var_node, param.type_node) for param in function.params] + [
+            (child.var_node, child.type_node) for child in walk(function.body) if isinstance(child, VarDecl)
+        ]
+        for var, type_node in declarations:
+            declare(caller, moved(var, type_node), Type(type_node.token, node.line))
+
+        children = []
+        for param, arg in zip(function.params, node.args):
+            arg = substitutions.get(arg, arg)
+            assign = Assign(moved(param.var_node, param.type_node), Token(ASSIGN, '='), arg, node.line)
+            assign.ctype = param.type_node.value
+            children.append(assign)
+        body = copy.deepcopy(self.bodies[node.name])
+        for child in walk(Expression(body, node.line)):
+            if isinstance(child, Var) and child.frame == LOCAL_FRAME:
+                child.slot += base
+        expression = Expression(children + body or [NoOp(node.line)], node.line)
+        expression.ctype = node.ctype
+        return expression
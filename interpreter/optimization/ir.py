@@ -0,0 +1,515 @@
+""" SCI - Simple C Interpreter """
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.table import LOCAL_FRAME
+from ..interpreter.number import assignment_conversion
+
+###############################################################################
+#                                                                             #
+#  VALUES AND INSTRUCTIONS                                                    #
+#                                                                             #
+###############################################################################
+
+# Kinds of SSA values
+CONST = 'CONST'         # Num literal
+PARAM = 'PARAM'         # parameter at the entry of the function
+UNDEF = 'UNDEF'         # variable not assigned yet
+PHI = 'PHI'             # merge of the values of a variable coming from the predecessors
+STORE = 'STORE'         # value of a variable after an assignment, `operands[0]` is the assigned value
+EXPR = 'EXPR'           # result of a pure operator, `op` applied to `operands`
+READ = 'READ'           # variable read, replaced by the reaching definition once SSA is built
+OPAQUE = 'OPAQUE'       # anything else: calls, memory, values of &&, || and ?:
+
+
+class Value(object):
+    """ SSA value. Values are never mutated once SSA is built, a value found equal to another
+    one gets `replacement`; `resolve` follows the replacements. """
+
+    def __init__(self, kind, node=None, var=None, op=None, operands=()):
+        self.kind = kind
+        self.node = node                # node computing the value
+        self.var = var                  # slot of the variable of PARAM, UNDEF, PHI, STORE and READ
+        self.op = op                    # operator of EXPR, token type
+        self.operands = list(operands)
+        self.block = None               # block computing the value
+        self.replacement = None
+        self.lvalue = False             # READ of the variable a compound assignment or ++ changes
+        self.users = []                 # phis using this phi
+        self.convert = None             # conversion done by STORE
+
+    def resolve(self):
+        value = self
+        while value.replacement is not None:
+            value = value.replacement
+        return value
+
+    def __repr__(self):
+        return '{}{}'.format(self.kind, '' if self.var is None else '({})'.format(self.var))
+
+
+class Instr(object):
+    """ Instruction of a basic block: `node` evaluated to `value`. `owner` of a READ is the
+    STORE whose assigned value needs it, None if the read is needed anyway. """
+
+    def __init__(self, value, node, owner=None):
+        self.value = value
+        self.node = node
+        self.owner = owner
+        self.block = None
+        self.index = 0
+
+
+class Block(object):
+    """ Basic block of the control flow graph """
+
+    def __init__(self, number):
+        self.number = number
+        self.instrs = []
+        self.preds = []
+        self.succs = []
+        self.defs = dict()      # variable -> its value at the end of the block, if assigned in the block
+        self.entry = dict()     # variable -> its value at the start of the block, filled on demand
+
+    def append(self, instr):
+        instr.block, instr.index = self, len(self.instrs)
+        self.instrs.append(instr)
+
+    def __repr__(self):
+        return 'B{}'.format(self.number)
+
+
+class Loop(object):
+    """ Loop statement: `blocks` executed by its iterations, including blocks of nested loops,
+    and the `preheader` block entering the loop """
+
+    def __init__(self, node, preheader, start):
+        self.node = node
+        self.preheader = preheader
+        self.start = start              # number of the first block of the loop
+        self.blocks = set()
+
+
+def is_pure(node):
+    """ Whether evaluating expression changes nothing """
+    for child in walk(node):
+        if isinstance(child, (FunctionCall, Assign)):
+            return False
+        if isinstance(child, UnOp) and child.op.type in (INC_OP, DEC_OP):
+            return False
+    return True
+
+
+###############################################################################
+#                                                                             #
+#  BUILDER                                                                    #
+#                                                                             #
+###############################################################################
+
+class Function(object):
+    """ Control flow graph of a function in SSA form. Scalar locals whose address is never
+    taken are SSA variables (identified by their slot), other variables are memory. """
+
+    def __init__(self, node):
+        self.node = node
+        self.blocks = []
+        self.instrs = []
+        self.memory = {
+            child.expr.slot for child in walk(node.body)
+            if isinstance(child, UnOp) and child.op.type == AND_OP and isinstance(child.expr, Var) and
+            child.expr.frame == LOCAL_FRAME
+        }
+        self.initial = dict()               # variable -> PARAM or UNDEF value
+        self.entry = self.new_block()
+        self.current = self.entry
+        self.statements = []                # (statement, block it starts in)
+        self.loops = []                     # Loop of every loop statement, enclosing loops first
+        self.targets = []                   # (break target, continue target) of enclosing loops
+        self.owner = None                   # STORE whose value is being built
+        self.build()
+
+    # -- control flow graph ---------------------------------------------------
+
+    def new_block(self):
+        block = Block(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    @staticmethod
+    def edge(source, target):
+        source.succs.append(target)
+        target.preds.append(source)
+
+    def jump(self, target):
+        """ End the current block by a jump to `target`, code behind it is unreachable """
+        self.edge(self.current, target)
+        self.current = self.new_block()
+
+    def branch(self, condition, true, false):
+        """ End the current block by a conditional jump, a constant condition has a single successor """
+        if not isinstance(condition, Num) or condition.value:
+            self.edge(self.current, true)
+        if not isinstance(condition, Num) or not condition.value:
+            self.edge(self.current, false)
+
+    def emit(self, value, node):
+        value.block = self.current
+        instr = Instr(value, node, self.owner)
+        self.current.append(instr)
+        self.instrs.append(instr)
+        return value
+
+    def is_ssa(self, var):
+        return var.frame == LOCAL_FRAME and var.slot not in self.memory
+
+    def build(self):
+        for param in self.node.params:
+            self.initial[param.var_node.slot] = Value(PARAM, param, param.var_node.slot)
+        self.statement(self.node.body)
+
+    # -- statements -----------------------------------------------------------
+
+    def statement(self, node):
+        if isinstance(node, (FunctionBody, CompoundStmt)):
+            for child in node.children:
+                self.statement(child)
+            return
+        self.statements.append((node, self.current))
+        method = getattr(self, 'build_' + type(node).__name__, None)
+        if method is not None:
+            method(node)
+        elif isinstance(node, Expression):
+            for child in node.children:
+                self.statement(child)
+        elif isinstance(node, Assign):
+            self.assign(node, statement=True)
+        elif isinstance(node, UnOp) and node.op.type in (INC_OP, DEC_OP):
+            self.increment(node, statement=True)
+        elif not isinstance(node, (VarDecl, NoOp)):
+            self.expression(node)
+
+    def build_IfStmt(self, node):
+        self.expression(node.condition)
+        tbody, fbody, end = self.new_block(), self.new_block(), self.new_block()
+        self.branch(node.condition, tbody, fbody)
+        self.current = tbody
+        self.statement(node.tbody)
+        self.edge(self.current, end)
+        self.current = fbody
+        self.statement(node.fbody)
+        self.edge(self.current, end)
+        self.current = end
+
+    def loop(self, node, body, step, end):
+        """ Build body of a loop, `step` is the target of continue """
+        self.targets.append((end, step))
+        self.current = body
+        self.statement(node.body)
+        self.targets.pop()
+        self.edge(self.current, step)
+
+    def enter(self, node):
+        """ Start loop entered from the current block, return it and the block following it """
+        loop = Loop(node, self.current, len(self.blocks))
+        self.loops.append(loop)
+        return loop, self.new_block()
+
+    def leave(self, loop, end):
+        loop.blocks.update(self.blocks[loop.start:])
+        loop.blocks.discard(end)
+        self.current = end
+
+    def build_WhileStmt(self, node):
+        loop, end = self.enter(node)
+        condition, body = self.new_block(), self.new_block()
+        self.edge(self.current, condition)
+        self.current = condition
+        self.expression(node.condition)
+        self.branch(node.condition, body, end)
+        self.loop(node, body, condition, end)
+        self.leave(loop, end)
+
+    def build_DoWhileStmt(self, node):
+        loop, end = self.enter(node)
+        body, condition = self.new_block(), self.new_block()
+        self.edge(self.current, body)
+        self.loop(node, body, condition, end)
+        self.current = condition
+        self.expression(node.condition)
+        self.branch(node.condition, body, end)
+        self.leave(loop, end)
+
+    def build_ForStmt(self, node):
+        self.statement(node.setup)
+        loop, end = self.enter(node)
+        condition, body, increment = self.new_block(), self.new_block(), self.new_block()
+        self.edge(self.current, condition)
+        self.current = condition
+        self.expression(node.condition)
+        self.branch(node.condition, body, end)
+        self.loop(node, body, increment, end)
+        self.current = increment
+        self.statement(node.increment)
+        self.edge(self.current, condition)
+        self.leave(loop, end)
+
+    def build_ReturnStmt(self, node):
+        self.expression(node.expression)
+        self.current = self.new_block()
+
+    def build_BreakStmt(self, node):
+        if self.targets:
+            self.jump(self.targets[-1][0])
+
+    def build_ContinueStmt(self, node):
+        if self.targets:
+            self.jump(self.targets[-1][1])
+
+    # -- expressions ----------------------------------------------------------
+
+    def expression(self, node):
+        """ Emit instructions evaluating the node, return its value """
+        if isinstance(node, Num):
+            return self.emit(Value(CONST, node), node)
+        if isinstance(node, Var):
+            if self.is_ssa(node):
+                return self.read(node)
+            return self.emit(Value(OPAQUE, node), node)
+        if isinstance(node, Assign):
+            return self.assign(node, statement=False)
+        if isinstance(node, UnOp):
+            if node.op.type in (INC_OP, DEC_OP):
+                return self.increment(node, statement=False)
+            if node.op.type == AND_OP:
+                return self.emit(Value(OPAQUE, node), node)
+            operand = self.expression(node.expr)
+            return self.emit(Value(EXPR, node, op=node.op.type, operands=[operand]), node)
+        if isinstance(node, BinOp):
+            if node.op.type in (LOG_AND_OP, LOG_OR_OP):
+                return self.short_circuit(node)
+            operands = [self.expression(node.left), self.expression(node.right)]
+            return self.emit(Value(EXPR, node, op=node.op.type, operands=operands), node)
+        if isinstance(node, TerOp):
+            return self.ternary(node)
+        if isinstance(node, Expression):
+            for child in node.children[:-1]:
+                self.expression(child)
+            return self.expression(node.children[-1])
+        if isinstance(node, FunctionCall):
+            for arg in node.args:
+                self.expression(arg)
+        return self.emit(Value(OPAQUE, node), node)
+
+    def read(self, node, lvalue=False):
+        value = Value(READ, node, node.slot)
+        value.lvalue = lvalue
+        return self.emit(value, node)
+
+    def short_circuit(self, node):
+        self.expression(node.left)
+        right, end = self.new_block(), self.new_block()
+        if node.op.type == LOG_AND_OP:
+            self.branch(node.left, right, end)
+        else:
+            self.branch(node.left, end, right)
+        self.current = right
+        self.expression(node.right)
+        self.edge(self.current, end)
+        self.current = end
+        return self.emit(Value(OPAQUE, node), node)
+
+    def ternary(self, node):
+        self.expression(node.condition)
+        texpression, fexpression, end = self.new_block(), self.new_block(), self.new_block()
+        self.branch(node.condition, texpression, fexpression)
+        for block, expression in ((texpression, node.texpression), (fexpression, node.fexpression)):
+            self.current = block
+            self.expression(expression)
+            self.edge(self.current, end)
+        self.current = end
+        return self.emit(Value(OPAQUE, node), node)
+
+    @staticmethod
+    def store(node, var, statement):
+        """ STORE to the variable, `removable` if it changes nothing else: a statement, or
+        an assignment whose value is its right operand """
+        store = Value(STORE, node, var.slot)
+        store.statement = statement
+        if isinstance(node, Assign):
+            store.removable = is_pure(node.right) and (
+                statement or node.op.type == ASSIGN and assignment_conversion(node) is None
+            )
+        else:
+            store.removable = statement
+        return store
+
+    def assign(self, node, statement):
+        if not self.is_ssa(node.left):
+            self.expression(node.right)
+            return self.emit(Value(OPAQUE, node), node)
+
+        store = self.store(node, node.left, statement)
+        owner, self.owner = self.owner, store if store.removable else self.owner
+        if node.op.type == ASSIGN:
+            value = self.expression(node.right)
+        else:
+            self.read(node.left, lvalue=True)
+            self.expression(node.right)
+            value = Value(OPAQUE, node)     # compound assignment is not shared
+        self.owner = owner
+        store.operands = [value]
+        store.convert = assignment_conversion(node)
+        self.current.defs[store.var] = store
+        return self.emit(store, node)
+
+    def increment(self, node, statement):
+        if not self.is_ssa(node.expr):
+            return self.emit(Value(OPAQUE, node), node)
+        store = self.store(node, node.expr, statement)
+        owner, self.owner = self.owner, store if store.removable else self.owner
+        read = self.read(node.expr, lvalue=True)
+        self.owner = owner
+        store.operands = [Value(OPAQUE, node)]
+        self.current.defs[store.var] = store
+        self.emit(store, node)
+        return store if node.prefix else read
+
+    ###########################################################################
+    #                                                                         #
+    #  SSA                                                                    #
+    #                                                                         #
+    ###########################################################################
+
+    def ssa(self):
+        """ Replace every READ by the definition reaching it. Values coming from unreachable
+        blocks never reach anything, their edges are dropped first. """
+        reachable = self.reachable()
+        for block in self.blocks:
+            block.preds = [pred for pred in block.preds if pred in reachable]
+        for block in self.blocks:
+            current = dict()
+            for instr in block.instrs:
+                value = instr.value
+                if value.kind == READ:
+                    value.replacement = current.get(value.var) or self.read_entry(value.var, block)
+                elif value.kind == STORE:
+                    current[value.var] = value
+
+    def initial_value(self, var):
+        if var not in self.initial:
+            self.initial[var] = Value(UNDEF, var=var)
+        return self.initial[var]
+
+    def read_exit(self, var, block):
+        return block.defs[var] if var in block.defs else self.read_entry(var, block)
+
+    def read_entry(self, var, block):
+        """ Value of the variable at the start of the block, phis are placed where needed """
+        path = []
+        while var not in block.entry:
+            if len(block.preds) == 1 and block not in path:
+                path.append(block)
+                block = block.preds[0]
+                if var in block.defs:
+                    value = block.defs[var]
+                    break
+                continue
+            if len(block.preds) <= 1:
+                value = self.initial_value(var)
+            else:
+                phi = block.entry[var] = Value(PHI, var=var)
+                phi.block = block
+                for pred in block.preds:
+                    operand = self.read_exit(var, pred)
+                    phi.operands.append(operand)
+                    if operand.kind == PHI:
+                        operand.users.append(phi)
+                value = self.remove_trivial(phi)
+            block.entry[var] = value
+            break
+        else:
+            value = block.entry[var]
+        for visited in path:
+            visited.entry[var] = value
+        return value
+
+    def remove_trivial(self, phi):
+        """ Replace phi merging a single value by this value """
+        same = None
+        for operand in phi.operands:
+            operand = operand.resolve()
+            if operand is same or operand is phi:
+                continue
+            if same is not None:
+                return phi
+            same = operand
+        if same is None:
+            same = self.initial_value(phi.var)
+        phi.replacement = same
+        for user in phi.users:
+            if user.replacement is None:
+                self.remove_trivial(user)
+        return same
+
+    def value_at(self, var, instr):
+        """ Value of the variable just before the instruction """
+        for previous in reversed(instr.block.instrs[:instr.index]):
+            if previous.value.kind == STORE and previous.value.var == var:
+                return previous.value
+        return self.read_entry(var, instr.block).resolve()
+
+    ###########################################################################
+    #                                                                         #
+    #  ANALYSES                                                               #
+    #                                                                         #
+    ###########################################################################
+
+    def reachable(self):
+        seen, stack = {self.entry}, [self.entry]
+        while stack:
+            for succ in stack.pop().succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return seen
+
+    def dominator_tree(self):
+        """ Children of every reachable block in the dominator tree (Cooper, Harvey, Kennedy) """
+        order, seen, stack = [], {self.entry}, [(self.entry, iter(self.entry.succs))]
+        while stack:
+            block, succs = stack[-1]
+            for succ in succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append((succ, iter(succ.succs)))
+                    break
+            else:
+                order.append(block)
+                stack.pop()
+        order.reverse()
+        position = {block: i for i, block in enumerate(order)}
+        idom = {self.entry: self.entry}
+
+        def intersect(a, b):
+            while a is not b:
+                while position[a] > position[b]:
+                    a = idom[a]
+                while position[b] > position[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                preds = [pred for pred in block.preds if pred in idom]
+                new = preds[0]
+                for pred in preds[1:]:
+                    new = intersect(pred, new)
+                if idom.get(block) is not new:
+                    idom[block] = new
+                    changed = True
+
+        children = {block: [] for block in order}
+        for block in order[1:]:
+            children[idom[block]].append(block)
+        return children
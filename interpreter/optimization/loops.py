@@ -0,0 +1,261 @@
+""" SCI - Simple C Interpreter """
+from collections import defaultdict
+
+from ..lexical_analysis.token import Token
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.table import GLOBAL_FRAME
+from ..interpreter.number import TYPES
+from .base import Pass, source
+from .folding import constant
+from .ir import Function, CONST, UNDEF, PHI, STORE, EXPR, READ, OPAQUE
+from .ssa import ROUNDS, SSAOptimizer, effects, root, rewrite, temporary, variable
+
+# Operators raising for some operands, such as division by zero
+PARTIAL_OPERATORS = (DIV_OP, MOD_OP, LEFT_OP, RIGHT_OP)
+
+
+class LoopOptimizer(Pass):
+    """ Loop optimizations on the SSA form (`ir.Function`), lowered back to the tree:
+
+    * loop-invariant code motion: a pure expression whose operands do not change in a loop is computed
+      once before the loop into a new variable
+    * strength reduction: `i * k`, where `i` only changes by constant steps in the loop, is kept
+      in a new variable increased by `step * k` whenever `i` changes
+
+    Globals are invariant when neither the loop nor the functions it calls (`FunctionDecl.writes`
+    recorded by the analyzer) assign them. An expression is moved in front of the loop only if it cannot
+    raise, as the loop may not evaluate it at all, and has no side effects.
+    """
+
+    def visit_Program(self, node):
+        self.functions = {child.func_name: child for child in node.children if isinstance(child, FunctionDecl)}
+        # globals initialized by a constant before main starts
+        self.initialized = {
+            child.left.slot for child in node.children
+            if isinstance(child, Assign) and child.op.type == ASSIGN and isinstance(child.right, Num)
+        }
+        for child in self.functions.values():
+            self.visit(child)
+        return node
+
+    def visit_FunctionDecl(self, node):
+        for _ in range(ROUNDS):
+            if not self.optimize(node):
+                break
+            SSAOptimizer(self.verbose).visit(node)
+        return node
+
+    def optimize(self, node):
+        """ One round of the optimizations, return whether the function changed """
+        function = Function(node)
+        function.ssa()
+        self.defined_values = dict()
+        reachable = function.reachable()
+        substitutions, covered = dict(), set()
+        preheaders = defaultdict(list)      # loop -> statements executed before it
+
+        self.hoist(function, reachable, substitutions, covered, preheaders)
+        self.reduce(function, reachable, substitutions, covered, preheaders)
+
+        for loop, statements in preheaders.items():
+            if isinstance(loop.node, ForStmt):
+                # after the setup, the statements may read variables it assigns
+                setup = substitutions.get(loop.node.setup, loop.node.setup)
+                setup = [] if isinstance(setup, NoOp) else [setup]
+                substitutions[loop.node.setup] = Expression(setup + statements, loop.node.line)
+            else:
+                substitutions[loop.node] = CompoundStmt(statements + [loop.node], loop.node.line)
+        rewrite(node.body, substitutions)
+        return bool(substitutions)
+
+    # -- values ---------------------------------------------------------------
+
+    def defined(self, value):
+        """ Whether the value is surely a number: no variable never assigned is copied into it """
+        value = value.resolve()
+        if value in self.defined_values:
+            return self.defined_values[value]
+        seen, stack = {value}, [value]
+        while stack:
+            current = stack.pop()
+            if current.kind == UNDEF or self.defined_values.get(current) is False or \
+                    current.kind == OPAQUE and isinstance(current.node, Var) and \
+                    (current.node.frame != GLOBAL_FRAME or current.node.slot not in self.initialized):
+                self.defined_values[value] = False
+                return False
+            if current.kind in (STORE, PHI) and current not in self.defined_values:
+                for operand in current.operands:
+                    operand = operand.resolve()
+                    if operand not in seen:
+                        seen.add(operand)
+                        stack.append(operand)
+        self.defined_values.update(dict.fromkeys(seen, True))
+        return True
+
+    @staticmethod
+    def safe(value):
+        """ Whether the operator gives a result for any numbers """
+        node = value.node
+        if isinstance(node, UnOp):
+            # int() of an infinite float raises
+            return node.op.type not in (CHAR, INT) or TYPES.get(node.expr.ctype) is not float
+        if value.op not in PARTIAL_OPERATORS:
+            return True
+        right = root(value.operands[1])
+        if right.kind != CONST:
+            return False
+        if value.op in (LEFT_OP, RIGHT_OP):
+            return right.node.value >= 0
+        if value.op == MOD_OP and (TYPES.get(node.left.ctype) is not int or TYPES.get(node.right.ctype) is not int):
+            return False
+        return right.node.value != 0
+
+    def invariant(self, value, loop, writes):
+        """ Whether the value is the same in every iteration of the loop and can be computed before it """
+        value = value.resolve()
+        if value.kind == CONST:
+            return True
+        if value.kind == EXPR:
+            return self.safe(value) and all(self.invariant(operand, loop, writes) for operand in value.operands)
+        if value.kind == OPAQUE:
+            return isinstance(value.node, Var) and value.node.frame == GLOBAL_FRAME and \
+                value.node.slot not in writes and self.defined(value)
+        return value.kind != READ and value.block not in loop.blocks and self.defined(value)
+
+    def writes(self, loop):
+        """ Globals the loop may assign """
+        writes = set()
+        for child in walk(loop.node):
+            if isinstance(child, Assign):
+                target = child.left
+            elif isinstance(child, UnOp) and child.op.type in (INC_OP, DEC_OP, AND_OP):
+                target = child.expr
+            elif isinstance(child, FunctionCall) and child.name in self.functions:
+                writes |= self.functions[child.name].writes
+                continue
+            else:
+                continue
+            if isinstance(target, Var) and target.frame == GLOBAL_FRAME:
+                writes.add(target.slot)
+        return writes
+
+    # -- loop-invariant code motion -------------------------------------------
+
+    def hoist(self, function, reachable, substitutions, covered, preheaders):
+        """ Move invariant expressions in front of the outermost loop they do not change in """
+        writes = {loop: self.writes(loop) for loop in function.loops}
+        statements = {statement for statement, _ in function.statements}
+        candidates = []
+        for instr in function.instrs:
+            if instr.value.kind != EXPR or instr.block not in reachable or instr.node.ctype not in TYPES or \
+                    instr.node in statements or effects(instr.node):
+                continue
+            for loop in function.loops:
+                if instr.block in loop.blocks and self.invariant(instr.value, loop, writes[loop]):
+                    candidates.append((instr, loop))
+                    break
+
+        # the largest invariant expression moves, with the expressions it contains
+        for instr, loop in reversed(candidates):
+            node = instr.node
+            if id(node) in covered:
+                continue
+            covered.update(id(child) for child in walk(node))
+            var = temporary(function.node, node)
+            assign = Assign(var, Token(ASSIGN, '='), node, node.line)
+            assign.ctype = node.ctype
+            preheaders[loop].append(assign)
+            substitutions[node] = variable(var, node.line)
+            self.report('Hoisted `{}` out of the loop at line {}'.format(source(node), loop.node.line))
+
+    # -- strength reduction ---------------------------------------------------
+
+    @staticmethod
+    def step(store):
+        """ Constant the store adds to the integer variable, None if it is not such a step """
+        node = store.node
+        var = node.left if isinstance(node, Assign) else node.expr
+        if not store.statement or TYPES.get(var.ctype) is not int:
+            return None
+        if isinstance(node, UnOp):
+            return 1 if node.op.type == INC_OP else -1
+        right = node.right
+        sign = {ADD_ASSIGN: 1, SUB_ASSIGN: -1}.get(node.op.type)
+        if sign is None and node.op.type == ASSIGN and isinstance(right, BinOp) and \
+                right.op.type in (ADD_OP, SUB_OP):
+            # i = i + c, i = i - c, i = c + i
+            sign = 1 if right.op.type == ADD_OP else -1
+            if isinstance(right.left, Var) and right.left.slot == var.slot and right.left.frame == var.frame:
+                right = right.right
+            elif sign == 1 and isinstance(right.right, Var) and right.right.slot == var.slot and \
+                    right.right.frame == var.frame:
+                right = right.left
+            else:
+                return None
+        if sign is None or not isinstance(right, Num) or not isinstance(right.value, int):
+            return None
+        return sign * right.value
+
+    def induction_variables(self, function, loop):
+        """ Variables changed only by constant steps in the loop -> (statement, step) of every change """
+        steps, others = defaultdict(list), set()
+        for instr in function.instrs:
+            if instr.value.kind == STORE and instr.block in loop.blocks:
+                step = self.step(instr.value)
+                if step is None:
+                    others.add(instr.value.var)
+                else:
+                    steps[instr.value.var].append((instr.node, step))
+        return {var: changes for var, changes in steps.items() if var not in others}
+
+    def reduce(self, function, reachable, substitutions, covered, preheaders):
+        """ Replace multiplications of an induction variable by a constant by a variable following
+        their value. A multiplication costs the engines as much as an addition, so this pays only
+        if more multiplications are replaced than additions are made. """
+        additions = defaultdict(list)       # step statement -> statements following it
+        for loop in function.loops:
+            variables = self.induction_variables(function, loop)
+            products = defaultdict(list)    # (variable, factor) -> (multiplication, read of the variable)
+            for instr in function.instrs:
+                value = instr.value
+                if value.kind != EXPR or value.op != MUL_OP or instr.block not in loop.blocks or \
+                        instr.block not in reachable or id(instr.node) in covered or \
+                        TYPES.get(instr.node.ctype) is not int:
+                    continue
+                for read, factor in (value.operands, reversed(value.operands)):
+                    factor = root(factor)
+                    if read.kind == READ and read.var in variables and factor.kind == CONST and \
+                            isinstance(factor.node.value, int) and \
+                            self.defined(function.read_exit(read.var, loop.preheader)):
+                        products[read.var, factor.node.value].append((instr.node, read.node))
+                        break
+
+            for (var, factor), nodes in products.items():
+                if len(nodes) <= len(variables[var]):
+                    continue
+                node, read = nodes[0]
+                product = BinOp(
+                    variable(read, node.line), Token(MUL_OP, '*'), constant(factor, 'int', node.line), node.line
+                )
+                product.ctype = node.ctype
+                temp = temporary(function.node, node)
+                assign = Assign(temp, Token(ASSIGN, '='), product, node.line)
+                assign.ctype = node.ctype
+                preheaders[loop].append(assign)
+                for statement, step in variables[var]:
+                    addition = Assign(
+                        variable(temp, statement.line), Token(ADD_ASSIGN, '+='),
+                        constant(step * factor, 'int', statement.line), statement.line
+                    )
+                    addition.ctype = node.ctype
+                    additions[statement].append(addition)
+                for node, _ in nodes:
+                    covered.update(id(child) for child in walk(node))
+                    substitutions[node] = variable(temp, node.line)
+                self.report('Reduced {} x `{}` to additions in the loop at line {}'.format(
+                    len(nodes), source(nodes[0][0]), loop.node.line
+                ))
+
+        for statement, following in additions.items():
+            substitutions[statement] = Expression([statement] + following, statement.line)
@@ -0,0 +1,40 @@
+""" SCI - Simple C Interpreter """
+from .folding import ConstantFolder, Simplifier
+from .inlining import Inliner
+from .ssa import SSAOptimizer
+from .loops import LoopOptimizer
+from ..syntax_analysis.tree import walk
+from ..utils.utils import MessageColor
+
+# Passes of every optimization level, in the order they run
+LEVELS = {
+    0: (),
+    1: (ConstantFolder, ),
+    2: (Simplifier, Inliner, SSAOptimizer, LoopOptimizer),
+}
+
+
+def count(tree):
+    return sum(1 for _ in walk(tree))
+
+
+class Optimizer(object):
+
+    @staticmethod
+    def optimize(tree, level=1, verbose=False):
+        """ Optimize analyzed tree, report how the number of nodes changed, and what the passes
+        changed if `verbose`. Inlining adds nodes, so the tree may grow. """
+        if not LEVELS[level]:
+            return tree
+        before = count(tree)
+        for optimization in LEVELS[level]:
+            tree = optimization(verbose).visit(tree)
+        after = count(tree)
+        print(MessageColor.OKGREEN + "Optimization -O{}: {} -> {} nodes ({} {})".format(
+            level,
+            before,
+            after,
+            abs(before - after),
+            'added' if after > before else 'removed'
+        ) + MessageColor.ENDC)
+        return tree
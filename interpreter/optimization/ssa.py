@@ -0,0 +1,250 @@
+""" SCI - Simple C Interpreter """
+from collections import defaultdict
+
+from ..lexical_analysis.token import Token
+from ..lexical_analysis.token_type import *
+from ..syntax_analysis.tree import *
+from ..semantic_analysis.table import LOCAL_FRAME
+from ..interpreter.number import TYPES
+from .base import Pass
+from .folding import Simplifier, constant
+from .ir import Function, CONST, EXPR, PHI, READ, STORE
+
+# At most this many rounds of SSA optimizations per function, each followed by simplification
+ROUNDS = 8
+
+
+def root(value):
+    """ Value assigned by chains of copies without conversion """
+    value = value.resolve()
+    while value.kind == STORE and value.convert is None:
+        value = value.operands[0].resolve()
+    return value
+
+
+def number(value):
+    """ Value number, equal constants and common subexpressions share it """
+    value = root(value)
+    if value.kind == CONST:
+        return CONST, type(value.node.value), value.node.value
+    return getattr(value, 'leader', value)
+
+
+def effects(node):
+    """ Whether evaluating the node assigns, takes an address or calls. The earlier children of a comma
+    expression are no operands of its value, so they are not seen by comparing values. """
+    return any(
+        isinstance(child, (Assign, FunctionCall)) or
+        isinstance(child, UnOp) and child.op.type in (INC_OP, DEC_OP, AND_OP) or
+        isinstance(child, Expression) and len(child.children) > 1
+        for child in walk(node)
+    )
+
+
+def variable(var, line):
+    """ New Var node reading the same variable as `var` """
+    node = Var(var.token, line)
+    node.frame, node.slot, node.ctype = var.frame, var.slot, var.ctype
+    return node
+
+
+def temporary(function, node):
+    """ Declare new local variable of the function, of the type of the node """
+    var = Var(Token(ID, 'cse'), node.line)
+    var.frame, var.slot, var.ctype = LOCAL_FRAME, function.frame_size, node.ctype
+    function.frame_size += 1
+    declare(function, var, Type(Token(node.ctype.upper(), node.ctype), node.line))
+    return var
+
+
+def declare(function, var, type_node):
+    """ Declare variable created by an optimization in the function, removed once it is not used """
+    declaration = VarDecl(var, type_node, var.line)
+    declaration.generated = True
+    function.body.children.insert(0, declaration)
+
+
+def rewrite(tree, substitutions):
+    """ Replace nodes by `substitutions[node]`, None removes a statement. Descendants of a replaced
+    node are rewritten as well, for replacements keeping it as a child. """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        for name, child in list(vars(node).items()):
+            if isinstance(child, Node):
+                stack.append(child)
+                if child in substitutions:
+                    setattr(node, name, substitutions[child] or NoOp(child.line))
+            elif isinstance(child, list):
+                children = []
+                for item in child:
+                    if isinstance(item, Node):
+                        stack.append(item)
+                        item = substitutions.get(item, item)
+                        if item is None:
+                            continue
+                    children.append(item)
+                if isinstance(node, Expression) and not children:
+                    children = [NoOp(node.line)]
+                child[:] = children
+
+
+class SSAOptimizer(Pass):
+    """ Optimize functions on their SSA form (`ir.Function`) and lower the results back to the tree,
+    so every engine executes them:
+
+    * unreachable statements are removed
+    * dead stores, assignments of variables whose value is never read, are removed
+    * common subexpressions without side effects are computed once, later occurrences read the variable
+      holding the value
+    * copies are propagated, a variable holding a constant or a copy of another variable is replaced by it
+    """
+
+    def visit_Program(self, node):
+        for child in node.children:
+            if isinstance(child, FunctionDecl):
+                self.visit(child)
+        return node
+
+    def visit_FunctionDecl(self, node):
+        for _ in range(ROUNDS):
+            if not self.optimize(node):
+                break
+            node.body = Simplifier(self.verbose).visit(node.body)
+        # declarations of generated variables no longer used
+        declared = {id(child.var_node) for child in node.body.children if isinstance(child, VarDecl)}
+        used = {
+            child.slot for child in walk(node.body)
+            if isinstance(child, Var) and child.frame == LOCAL_FRAME and id(child) not in declared
+        }
+        node.body.children = [
+            child for child in node.body.children
+            if not isinstance(child, VarDecl) or not getattr(child, 'generated', False) or
+            child.var_node.slot in used
+        ]
+        return node
+
+    def optimize(self, node):
+        """ One round of the optimizations, return whether the function changed """
+        function = Function(node)
+        function.ssa()
+        reachable = function.reachable()
+
+        substitutions, removed = dict(), set()
+        for statement, block in function.statements:
+            if block not in reachable and not isinstance(statement, VarDecl):
+                substitutions[statement] = None
+                removed.update(id(child) for child in walk(statement))
+        for store in self.dead_stores(function, reachable):
+            if store.statement:
+                substitutions[store.node] = None
+                removed.update(id(child) for child in walk(store.node))
+            else:
+                substitutions[store.node] = store.node.right
+                removed.update((id(store.node), id(store.node.left)))
+
+        self.common_subexpressions(function, removed, substitutions)
+        self.propagate_copies(function, reachable, removed, substitutions)
+        rewrite(node.body, substitutions)
+        return bool(substitutions)
+
+    @staticmethod
+    def dead_stores(function, reachable):
+        """ Removable stores whose value is never needed. Reads not owned by a store are needed,
+        a needed store or phi needs the values it is computed from. """
+        owned, needed, work = defaultdict(list), set(), []
+        for instr in function.instrs:
+            if instr.value.kind == READ:
+                if instr.owner is None:
+                    work.append(instr.value.resolve())
+                else:
+                    owned[instr.owner].append(instr.value.resolve())
+        while work:
+            value = work.pop()
+            if value in needed:
+                continue
+            needed.add(value)
+            if value.kind == PHI:
+                work.extend(operand.resolve() for operand in value.operands)
+            elif value.kind == STORE:
+                work.extend(owned[value])
+        return [
+            instr.value for instr in function.instrs
+            if instr.value.kind == STORE and instr.value.removable and instr.value not in needed and
+            instr.block in reachable
+        ]
+
+    def common_subexpressions(self, function, removed, substitutions):
+        """ Number values along the dominator tree, an expression equal to one computed in
+        a dominating position is replaced by the variable holding it """
+        children = function.dominator_tree()
+        table, scopes, stack = dict(), [], [function.entry]
+        holders, repeated = dict(), []
+        while stack:
+            block = stack.pop()
+            if block is None:
+                for key in scopes.pop():
+                    del table[key]
+                continue
+            scope = []
+            for instr in block.instrs:
+                value = instr.value
+                if value.kind == STORE and value.operands[0].kind == EXPR and value.convert is None:
+                    holders[value.operands[0]] = value
+                if value.kind != EXPR or id(instr.node) in removed or instr.node.ctype not in TYPES or \
+                        effects(instr.node):
+                    continue
+                key = (value.op, instr.node.ctype) + tuple(
+                    (number(operand), operand.node.ctype) for operand in value.operands
+                )
+                if key in table:
+                    value.leader = table[key]
+                    repeated.append(instr)
+                else:
+                    table[key] = value
+                    scope.append(key)
+            scopes.append(scope)
+            stack.append(None)
+            stack.extend(children[block])
+
+        # an occurrence inside a replaced one disappears with it
+        order = {instr: index for index, instr in enumerate(function.instrs)}
+        covered, occurrences = set(), defaultdict(list)
+        for instr in sorted(repeated, key=order.get, reverse=True):
+            if id(instr.node) not in covered:
+                covered.update(id(child) for child in walk(instr.node))
+                occurrences[instr.value.leader].append(instr)
+
+        for leader, instrs in occurrences.items():
+            holder = holders.get(leader)
+            if holder is not None and holder.node not in substitutions and all(
+                    function.value_at(holder.var, instr) is holder for instr in instrs):
+                var = holder.node.left
+            elif len(instrs) > 1 or sum(isinstance(child, (BinOp, UnOp)) for child in walk(leader.node)) > 1:
+                var = temporary(function.node, leader.node)
+                assign = Assign(var, Token(ASSIGN, '='), leader.node, leader.node.line)
+                assign.ctype = leader.node.ctype
+                substitutions[leader.node] = assign
+            else:
+                continue    # reading a new variable costs as much as the operator
+            for instr in instrs:
+                substitutions[instr.node] = variable(var, instr.node.line)
+
+    @staticmethod
+    def propagate_copies(function, reachable, removed, substitutions):
+        """ Replace read of a variable holding a constant by the constant, and read of a variable
+        holding a copy of another variable by the other variable while it keeps the value """
+        for instr in function.instrs:
+            value = instr.value
+            if value.kind != READ or value.lvalue or instr.block not in reachable or \
+                    id(instr.node) in removed or instr.node in substitutions:
+                continue
+            store = value.resolve()
+            if store.kind != STORE or store.convert is not None:
+                continue
+            source = root(store)
+            if source.kind == CONST and instr.node.ctype in TYPES:
+                substitutions[instr.node] = constant(source.node.value, instr.node.ctype, instr.node.line)
+            elif store.operands[0].kind == READ and \
+                    function.value_at(store.operands[0].var, instr) is store.operands[0].resolve():
+                substitutions[instr.node] = variable(store.operands[0].node, instr.node.line)
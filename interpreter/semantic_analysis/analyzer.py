@@ -1,7 +1,8 @@
 from ..syntax_analysis.tree import NodeVisitor, Type
-from ..syntax_analysis.parser import INTEGER_CONST, CHAR_CONST, AND_OP, OR_OP, XOR_OP
+from ..lexical_analysis.token_type import *
 from .table import *
-from ..utils.utils import get_functions, get_name, MessageColor
+from ..utils.registry import library
+from ..utils.utils import get_name, MessageColor
 
 class SemanticError(Exception):
     pass
@@ -37,13 +38,64 @@ class SemanticAnalyzer(NodeVisitor):
 
     def __init__(self):
         self.current_scope = None
+        self.frame_size = 0         # number of slots allocated in the current frame
+        self.function = None        # FunctionDecl being analyzed
+        self.functions = dict()     # name -> FunctionDecl
+
+    def allocate(self, var_symbol, var_node):
+        """ Give declared variable its own slot in the current frame.
+        Slots are never reused, so variables of nested blocks never share one. """
+        var_symbol.frame = GLOBAL_FRAME if self.current_scope.scope_level == 1 else LOCAL_FRAME
+        var_symbol.slot = self.frame_size
+        var_node.frame, var_node.slot = var_symbol.frame, var_symbol.slot
+        self.frame_size += 1
 
     def error(self, message):
         raise SemanticError(message)
 
+    def visit(self, node):
+        """ Visit node and record its static type, None for nodes without a value """
+        ctype = super(SemanticAnalyzer, self).visit(node)
+        node.ctype = ctype.type if isinstance(ctype, SemanticAnalyzer.CType) else None
+        return ctype
+
     def warning(self, message):
         print(MessageColor.WARNING + message + MessageColor.ENDC)
 
+    def written(self, node):
+        """ Record assignment of the variable by the current function """
+        if self.function is not None and getattr(node, 'frame', None) == GLOBAL_FRAME:
+            self.function.writes.add(node.slot)
+
+    def purity(self):
+        """ Mark functions whose result depends only on their arguments and which change nothing: they
+        write no global, read no global a function writes, call no builtin doing input or output and
+        call only such functions """
+        written = set()
+        for function in self.functions.values():
+            written |= function.writes
+        for function in self.functions.values():
+            function.pure = not (function.writes or function.io or function.reads & written)
+        changed = True
+        while changed:
+            changed = False
+            for function in self.functions.values():
+                if function.pure and not all(self.functions[name].pure for name in function.calls):
+                    function.pure = False
+                    changed = True
+
+    def side_effects(self):
+        """ Add globals assigned by the called functions to `writes` of the callers """
+        changed = True
+        while changed:
+            changed = False
+            for function in self.functions.values():
+                for name in function.calls:
+                    writes = self.functions[name].writes
+                    if not writes <= function.writes:
+                        function.writes |= writes
+                        changed = True
+
     def visit_Program(self, node):
         global_scope = ScopedSymbolTable(
             scope_name='global',
@@ -52,9 +104,13 @@ class SemanticAnalyzer(NodeVisitor):
         )
         global_scope._init_builtins()
         self.current_scope = global_scope
+        self.frame_size = 0
 
         for child in node.children:
             self.visit(child)
+        node.frame_size = self.frame_size
+        self.side_effects()
+        self.purity()
 
         if not self.current_scope.lookup('main'):
             self.error(
@@ -81,22 +137,23 @@ class SemanticAnalyzer(NodeVisitor):
             )
 
         self.current_scope.insert(var_symbol)
+        self.allocate(var_symbol, node.var_node)
 
     def visit_IncludeLibrary(self, node):
         """ #include <library_name.h> """
 
-        functions = get_functions('interpreter.__builtins__.{}'.format(
-            node.library_name
-        ))
+        functions = library(node.library_name)
+        if functions is None:
+            self.error("Error: Library '<{}.h>' not found at line {}".format(node.library_name, node.line))
 
         for func in functions:
             type_symbol = self.current_scope.lookup(func.return_type)
 
-            func_name = func.__name__
+            func_name = func.name
             if self.current_scope.lookup(func_name):
                 continue
 
-            func_symbol = FunctionSymbol(func_name, type=type_symbol)
+            func_symbol = FunctionSymbol(func_name, type=type_symbol, pure=func.pure)
 
             if func.arg_types == None:
                 func_symbol.params = None
@@ -121,6 +178,12 @@ class SemanticAnalyzer(NodeVisitor):
             )
         func_symbol = FunctionSymbol(func_name, type=type_symbol)
         self.current_scope.insert(func_symbol)
+        node.writes = set()         # slots of the globals the function may assign
+        node.reads = set()          # slots of the globals it reads
+        node.calls = set()          # names of the functions of the program it calls
+        node.io = False             # whether it calls a builtin which is not pure
+        self.functions[func_name] = node
+        enclosing_function, self.function = self.function, node
 
         procedure_scope = ScopedSymbolTable(
             scope_name=func_name,
@@ -128,12 +191,16 @@ class SemanticAnalyzer(NodeVisitor):
             enclosing_scope=self.current_scope
         )
         self.current_scope = procedure_scope
+        enclosing_frame_size, self.frame_size = self.frame_size, 0
 
         for param in node.params:
             func_symbol.params.append(self.visit(param))
 
         self.visit(node.body)
+        node.frame_size = self.frame_size
 
+        self.frame_size = enclosing_frame_size
+        self.function = enclosing_function
         self.current_scope = self.current_scope.enclosing_scope
 
     def visit_FunctionBody(self, node):
@@ -159,6 +226,7 @@ class SemanticAnalyzer(NodeVisitor):
             )
 
         self.current_scope.insert(var_symbol)
+        self.allocate(var_symbol, node.var_node)
         return var_symbol
 
     def visit_CompoundStmt(self, node):
@@ -180,21 +248,30 @@ class SemanticAnalyzer(NodeVisitor):
         """ left op right """
         ltype = self.visit(node.left)
         rtype = self.visit(node.right)
-        if node.op.type == AND_OP or node.op.type == OR_OP or node.op.type == XOR_OP:
+        if node.op.type in (AND_OP, OR_OP, XOR_OP, LEFT_OP, RIGHT_OP):
             if ltype.type != "int" or rtype.type != "int":
                 self.error("Unsupported types at bitwise operator ltype:<{}> rtype:<{}> at line {}".format(
                     ltype.type,
                     rtype.type,
                     node.line
                 ))
-        return ltype + rtype 
+        if node.op.type in (LT_OP, GT_OP, LE_OP, GE_OP, EQ_OP, NE_OP, LOG_AND_OP, LOG_OR_OP, MOD_OP):
+            return SemanticAnalyzer.CType('int')
+        return ltype + rtype
 
     def visit_UnOp(self, node):
         """ op expr """
-        if isinstance(node.op, Type):
+        if node.op.type in (CHAR, INT, FLOAT, DOUBLE):
             self.visit(node.expr)
             return SemanticAnalyzer.CType(node.op.value)
-        return self.visit(node.expr)
+        if node.op.type == LOG_NEG:
+            self.visit(node.expr)
+            return SemanticAnalyzer.CType('int')
+        ctype = self.visit(node.expr)
+        if node.op.type in (INC_OP, DEC_OP, AND_OP):
+            # the address is taken for scanf to assign the variable
+            self.written(node.expr)
+        return ctype
 
     def visit_TerOp(self, node):
         """ condition ? texpression : fexpression """
@@ -207,19 +284,20 @@ class SemanticAnalyzer(NodeVisitor):
                 fexpr,
                 node.line
             ))
-        return texpr
+        return texpr + fexpr
 
     def visit_Assign(self, node):
         """ right = left """
         right = self.visit(node.right)
         left = self.visit(node.left)
+        self.written(node.left)
         if left != right:
             self.warning("Incompatible types when assigning to type <{}> from type <{}> at line {}".format(
                 left,
                 right,
                 node.line
             ))
-        return right
+        return left
 
     def visit_Var(self, node):
         """ value """
@@ -232,6 +310,16 @@ class SemanticAnalyzer(NodeVisitor):
                     node.line
                 )
             )
+        if not isinstance(var_symbol, VarSymbol):
+            self.error(
+                "Identifier '{}' cannot be used as a variable at line {}".format(
+                    var_name,
+                    node.line
+                )
+            )
+        node.frame, node.slot = var_symbol.frame, var_symbol.slot
+        if self.function is not None and node.frame == GLOBAL_FRAME:
+            self.function.reads.add(node.slot)
         return SemanticAnalyzer.CType(var_symbol.type.name)
 
     def visit_Type(self, node):
@@ -264,6 +352,14 @@ class SemanticAnalyzer(NodeVisitor):
         """ return expression """
         return self.visit(node.expression)
 
+    def visit_BreakStmt(self, node):
+        """ break """
+        pass
+
+    def visit_ContinueStmt(self, node):
+        """ continue """
+        pass
+
     def visit_Num(self, node):
         """ value """
         if node.token.type == INTEGER_CONST:
@@ -297,6 +393,11 @@ class SemanticAnalyzer(NodeVisitor):
                 )
             )
 
+        if func_name in self.functions and self.function is not None:
+            self.function.calls.add(func_name)
+        elif self.function is not None and not func_symbol.pure:
+            self.function.io = True
+
         if func_symbol.params == None:
             for i, arg in enumerate(node.args):
                 self.visit(arg)
@@ -5,6 +5,9 @@
 ###############################################################################
 from collections import OrderedDict
 
+# Frames a variable can live in: global variables, or locals (and params) of the running function
+GLOBAL_FRAME, LOCAL_FRAME = 0, 1
+
 
 class Symbol(object):
     def __init__(self, name, type=None):
@@ -15,6 +18,9 @@ class Symbol(object):
 class VarSymbol(Symbol):
     def __init__(self, name, type):
         super(VarSymbol, self).__init__(name, type)
+        # address of the variable, assigned by the semantic analyzer
+        self.frame = None
+        self.slot = None
 
     def __str__(self):
         return "<{class_name}(name='{name}', type='{type}')>".format(
@@ -41,10 +47,12 @@ class BuiltinTypeSymbol(Symbol):
 
 
 class FunctionSymbol(Symbol):
-    def __init__(self, name, type, params=None):
+    def __init__(self, name, type, params=None, pure=False):
         super(FunctionSymbol, self).__init__(name, type=type)
         # a list of formal parameters
         self.params = params if params is not None else []
+        # builtin without input or output, whose result depends only on the arguments
+        self.pure = pure
 
     def __str__(self):
         return '<{class_name}(type={type}, name={name}, parameters={params})>'.format(
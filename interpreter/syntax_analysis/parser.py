@@ -1,8 +1,26 @@
 """ SCI - Simple C Interpreter """
 
+from collections import deque
 from ..lexical_analysis.token_type import *
 from .tree import *
-from ..utils.utils import restorable
+
+# Binary and conditional operators: token type -> (precedence, right associative).
+# Operators with higher precedence bind tighter, QUESTION_MARK starts the conditional operator.
+OPERATOR_PRECEDENCE = {
+    QUESTION_MARK: (1, True),
+    LOG_OR_OP: (2, False),
+    LOG_AND_OP: (3, False),
+    OR_OP: (4, False),
+    XOR_OP: (5, False),
+    AND_OP: (6, False),
+    EQ_OP: (7, False), NE_OP: (7, False),
+    LT_OP: (8, False), GT_OP: (8, False), LE_OP: (8, False), GE_OP: (8, False),
+    LEFT_OP: (9, False), RIGHT_OP: (9, False),
+    ADD_OP: (10, False), SUB_OP: (10, False),
+    MUL_OP: (11, False), DIV_OP: (11, False), MOD_OP: (11, False),
+}
+CONDITIONAL_PRECEDENCE = OPERATOR_PRECEDENCE[QUESTION_MARK][0]
+
 
 class SyntaxError(Exception):
     pass
@@ -11,11 +29,24 @@ class SyntaxError(Exception):
 class Parser(object):
     def __init__(self, lexer):
         self.lexer = lexer
-        self.current_token = self.lexer.get_next_token  # set current token to the first token taken from the input
+        self.lookahead = deque()    # (token, line) pairs taken from the lexer but not eaten yet
+        self.current_token, self.line = self.fetch()  # set current token to the first token taken from the input
 
     def error(self, message):
         raise SyntaxError(message)
 
+    def fetch(self):
+        """ Take next token from the input together with the line lexer stopped at """
+        token = self.lexer.get_next_token
+        return token, self.lexer.line
+
+    def peek(self, k):
+        """ Return k-th token after the current one without consuming it.
+        Tokens are buffered, so speculative checks never re-scan the input. """
+        while len(self.lookahead) < k:
+            self.lookahead.append(self.fetch())
+        return self.lookahead[k - 1][0]
+
     def eat(self, token_type):
         """ Compare the current token type with the passed token
         type and if they match then "eat" the current token
@@ -23,11 +54,15 @@ class Parser(object):
         otherwise raise an exception. """
 
         if self.current_token.type == token_type:
-            self.current_token = self.lexer.get_next_token
+            if self.lookahead:
+                self.current_token, self.line = self.lookahead.popleft()
+            else:
+                self.current_token = self.lexer.get_next_token
+                self.line = self.lexer.line
         else:
             self.error(
                 'Expected token <{}> but found <{}> at line {}.'.format(
-                    token_type, self.current_token.type, self.lexer.line
+                    token_type, self.current_token.type, self.line
                 )
             )
 
@@ -37,7 +72,7 @@ class Parser(object):
         """
         root = Program(
             declarations=self.declarations(),
-            line=self.lexer.line
+            line=self.line
 
         )
         return root
@@ -66,7 +101,7 @@ class Parser(object):
         if token.value != 'include':
             self.error(
                 'Expected token "include" but found {} at line {}.'.format(
-                    token.value, self.lexer.line
+                    token.value, self.line
                 )
             )
 
@@ -78,20 +113,17 @@ class Parser(object):
         extension = self.current_token
         if extension.value != 'h':
             self.error(
-                'You can include only *.h files [line {}]'.format(self.lexer.line)
+                'You can include only *.h files [line {}]'.format(self.line)
             )
         self.eat(ID)
         self.eat(GT_OP)
         return IncludeLibrary(
             library_name=token.value,
-            line=self.lexer.line
+            line=self.line
         )
 
-    @restorable
     def check_function(self):
-        self.eat(self.current_token.type)
-        self.eat(ID)
-        return self.current_token.type == LPAREN
+        return self.peek(1).type == ID and self.peek(2).type == LPAREN
 
     def function_declaration(self):
         """
@@ -108,7 +140,7 @@ class Parser(object):
             func_name=func_name,
             params=params,
             body=self.function_body(),
-            line=self.lexer.line
+            line=self.line
         )
 
     def function_body(self):
@@ -125,7 +157,7 @@ class Parser(object):
         self.eat(RBRACKET)
         return FunctionBody(
             children=result,
-            line=self.lexer.line
+            line=self.line
         )
 
     def parameters(self):
@@ -137,14 +169,14 @@ class Parser(object):
             nodes = [Param(
                 type_node=self.type_spec(),
                 var_node=self.variable(),
-                line=self.lexer.line
+                line=self.line
             )]
             while self.current_token.type == COMMA:
                 self.eat(COMMA)
                 nodes.append(Param(
                     type_node=self.type_spec(),
                     var_node=self.variable(),
-                    line=self.lexer.line
+                    line=self.line
                 ))
         return nodes
 
@@ -168,7 +200,7 @@ class Parser(object):
                 result.append(VarDecl(
                     type_node=type_node,
                     var_node=node,
-                    line=self.lexer.line
+                    line=self.line
                 ))
             else:
                 result.append(node)
@@ -200,7 +232,7 @@ class Parser(object):
                 left=var,
                 op=token,
                 right=self.assignment_expression(),
-                line=self.lexer.line
+                line=self.line
             ))
         return result
 
@@ -222,7 +254,6 @@ class Parser(object):
             return self.compound_statement()
         return self.expression_statement()
 
-    @restorable
     def check_compound_statement(self):
         return self.current_token.type == LBRACKET
 
@@ -240,10 +271,9 @@ class Parser(object):
         self.eat(RBRACKET)
         return CompoundStmt(
             children=result,
-            line=self.lexer.line
+            line=self.line
         )
 
-    @restorable
     def check_jump_statement(self):
         return self.current_token.type in (RETURN, BREAK, CONTINUE)
 
@@ -261,23 +291,22 @@ class Parser(object):
             self.eat(SEMICOLON)
             return ReturnStmt(
                 expression=expression,
-                line=self.lexer.line
+                line=self.line
             )
         elif self.current_token.type == BREAK:
             self.eat(BREAK)
             self.eat(SEMICOLON)
             return BreakStmt(
-                line=self.lexer.line
+                line=self.line
             )
 
         elif self.current_token.type == CONTINUE:
             self.eat(CONTINUE)
             self.eat(SEMICOLON)
             return ContinueStmt(
-                line=self.lexer.line
+                line=self.line
             )
 
-    @restorable
     def check_selection_statement(self):
         return self.current_token.type == IF
 
@@ -299,10 +328,9 @@ class Parser(object):
                 condition=condition,
                 tbody=tstatement,
                 fbody=fstatement,
-                line=self.lexer.line
+                line=self.line
             )
 
-    @restorable
     def check_iteration_statement(self):
         return self.current_token.type in (WHILE, DO, FOR)
 
@@ -321,7 +349,7 @@ class Parser(object):
             return WhileStmt(
                 condition=expression,
                 body=statement,
-                line=self.lexer.line
+                line=self.line
             )
         elif self.current_token.type == DO:
             self.eat(DO)
@@ -334,14 +362,14 @@ class Parser(object):
             return DoWhileStmt(
                 condition=expression,
                 body=statement,
-                line=self.lexer.line
+                line=self.line
             )
         else:
             self.eat(FOR)
             self.eat(LPAREN)
             setup = self.expression_statement()
             condition = self.expression_statement()
-            increment = NoOp(line=self.lexer.line)
+            increment = NoOp(line=self.line)
             if self.current_token.type != RPAREN:
                 increment = self.expression()
             self.eat(RPAREN)
@@ -351,7 +379,7 @@ class Parser(object):
                 condition=condition,
                 increment=increment,
                 body=statement,
-                line=self.lexer.line
+                line=self.line
             )
 
     def expression_statement(self):
@@ -362,7 +390,7 @@ class Parser(object):
         if self.current_token.type != SEMICOLON:
             node = self.expression()
         self.eat(SEMICOLON)
-        return node and node or NoOp(line=self.lexer.line)
+        return node and node or NoOp(line=self.line)
 
     def constant_expression(self):
         """
@@ -381,14 +409,12 @@ class Parser(object):
             result.append(self.assignment_expression())
         return Expression(
             children=result,
-            line=self.lexer.line
+            line=self.line
         )
 
-    @restorable
     def check_assignment_expression(self):
         if self.current_token.type == ID:
-            self.eat(ID)
-            return self.current_token.type.endswith('ASSIGN')
+            return self.peek(1).type.endswith('ASSIGN')
         return False
 
     def assignment_expression(self):
@@ -405,197 +431,61 @@ class Parser(object):
                     left=node,
                     op=token,
                     right=self.assignment_expression(),
-                    line=self.lexer.line
+                    line=self.line
                 )
         return self.conditional_expression()
 
     def conditional_expression(self):
         """
-        conditional_expression      : logical_and_expression (QUESTION_MARK expression COLON conditional_expression)?
-        """
-        node = self.logical_and_expression()
-        if self.current_token.type == QUESTION_MARK:
-            self.eat(QUESTION_MARK)
-            texpression = self.expression()
-            self.eat(COLON)
-            fexpression = self.conditional_expression()
-            return TerOp(
-                condition=node,
-                texpression=texpression,
-                fexpression=fexpression,
-                line=self.lexer.line
-            )
-        return node
-
-    def logical_and_expression(self):
-        """
-        logical_and_expression      : logical_or_expression (LOG_AND_OP logical_or_expression)*
-        """
-        node = self.logical_or_expression()
-        while self.current_token.type == LOG_AND_OP:
-            token = self.current_token
-            self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.logical_or_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def logical_or_expression(self):
-        """
-        logical_or_expression       : inclusive_or_expression (LOG_OR_OP inclusive_or_expression)*
-        """
-        node = self.inclusive_or_expression()
-        while self.current_token.type == LOG_OR_OP:
-            token = self.current_token
-            self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.inclusive_or_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def inclusive_or_expression(self):
-        """
-        inclusive_or_expression     : exclusive_or_expression (OR_OP exclusive_or_expression)*
-        """
-        node = self.exclusive_or_expression()
-        while self.current_token.type == OR_OP:
-            token = self.current_token
-            self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.exclusive_or_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def exclusive_or_expression(self):
-        """
-        exclusive_or_expression     : and_expression (XOR_OP and_expression)*
-        """
-        node = self.and_expression()
-        while self.current_token.type == XOR_OP:
-            token = self.current_token
-            self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.and_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def and_expression(self):
-        """
-        and_expression              : equality_expression (AND_OP equality_expression)*
-        """
-        node = self.equality_expression()
-        while self.current_token.type == AND_OP:
-            token = self.current_token
-            self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.equality_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def equality_expression(self):
-        """
-        equality_expression         : relational_expression ((EQ_OP | NE_OP) relational_expression)*
-        """
-        node = self.relational_expression()
-        while self.current_token.type in (EQ_OP, NE_OP):
-            token = self.current_token
-            self.eat(token.type)
-            return BinOp(
-                left=node,
-                op=token,
-                right=self.relational_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def relational_expression(self):
-        """
-        relational_expression       : shift_expression ((LE_OP | LT_OP | GE_OP | GT_OP) shift_expression)*
-        """
-        node = self.shift_expression()
-        while self.current_token.type in (LE_OP, LT_OP, GE_OP, GT_OP):
-            token = self.current_token
-            self.eat(token.type)
-            return BinOp(
-                left=node,
-                op=token,
-                right=self.shift_expression(),
-                line=self.lexer.line
-            )
-        return node
-
-    def shift_expression(self):
-        """
-        shift_expression            : additive_expression ((LEFT_OP | RIGHT_OP) additive_expression)*
+        conditional_expression      : binary_expression
         """
-        node = self.additive_expression()
-        while self.current_token.type in (LEFT_OP, RIGHT_OP):
-            token = self.current_token
-            self.eat(token.type)
-            return BinOp(
-                left=node,
-                op=token,
-                right=self.additive_expression(),
-                line=self.lexer.line
-            )
-        return node
+        return self.binary_expression(self.cast_expression(), CONDITIONAL_PRECEDENCE)
 
-    def additive_expression(self):
-        """
-        additive_expression         : multiplicative_expression ((ADD_OP | SUB_OP) multiplicative_expression)*
+    def binary_expression(self, node, min_precedence):
         """
-        node = self.multiplicative_expression()
+        binary_expression           : cast_expression (binary_operator cast_expression)*
+                                    | binary_expression QUESTION_MARK expression COLON binary_expression
 
-        while self.current_token.type in (ADD_OP, SUB_OP):
-            token = self.current_token
-            self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.multiplicative_expression(),
-                line=self.lexer.line
-            )
-
-        return node
-
-    def multiplicative_expression(self):
-        """
-        multiplicative_expression   : cast_expression ((MUL_OP | DIV_OP | MOD_OP) cast_expression)*
+        Precedence climbing: `node` is already parsed left operand, operators and their binding power
+        are taken from OPERATOR_PRECEDENCE. Recursion happens only when the operator on the right binds
+        tighter than the one on the left, so call depth does not depend on the number of precedence levels.
         """
-        node = self.cast_expression()
-        while self.current_token.type in (MUL_OP, DIV_OP, MOD_OP):
+        operator = OPERATOR_PRECEDENCE.get(self.current_token.type)
+        while operator is not None and operator[0] >= min_precedence:
+            precedence = operator[0]
             token = self.current_token
             self.eat(token.type)
-            node = BinOp(
-                left=node,
-                op=token,
-                right=self.cast_expression(),
-                line=self.lexer.line
-            )
+            if token.type == QUESTION_MARK:
+                texpression = self.expression()
+                self.eat(COLON)
+            right = self.cast_expression()
+
+            operator = OPERATOR_PRECEDENCE.get(self.current_token.type)
+            while operator is not None and (
+                    operator[0] > precedence or operator[0] == precedence and operator[1]):
+                right = self.binary_expression(right, precedence + (operator[0] > precedence))
+                operator = OPERATOR_PRECEDENCE.get(self.current_token.type)
+
+            if token.type == QUESTION_MARK:
+                node = TerOp(
+                    condition=node,
+                    texpression=texpression,
+                    fexpression=right,
+                    line=self.line
+                )
+            else:
+                node = BinOp(
+                    left=node,
+                    op=token,
+                    right=right,
+                    line=self.line
+                )
         return node
 
-    @restorable
     def check_cast_expression(self):
         if self.current_token.type == LPAREN:
-            self.eat(LPAREN)
-            if self.current_token.type in [CHAR, DOUBLE, INT, FLOAT]:
-                self.eat(self.current_token.type)
-                return self.current_token.type == RPAREN
+            if self.peek(1).type in (CHAR, DOUBLE, INT, FLOAT):
+                return self.peek(2).type == RPAREN
         return False
 
     def cast_expression(self):
@@ -603,14 +493,14 @@ class Parser(object):
         multiplicative_expression   : LPAREN type_spec RPAREN cast_expression
                                     | unary_expression
         """
-        if self.check_cast_expression():
+        if self.current_token.type == LPAREN and self.check_cast_expression():
             self.eat(LPAREN)
             type_node = self.type_spec()
             self.eat(RPAREN)
             return UnOp(
                 op=type_node.token,
                 expr=self.cast_expression(),
-                line=self.lexer.line
+                line=self.line
             )
         else:
             return self.unary_expression()
@@ -631,7 +521,7 @@ class Parser(object):
             return UnOp(
                 op=token,
                 expr=self.unary_expression(),
-                line=self.lexer.line
+                line=self.line
             )
         elif self.current_token.type in (AND_OP, ADD_OP, SUB_OP, LOG_NEG):
             token = self.current_token
@@ -639,7 +529,7 @@ class Parser(object):
             return UnOp(
                 op=token,
                 expr=self.cast_expression(),
-                line=self.lexer.line
+                line=self.line
             )
         else:
             return self.postfix_expression()
@@ -657,7 +547,7 @@ class Parser(object):
             node = UnOp(
                 op=token,
                 expr=node,
-                line=self.lexer.line,
+                line=self.line,
                 prefix=False
             )
         elif self.current_token.type == LPAREN:
@@ -671,7 +561,7 @@ class Parser(object):
             node = FunctionCall(
                 name=node.value,
                 args=args,
-                line=self.lexer.line
+                line=self.line
             )
         return node
 
@@ -716,19 +606,19 @@ class Parser(object):
             self.eat(CHAR_CONST)
             return Num(
                 token=token,
-                line=self.lexer.line
+                line=self.line
             )
         elif token.type == INTEGER_CONST:
             self.eat(INTEGER_CONST)
             return Num(
                 token=token,
-                line=self.lexer.line
+                line=self.line
             )
         elif token.type == REAL_CONST:
             self.eat(REAL_CONST)
             return Num(
                 token=token,
-                line=self.lexer.line
+                line=self.line
             )
 
     def type_spec(self):
@@ -740,7 +630,7 @@ class Parser(object):
             self.eat(token.type)
             return Type(
                 token=token,
-                line=self.lexer.line
+                line=self.line
             )
 
     def variable(self):
@@ -749,7 +639,7 @@ class Parser(object):
         """
         node = Var(
             token=self.current_token,
-            line=self.lexer.line
+            line=self.line
         )
         self.eat(ID)
         return node
@@ -757,7 +647,7 @@ class Parser(object):
     def empty(self):
         """An empty production"""
         return NoOp(
-            line=self.lexer.line
+            line=self.line
         )
 
     def string(self):
@@ -768,7 +658,7 @@ class Parser(object):
         self.eat(STRING)
         return String(
             token=token,
-            line=self.lexer.line
+            line=self.line
         )
 
     def parse(self):
@@ -820,27 +710,15 @@ class Parser(object):
         assignment_expression       : assignment_expression (COMMA assignment_expression)*
                                     | conditional_expression
 
-        conditional_expression      : logical_and_expression (QUESTION_MARK expression COLON conditional_expression)?
-
-        logical_and_expression      : logical_or_expression (LOG_AND_OP logical_or_expression)*
-
-        logical_or_expression       : inclusive_or_expression (LOG_OR_OP inclusive_or_expression)*
-
-        inclusive_or_expression     : exclusive_or_expression (OR_OP exclusive_or_expression)*
-
-        exclusive_or_expression     : and_expression (XOR_OP and_expression)*
-
-        and_expression              : equality_expression (AND_OP equality_expression)*
-
-        equality_expression         : relational_expression ((EQ_OP | NE_OP) relational_expression)*
-
-        relational_expression       : shift_expression ((LE_OP | LT_OP | GE_OP | GT_OP) shift_expression)*
-
-        shift_expression            : additive_expression ((LEFT_OP | RIGHT_OP) additive_expression)*
+        conditional_expression      : binary_expression
 
-        additive_expression         : multiplicative_expression ((ADD_OP | SUB_OP) multiplicative_expression)*
+        binary_expression           : cast_expression (binary_operator cast_expression)*
+                                    | binary_expression QUESTION_MARK expression COLON binary_expression
 
-        multiplicative_expression   : cast_expression ((MUL_OP | DIV_OP | MOD_OP) cast_expression)*
+        binary_operator             : LOG_OR_OP | LOG_AND_OP | OR_OP | XOR_OP | AND_OP | EQ_OP | NE_OP
+                                    | LE_OP | LT_OP | GE_OP | GT_OP | LEFT_OP | RIGHT_OP
+                                    | ADD_OP | SUB_OP | MUL_OP | DIV_OP | MOD_OP
+                                    (precedence from the lowest to the highest, see OPERATOR_PRECEDENCE)
 
         cast_expression             : LPAREN type_spec RPAREN cast_expression
                                     | unary_expression
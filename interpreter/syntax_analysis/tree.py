@@ -1,3 +1,6 @@
+import collections
+
+
 class Node(object):
     def __init__(self, line):
         self.line = line
@@ -175,12 +178,67 @@ class Program(Node):
 #                                                                             #
 ###############################################################################
 
+def walk(node):
+    """ Node and all its descendants, every node before its children """
+    yield node
+    for value in vars(node).values():
+        if isinstance(value, Node):
+            yield from walk(value)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, Node):
+                    yield from walk(item)
+
+
+def node_classes(cls=Node):
+    """ All subclasses of `cls` """
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from node_classes(subclass)
+
+
+class Dispatch(dict):
+    """ Node class -> handler of one visitor class. Node classes unknown when the visitor
+    class was created are resolved on their first visit. """
+
+    def __init__(self, visitor_class):
+        super(Dispatch, self).__init__()
+        self.visitor_class = visitor_class
+
+    def __missing__(self, node_class):
+        handler = self[node_class] = getattr(
+            self.visitor_class,
+            'visit_' + node_class.__name__,
+            self.visitor_class.generic_visit
+        )
+        return handler
+
+
 class NodeVisitor(object):
+    """ Node of the class `X` is visited by the method `visit_X`. Every visitor class registers
+    its methods in its own `dispatch` table when the class is created, so a visit is one lookup
+    keyed by the node class. """
+
+    def __init_subclass__(cls, **kwargs):
+        super(NodeVisitor, cls).__init_subclass__(**kwargs)
+        cls.dispatch = Dispatch(cls)
+        for node_class in node_classes():
+            cls.dispatch[node_class]
+
     def visit(self, node):
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        return self.dispatch[node.__class__](self, node)
 
     def generic_visit(self, node):
         raise Exception('No visit_{} method'.format(type(node).__name__))
 
+    def profile(self):
+        """ Count visits per node class name from now on, return the counter """
+        counts = collections.Counter()
+        visit = type(self).visit
+
+        def counting_visit(node):
+            counts[node.__class__.__name__] += 1
+            return visit(self, node)
+        self.visit = counting_visit
+        return counts
+
@@ -0,0 +1,164 @@
+""" SCI - Simple C Interpreter """
+import re
+import sys
+
+from .output import FormatError, stdout
+
+# Bytes of input read at once
+BLOCK_SIZE = 1 << 16
+
+# Result of getchar and scanf at the end of the input
+EOF = -1
+
+# Directive of a scanf format: conversion specification, whitespace or any other character matched literally
+DIRECTIVE = re.compile(r'%(?:hh|h|ll|l|L)?(.?)|(\s+)|(.)', re.S)
+
+# Conversions of scanf, by the conversion read
+CONVERSIONS = dict(d='d', i='i', f='f', e='f', g='f', c='c', s='s')
+
+# Whitespace, and a token followed by whitespace, which more input can not change
+SPACE = re.compile(rb'(\s*)')
+DELIMITED = re.compile(rb'\s*\S+\s')
+
+
+def integer(token):
+    """ Value of an integer read by %i, hexadecimal after 0x and octal after 0 as in C """
+    digits = token.lstrip(b'+-')
+    sign = -1 if token.startswith(b'-') else 1
+    if digits[:2] in (b'0x', b'0X'):
+        return sign * int(digits[2:], 16)
+    if len(digits) > 1 and digits.startswith(b'0'):
+        return sign * int(digits, 8)
+    return sign * int(digits)
+
+
+def string(token):
+    return token.decode('utf-8', 'replace')
+
+
+# Conversion -> pattern of the token after leading whitespace, function converting it
+TOKENS = dict(
+    d=(re.compile(rb'\s*([-+]?\d+)'), int),
+    i=(re.compile(rb'\s*([-+]?(?:0[xX][0-9a-fA-F]+|0[0-7]*|[1-9]\d*))'), integer),
+    f=(re.compile(rb'\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'), float),
+    s=(re.compile(rb'\s*(\S+)'), string),
+)
+
+
+def directives(fmt):
+    """ Parsed scanf format: a conversion letter, ' ' skipping whitespace or a byte matched literally """
+    parsed = []
+    for match in DIRECTIVE.finditer(fmt):
+        conversion, space, literal = match.groups()
+        if space is not None:
+            parsed.append(' ')
+        elif literal is not None or conversion == '%':
+            parsed.extend(bytes((byte, )) for byte in (literal or '%').encode('utf-8'))
+        elif conversion in CONVERSIONS:
+            parsed.append(CONVERSIONS[conversion])
+        else:
+            raise FormatError("Unsupported conversion '{}' in scanf format {!r}".format(match.group(), fmt))
+    return parsed
+
+
+class Input(object):
+    """ Standard input of the program, read in blocks of BLOCK_SIZE bytes and tokenized only as far
+    as `getchar` and `scanf` consume it. Both read from the same buffer. """
+
+    def __init__(self, source=None):
+        self.formats = dict()       # scanf format -> directives, number of conversions
+        self.open(source)
+
+    def open(self, source=None):
+        """ Read from the binary file object `source`, the standard input if None """
+        self.source = source
+        self.data = b''
+        self.position = 0
+        self.end = False            # the source is exhausted
+
+    def read(self):
+        """ Next block of the source, empty at its end """
+        if stdout.interactive:
+            # a prompt must be seen before the program waits for input
+            stdout.flush()
+        source = self.source
+        if source is None:
+            # sys.stdin is looked up now, it may be redirected
+            source = getattr(sys.stdin, 'buffer', sys.stdin)
+        read = getattr(source, 'read1', source.read)
+        block = read(BLOCK_SIZE)
+        return block.encode('utf-8') if isinstance(block, str) else block
+
+    def fill(self):
+        """ Append the next block to the unread data, False at the end of the input """
+        if self.end:
+            return False
+        block = self.read()
+        if not block:
+            self.end = True
+            return False
+        self.data = self.data[self.position:] + block
+        self.position = 0
+        return True
+
+    def match(self, pattern):
+        """ Consume the longest prefix of the unread data matching `pattern`, return its group, None if
+        no prefix matches """
+        match = pattern.match(self.data, self.position)
+        while match is None or match.end() == len(self.data):
+            # unless whitespace ends it, the token may go on in the next block
+            if match is None and DELIMITED.match(self.data, self.position) or not self.fill():
+                break
+            match = pattern.match(self.data, self.position)
+        if match is None:
+            return None
+        self.position = match.end()
+        return match.group(1)
+
+    def getchar(self):
+        if self.position == len(self.data) and not self.fill():
+            return EOF
+        char = self.data[self.position]
+        self.position += 1
+        return char
+
+    def scan(self, fmt, argc):
+        """ Values read by scanf format `fmt` for `argc` variables, up to the first directive the input
+        does not match; None if the input ends before the first conversion """
+        if fmt not in self.formats:
+            parsed = directives(fmt)
+            self.formats[fmt] = parsed, sum(directive in CONVERSIONS for directive in parsed)
+        parsed, count = self.formats[fmt]
+        if count != argc:
+            raise FormatError('scanf format {!r} takes {} arguments but {} were given'.format(fmt, count, argc))
+        values = []
+        for directive in parsed:
+            if directive in TOKENS:
+                pattern, convert = TOKENS[directive]
+                token = self.match(pattern)
+                if token is None:
+                    break
+                values.append(convert(token))
+            elif directive == ' ':
+                self.match(SPACE)
+            elif directive == 'c':
+                char = self.getchar()
+                if char == EOF:
+                    break
+                values.append(char)
+            else:
+                if self.position == len(self.data) and not self.fill():
+                    break
+                if self.data[self.position] != directive[0]:
+                    return values
+                self.position += 1
+        else:
+            return values
+        # the input ended before the first conversion
+        if not values and self.position == len(self.data) and self.end:
+            return None
+        return values
+
+
+# Input of scanf and getchar
+stdin = Input()
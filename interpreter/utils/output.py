@@ -0,0 +1,115 @@
+""" SCI - Simple C Interpreter """
+import re
+import sys
+
+# Characters of output kept before they are written to the sink
+BUFFER_SIZE = 1 << 16
+
+# Conversion specification of a printf format: flags, width, precision, length modifier and conversion
+SPECIFICATION = re.compile(r'%([-+ #0]*)(\*|\d+)?(?:\.(\*|\d*))?(?:hh|h|ll|l|L|z|j|t)?(.?)')
+
+# Conversions of printf meaning the same in Python `%` formatting
+CONVERSIONS = frozenset('diouxXeEfFgGcs')
+
+
+class FormatError(Exception):
+    pass
+
+
+class Output(object):
+    """ Buffered standard output of the program. Written text is kept until `size` characters are
+    buffered, a line ends on an interactive output or `flush` is called at the end of the program,
+    then it is encoded and written to the binary sink at once. """
+
+    def __init__(self, sink=None, size=BUFFER_SIZE, interactive=None):
+        self.parts = []
+        self.length = 0             # characters in parts
+        self.open(sink, size, interactive)
+
+    def open(self, sink=None, size=BUFFER_SIZE, interactive=None):
+        """ Write to the binary file object `sink`, the standard output if None. Output is interactive,
+        flushed at the end of every line, if `interactive` or, when it is None, if it is a terminal. """
+        self.flush()
+        self.sink = sink
+        self.size = size
+        if interactive is None:
+            isatty = getattr(sys.stdout if sink is None else sink, 'isatty', None)
+            interactive = isatty is not None and isatty()
+        self.interactive = interactive
+
+    def write(self, text):
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length >= self.size or self.interactive and '\n' in text:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        text = ''.join(self.parts)
+        self.parts, self.length = [], 0
+        if self.sink is not None:
+            self.sink.write(text.encode('utf-8'))
+            self.sink.flush()
+            return
+        # sys.stdout is looked up now, it may be redirected
+        stream = sys.stdout
+        buffer = getattr(stream, 'buffer', None)
+        if buffer is None:
+            stream.write(text)
+            return
+        stream.flush()
+        buffer.write(text.encode(stream.encoding or 'utf-8', stream.errors or 'strict'))
+        buffer.flush()
+
+
+# Output of printf
+stdout = Output()
+
+# (format, number of arguments) -> function printing them, see `printer`
+PRINTERS = dict()
+
+
+def translate(fmt):
+    """ Return C printf format translated to Python `%` formatting and the number of arguments it takes """
+    argc = 0
+
+    def specification(match):
+        nonlocal argc
+        flags, width, precision, conversion = match.groups()
+        if conversion == '%' and match.group() == '%%':
+            return '%%'
+        if conversion not in CONVERSIONS:
+            raise FormatError("Unsupported conversion '{}' in printf format {!r}".format(match.group(), fmt))
+        argc += 1 + (width == '*') + (precision == '*')
+        return '%{}{}{}{}'.format(flags, width or '', '' if precision is None else '.' + (precision or '0'), conversion)
+
+    return SPECIFICATION.sub(specification, fmt), argc
+
+
+def printer(fmt, argc):
+    """ Function writing its `argc` arguments formatted by C printf format `fmt` to `stdout`, which returns
+    the number of characters written. The format is translated and checked once, printers are cached. """
+    key = fmt, argc
+    if key in PRINTERS:
+        return PRINTERS[key]
+    text, count = translate(fmt)
+    if count != argc:
+        raise FormatError('printf format {!r} takes {} arguments but {} were given'.format(fmt, count, argc))
+    write = stdout.write
+    if not count:
+        text = text % ()
+        length = len(text)
+
+        def print_text():
+            write(text)
+            return length
+        function = print_text
+    else:
+        def print_format(*args):
+            message = text % args
+            write(message)
+            return len(message)
+        function = print_format
+    PRINTERS[key] = function
+    return function
@@ -0,0 +1,101 @@
+""" SCI - Simple C Interpreter """
+import importlib
+import importlib.util
+import os
+import sys
+
+# Package of the libraries shipped with the interpreter, `#include <name.h>` is its module `name`
+PACKAGE = 'interpreter.__builtins__'
+
+# Directories searched in order for `name.py` when the package has no library `name`: extension
+# libraries of the user, from the SCI_PATH environment variable and the -I option
+PATH = [directory for directory in os.environ.get('SCI_PATH', '').split(os.pathsep) if directory]
+
+# Package the modules of extension libraries are imported as, they are not on sys.path
+EXTENSIONS = 'sci_extensions'
+
+# Module name -> {name -> Signature} of the functions declared with `definition`
+DEFINITIONS = dict()
+
+# Library name -> Library, or None if there is no such library
+LIBRARIES = dict()
+
+
+class Signature(object):
+    """ Builtin `name` executed by the Python callable `function`, or by the one it names as 'module:attribute',
+    taking and returning plain int and float values of its C `arg_types` (None for any arguments) and
+    `return_type`. A `pure` builtin does no input or output. `specialize(literal, argc)`, if given, returns
+    the function of a call whose first argument is the string `literal`, taking the other `argc` arguments. """
+
+    def __init__(self, name, function, return_type, arg_types, pure=False, specialize=None):
+        self.name = name
+        self.native = function
+        self.return_type = return_type
+        self.arg_types = arg_types
+        self.pure = pure
+        self.specialize = specialize
+
+    @property
+    def function(self):
+        """ The callable, imported when first bound if given by reference as 'module:attribute' """
+        if isinstance(self.native, str):
+            module, _, attribute = self.native.partition(':')
+            self.native = getattr(importlib.import_module(module), attribute)
+        return self.native
+
+    def __repr__(self):
+        return '{} {}({})'.format(
+            self.return_type, self.name, '...' if self.arg_types is None else ', '.join(self.arg_types)
+        )
+
+
+def define(module, signature):
+    """ Record builtin in the library of the module """
+    DEFINITIONS.setdefault(module, dict())[signature.name] = signature
+
+
+class Library(object):
+    """ Signatures of the builtins of a header, by name """
+
+    def __init__(self, name, signatures):
+        self.name = name
+        self.signatures = signatures
+
+    def __iter__(self):
+        return iter(self.signatures.values())
+
+    def __getitem__(self, name):
+        return self.signatures[name]
+
+
+def extension(name):
+    """ Module name of the extension library `name` imported from PATH, None if there is none """
+    for directory in PATH:
+        path = os.path.join(directory, name + '.py')
+        if os.path.isfile(path):
+            module = '{}.{}'.format(EXTENSIONS, name)
+            spec = importlib.util.spec_from_file_location(module, path)
+            sys.modules[module] = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(sys.modules[module])
+            return module
+    return None
+
+
+def library(name):
+    """ Library of `#include <name.h>`, None if there is none. The module of the package, or else
+    the first `name.py` on PATH, is imported once per process, when the library is first included. """
+    if name not in LIBRARIES:
+        module = '{}.{}'.format(PACKAGE, name)
+        try:
+            importlib.import_module(module)
+        except ModuleNotFoundError as error:
+            if error.name != module:
+                raise
+            module = extension(name)
+        LIBRARIES[name] = None if module is None else Library(name, DEFINITIONS.get(module, dict()))
+    return LIBRARIES[name]
+
+
+def signatures(name):
+    """ Description of the library `name` which changes when a signature of it changes """
+    return tuple((repr(signature), signature.pure) for signature in library(name) or ())
@@ -1,41 +1,20 @@
-from functools import wraps
-import pickle
-import importlib
-
-def import_module(libname):
-    """ Function import module using string representation """
-    return importlib.import_module(libname)
-
-def get_functions(module):
-    """ Function returns all functions defined in some module """
-    lib = import_module(module)
-
-    for func_name in dir(lib):
-        func = getattr(lib, func_name)
-        if callable(func) and not func_name.startswith('__') and func.__module__.endswith(module):
-            yield func
-
-def restorable(fn):
-    """ Decorator reset object state after calling function """
-    @wraps(fn)
-    def wrapper(self, *args, **kwargs):
-        state = pickle.dumps(self.__dict__)
-        result = fn(self, *args, **kwargs)
-        self.__dict__ = pickle.loads(state)
-        return result
-    return wrapper
-
-
-def definition(return_type=None, arg_types=[]):
-    """ Decorator used for definition of builtin function """
-    def wrapper_decorator(fn):
-        @wraps(fn)
-        def wrapper(*args, **kwargs):
-            return fn(*args, **kwargs)
-        wrapper.return_type = return_type
-        wrapper.arg_types = arg_types
-        return wrapper
-    return wrapper_decorator
+from .registry import Signature, define
+
+
+def definition(return_type=None, arg_types=[], pure=False, native=None, specialize=None):
+    """ Decorator used for definition of builtin function, recording its `registry.Signature` in the
+    library of its module. `arg_types` None means any arguments, a `pure` function does no input or
+    output and its result depends only on its arguments. Engines convert the arguments to `arg_types`,
+    so the function gets and returns plain values of the C types and is called without a wrapper:
+    the `native` callable, e.g. a function of the math module, replaces it if given. A 'module:attribute'
+    string as `native` imports the module only when a call of the function is bound. """
+    def decorator(fn):
+        fn.return_type = return_type
+        fn.arg_types = arg_types
+        fn.pure = pure
+        define(fn.__module__, Signature(fn.__name__, native or fn, return_type, arg_types, pure, specialize))
+        return fn
+    return decorator
 
 
 def get_name(name):
@@ -0,0 +1,36 @@
+""" Helpers shared by the tests of the optimizations and of the engines """
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.optimization.optimizer import Optimizer
+from interpreter.interpreter.interpreter import ENGINES
+
+
+def analyze(text, level=0, verbose=False, report=None):
+    """ Tree of the program, analyzed and optimized at the optimization `level`. Warnings are discarded,
+    the report of the optimizations is written to the text stream `report` if given. """
+    tree = Parser(RegexLexer(text)).parse()
+    with redirect_stdout(io.StringIO()):
+        SemanticAnalyzer.analyze(tree)
+    with redirect_stdout(report or io.StringIO()):
+        return Optimizer.optimize(tree, level, verbose)
+
+
+def execute(tree, engine, memo=None):
+    """ Output of the analyzed program run by the engine named `engine` """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        ENGINES[engine](memo=memo).interpret(tree)
+    return output.getvalue()
+
+
+class EngineTestCase(unittest.TestCase):
+    def assertOutput(self, text, expected, levels=(0, 2)):
+        """ Every engine prints `expected` running the program optimized at every level of `levels` """
+        for level in levels:
+            for engine in ENGINES:
+                with self.subTest(level=level, engine=engine):
+                    self.assertEqual(execute(analyze(text, level), engine), expected)
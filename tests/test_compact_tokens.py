@@ -0,0 +1,52 @@
+import unittest
+
+from interpreter.lexical_analysis.token_type import *
+from interpreter.lexical_analysis.lexer import Lexer
+from interpreter.lexical_analysis.compact import CompactTokens
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.syntax_analysis.tree import *
+
+
+class CompactTokensTestCase(unittest.TestCase):
+    text = """
+        int a = 1;
+        int main(){
+            double b = 1.0;
+            a = a + 1;
+            return a;
+        }
+    """
+
+    def test_token_kinds(self):
+        self.assertEqual(TokenKind[ADD_OP].name, ADD_OP)
+        self.assertEqual(TokenKind(TokenKind[LT_OP]).name, LT_OP)
+        self.assertEqual(len(set(TokenKind)), len(TokenKind))
+
+    def test_same_stream(self):
+        tokens = CompactTokens.from_lexer(Lexer(self.text))
+        lexer = Lexer(self.text)
+        for i in range(len(tokens)):
+            token = lexer.get_next_token
+            self.assertEqual(tokens.kinds[i], TokenKind[token.type])
+            self.assertEqual((tokens[i].type, tokens[i].value), (token.type, token.value))
+            self.assertIs(type(tokens[i].value), type(token.value))
+            self.assertEqual(tokens.lines[i], lexer.line)
+        self.assertEqual(tokens[len(tokens) - 1].type, EOF)
+
+    def test_shared_values(self):
+        tokens = CompactTokens.from_lexer(Lexer(self.text))
+        identifiers = [i for i in range(len(tokens)) if tokens[i].type == ID and tokens[i].value == 'a']
+        self.assertEqual(len(identifiers), 4)
+        self.assertEqual(len({tokens.values[i] for i in identifiers}), 1)
+        self.assertLess(len(tokens.table), len(tokens))
+
+    def test_parser_reader(self):
+        reader = CompactTokens.from_lexer(Lexer(self.text)).reader()
+        tree = Parser(reader).parse()
+        self.assertIsInstance(tree.children[0], VarDecl)
+        self.assertIsInstance(tree.children[2], FunctionDecl)
+        self.assertEqual(reader.get_next_token.type, EOF)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.interpreter.interpreter import Interpreter, ENGINES
+from helpers import analyze
+
+
+class EnginesTestCase(unittest.TestCase):
+    """ Every engine must give the same results as the tree walker """
+
+    def execute(self, engine, text):
+        tree = Parser(RegexLexer(text)).parse()
+        SemanticAnalyzer.analyze(tree)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = engine().interpret(tree)
+        return status, output.getvalue()
+
+    def assertSameAsTree(self, text):
+        expected_status, expected_output = self.execute(Interpreter, text)
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                status, output = self.execute(engine, text)
+                self.assertEqual(output, expected_output)
+                self.assertEqual(repr(status), repr(expected_status))
+
+    def test_same_as_tree(self):
+        self.assertSameAsTree("""
+        #include <stdio.h>
+        int g = 7;
+        int reverse(int n){
+            int r = 0;
+            while(n > 0){
+                int k = n % 10;
+                n /= 10;
+                r = r * 10 + k;
+            }
+            return r;
+        }
+        int fact(int n){
+            int r = 1;
+            if(n > 1)
+                r = n * fact(n - 1);
+            return r;
+        }
+        int main(){
+            int i, j, s = 0;
+            double d = 2;
+            for(i = 0; i < 20; i++){
+                for(j = 0; j < 10; ++j){
+                    if(j >= i - 5 || (j == 0 && i == 1)){ s += 1; } else { s -= j % 3; }
+                }
+            }
+            d *= (float)s / 3;
+            g += fact(5);
+            ++g;
+            printf("%d %d %d %d %d\\n", s, reverse(12345), g--, -g, !s);
+            printf("%f %d %d\\n", d, (1 && 2) + 3, i++ + ++i);
+            return 0;
+        }
+        """)
+
+    def test_operators(self):
+        self.assertSameAsTree("""
+        #include <stdio.h>
+        int main(){
+            int a = 5, b = -17, c = 12;
+            double d = 2.5;
+            a <<= 3;
+            b >>= 2;
+            c %= 5;
+            c |= 8;
+            c &= 14;
+            c ^= 3;
+            d *= -(double)a;
+            printf("%d %d %d %d %d %d ", a, b, c, 1 << 10, -100 >> 3, (a & 7) | (b ^ c));
+            printf("%f %d %d %d", d, +a, -c, !c);
+            return a % 7;
+        }
+        """)
+
+    def test_control_flow(self):
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                self.assertControlFlow(engine)
+
+    def test_nested_jumps(self):
+        self.assertSameAsTree("""
+        #include <stdio.h>
+        int fib(int n){
+            if(n < 2)
+                return n;
+            return fib(n - 1) + fib(n - 2);
+        }
+        int find(int n){
+            int i, j;
+            for(i = 1; i < 10; i++){
+                j = 0;
+                while(1){
+                    j++;
+                    if(j > i)
+                        break;
+                    if(i * j == n)
+                        return i * 10 + j;
+                }
+            }
+            return -1;
+        }
+        int main(){
+            int i, s = 0;
+            for(i = 0; i < 30; i++){
+                if(i % 3 == 0)
+                    continue;
+                if(i > 20)
+                    break;
+                s += i;
+            }
+            printf("%d %d %d %d", s, fib(15), find(12), find(97));
+            return find(9);
+        }
+        """)
+
+    def assertControlFlow(self, engine):
+        status, output = self.execute(engine, """
+        #include <stdio.h>
+        int sign(int a){
+            if(a < 0){
+                return -1;
+            }
+            return a > 0 ? 1 : 0;
+        }
+        int main(){
+            int i = 0, s = 0;
+            do {
+                i++;
+                if(i % 2 == 0)
+                    continue;
+                if(i > 9)
+                    break;
+                s += i;
+            } while(1);
+            printf("%d %d %d %d", s, sign(-5), sign(0), sign(3));
+            return 0;
+        }
+        """)
+        self.assertEqual(output, '25 -1 0 1')
+        self.assertEqual(status, 0)
+
+    def test_c_arithmetic(self):
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                status, output = self.execute(engine, """
+                #include <stdio.h>
+                double half(double x){
+                    return x / 2;
+                }
+                int truncate(double x){
+                    return x;
+                }
+                int main(){
+                    int a = 7.9;
+                    double d = 7;
+                    char c = 'a';
+                    a -= 0.5;
+                    printf("%d %f %f %d ", a, d / 2, half(5), truncate(-2.5));
+                    printf("%d %d %d %d %d", -7 / 2, -7 % 2, 7 % -2, (5 && 2) + (0 || 3), c + 1);
+                    return a;
+                }
+                """)
+                self.assertEqual(output, '6 3.500000 2.500000 -2 -3 -1 1 2 98')
+                self.assertEqual(repr(status), '6')
+
+    def test_main_status(self):
+        # the returned value is converted to the return type of main
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                status, _ = self.execute(engine, 'int main(){ double d = 2.5; return d; }')
+                self.assertEqual(repr(status), '2')
+
+    def test_truth_values(self):
+        # comparisons and ! give int 1 or 0, not a Python bool, whether or not they are folded
+        for text, expected in (
+                ('return a < b;', 1), ('return !a;', 0), ('int x = a == 2; return x;', 1),
+                ('return a > b ? 4 : !b;', 0), ('return a != b && !(a >= b);', 1)):
+            for level in (0, 2):
+                for name, engine in ENGINES.items():
+                    with self.subTest(text=text, level=level, engine=name):
+                        tree = analyze('int main(){ int a = 2, b = 3; %s }' % text, level)
+                        with redirect_stdout(io.StringIO()):
+                            status = engine().interpret(tree)
+                        self.assertEqual(repr(status), repr(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
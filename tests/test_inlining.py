@@ -0,0 +1,116 @@
+import io
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+from interpreter.syntax_analysis.tree import *
+from interpreter.optimization.inlining import Inliner
+from helpers import EngineTestCase, analyze
+
+
+class InlinerTestCase(EngineTestCase):
+    def analyze(self, text, level=None, verbose=False):
+        self.output = io.StringIO()
+        if level is not None:
+            return analyze(text, level, verbose, self.output)
+        tree = analyze(text)
+        with redirect_stdout(self.output):
+            return Inliner(verbose).visit(tree)
+
+    def calls(self, tree):
+        """ Names of the functions main calls """
+        return sorted(node.name for node in walk(tree.children[-1]) if isinstance(node, FunctionCall))
+
+    def test_inline(self):
+        tree = self.analyze("""
+        int min(int a, int b){ if(a < b) return a; return b; }
+        int clamp(int v){ int low = min(v, 10); return low > 0 ? low : 0; }
+        int main(int x){ return clamp(x) + min(x, 2); }
+        """)
+        self.assertEqual(self.calls(tree), [])
+        main = tree.children[-1]
+        # every call has its own parameters and locals
+        declared = [child.var_node.slot for child in main.body.children if isinstance(child, VarDecl)]
+        self.assertEqual(sorted(declared), list(range(1, 7)))
+        self.assertEqual(main.frame_size, 7)
+
+    def test_not_inlined(self):
+        tree = self.analyze("""
+        int g;
+        int fact(int n){ return n > 1 ? n * fact(n - 1) : 1; }
+        int loop(int n){ while(n > 0) n = n - 2; return n; }
+        int big(int n){ return n * n * n * n * n * n * n * n * n * n + n * n * n * n * n * n * n * n * n * n * n * n; }
+        int main(int x){ return fact(x) + loop(x) + big(x); }
+        """)
+        self.assertEqual(self.calls(tree), ['big', 'fact', 'loop'])
+
+    def test_if_chain(self):
+        # every if translates the rest of the function twice, the budget must stop that early
+        chain = 'if(a > 0) a = a - 1; '
+        text = """
+        #include <stdio.h>
+        int f(int a){ %s return a; }
+        int main(){ int a = 250; %s printf("%%d", f(a)); return 0; }
+        """ % (chain * 20, chain * 200)
+        sequence, calls = Inliner.sequence, []
+
+        def counted(inliner, *args):
+            calls.append(args)
+            if len(calls) > 100:
+                raise AssertionError('sequence called {} times'.format(len(calls)))
+            return sequence(inliner, *args)
+
+        with mock.patch.object(Inliner, 'sequence', counted):
+            tree = self.analyze(text, 2)
+        # f is over the budget, main is called by no function
+        self.assertEqual(self.calls(tree), ['f', 'printf'])
+        self.assertOutput(text, '30')
+
+    def test_report(self):
+        self.analyze('int sq(int x){ return x * x; } int main(int x){ return sq(x); }', verbose=True)
+        self.assertIn('Inlined `sq(x)` in `main` at line 1', self.output.getvalue())
+
+    def test_side_effects(self):
+        # the inlined call is a comma expression assigning cnt, which must stay in the loop
+        text = """
+        #include <stdio.h>
+        int cnt = 0;
+        int side(){ cnt = cnt + 1; return 3; }
+        int twice(int x){ printf("%d ", x); return x * 2; }
+        int main(){
+            int i, s = 0;
+            for(i = 0; i < 4; i++) s += side() * 2 + twice(5);
+            printf("%d %d", s, cnt);
+            return 0;
+        }
+        """
+        self.assertEqual(self.calls(self.analyze(text, 2, verbose=True)), ['printf', 'printf'])
+        self.assertNotIn('Hoisted', self.output.getvalue())
+        self.assertOutput(text, '5 5 5 5 64 4')
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int g = 0;
+        int sq(int x){ return x * x; }
+        int min(int a, int b){ if(a < b) return a; return b; }
+        int half(double d){ g++; return d / 2; }
+        double scale(int a){ int t = a; t = t * 3; return t / 2.0; }
+        void show(int v){ printf("%d ", v); }
+        int main(){
+            int i, s = 0;
+            double d = 0;
+            for(i = 0; i < 50; i++){
+                s = s + min(sq(i % 7), min(i, 30)) + half(i + 0.5);
+                d = d + scale(min(i, 9));
+            }
+            show(s);
+            show(min(min(3, 2), min(5, 4)));
+            printf("%.1f %d", d, g);
+            return 0;
+        }
+        """
+        self.assertEqual(self.calls(self.analyze(text, 2)), ['printf', 'printf', 'printf'])
+        self.assertOutput(text, '1077 2 607.5 50')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.interpreter.interpreter import ENGINES
+from interpreter.utils.input import EOF, Input, directives, stdin
+from interpreter.utils.output import FormatError
+
+
+class Chunks(object):
+    """ Source returning a few bytes per read, so tokens are split between blocks """
+
+    def __init__(self, data, size=3):
+        self.data = data
+        self.size = size
+
+    def read(self, size):
+        block, self.data = self.data[:self.size], self.data[self.size:]
+        return block
+
+
+class InputTestCase(unittest.TestCase):
+    def test_directives(self):
+        self.assertEqual(directives('%d %lf,%c%%%s%i'), ['d', ' ', 'f', b',', 'c', b'%', 's', 'i'])
+        with self.assertRaises(FormatError):
+            directives('%p')
+
+    def test_scan(self):
+        source = Input(Chunks(b'  12345 -67\n3.25e1,x0x1F 010 word\nrest'))
+        self.assertEqual(source.scan('%d%d', 2), [12345, -67])
+        self.assertEqual(source.scan('%lf,%c%i %i', 4), [32.5, ord('x'), 31, 8])
+        self.assertEqual(source.scan('%s', 1), ['word'])
+        self.assertEqual(source.getchar(), ord('\n'))
+        self.assertEqual(source.scan('%s', 1), ['rest'])
+        self.assertIsNone(source.scan('%d', 1))
+        self.assertEqual(source.getchar(), EOF)
+        with self.assertRaises(FormatError):
+            source.scan('%d', 2)
+
+    def test_mismatch(self):
+        source = Input(io.BytesIO(b'7 x 8'))
+        self.assertEqual(source.scan('%d %d', 2), [7])
+        self.assertEqual(source.getchar(), ord('x'))
+        self.assertEqual(source.scan('%d', 1), [8])
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int main(){
+            int n, i, x, s = 0;
+            char c;
+            scanf("%d", &n);
+            for(i = 0; i < n; i++){
+                scanf("%d", &x);
+                s += x;
+            }
+            getchar();
+            c = getchar();
+            printf("%d %c %d %d", s, c, scanf("%d", &x), x);
+            return 0;
+        }
+        """
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                tree = Parser(RegexLexer(text)).parse()
+                SemanticAnalyzer.analyze(tree)
+                stdin.open(io.BytesIO(b'4\n1 2\n3 -4\nz'))
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    engine().interpret(tree)
+                stdin.open()
+                self.assertEqual(output.getvalue(), '2 z -1 -4')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import io
+import unittest
+from interpreter.lexical_analysis.token_type import *
+from interpreter.syntax_analysis.tree import *
+from helpers import EngineTestCase, analyze
+
+
+class LoopOptimizerTestCase(EngineTestCase):
+    def analyze(self, text, level=2, verbose=False):
+        self.output = io.StringIO()
+        return analyze(text, level, verbose, self.output)
+
+    def main(self, text, verbose=False):
+        """ Statements of main optimized at level 2 """
+        program = 'int g = 3, h; int f(){ h = 1; return 0; } int main(int a, int b){ %s }'
+        return self.analyze(program % text, verbose=verbose).children[-1].body.children
+
+    def hoisted(self, statements):
+        """ Assignments of temporaries in front of the loop """
+        return [
+            node.right for node in walk(CompoundStmt(statements, 0))
+            if isinstance(node, Assign) and node.op.type == ASSIGN and node.left.value == 'cse'
+        ]
+
+    def test_writes(self):
+        tree = self.analyze("""
+        int g, h, k;
+        int f(int a){ g = a; return 0; }
+        int e(){ k++; return f(1); }
+        int main(){ int x; h = 1; x = e(); return x; }
+        """, level=0)
+        f, e, main = (child for child in tree.children if isinstance(child, FunctionDecl))
+        self.assertEqual(f.writes, {0})
+        self.assertEqual(e.writes, {0, 2})
+        self.assertEqual(main.writes, {0, 1, 2})
+        self.assertEqual(main.calls, {'e'})
+
+    def test_hoist(self):
+        value, = self.hoisted(self.main('int s = 0; while(s < 100) s = s + a * b; return s;'))
+        self.assertEqual(value.op.type, MUL_OP)
+        # the largest invariant expression, globals no call of the loop assigns
+        value, = self.hoisted(self.main('int s = 0, i; for(i = 0; i < 9; i++) s = s + (a + g) * b + f(); return s;'))
+        self.assertEqual(value.op.type, MUL_OP)
+        self.assertEqual(value.left.op.type, ADD_OP)
+
+    def test_not_hoisted(self):
+        # assigned in the loop, or by a function it calls
+        self.assertEqual(self.hoisted(self.main('int s = 0; while(s < 100){ s = s + g * b; g++; } return s;')), [])
+        self.assertEqual(self.hoisted(self.main('int s = 0; while(s < 100){ s = s + h * b + f(); } return s;')), [])
+        # the loop may never divide by zero
+        self.assertEqual(self.hoisted(self.main('int s = 0; while(s < a) s = s + 100 / b; return s;')), [])
+        # the variable may never be assigned
+        self.assertEqual(self.hoisted(self.main('int s = 0, x; while(s < a) s = s + x * b; return s;')), [])
+
+    def test_side_effects(self):
+        # the comma expression is invariant by its value, but prints, assigns or calls in every iteration
+        for statement in ('s += (f(), 4) * 2;', 's += (g = g + 1, 3) * 2;', 's += (g++, 3) * 2;'):
+            with self.subTest(statement=statement):
+                self.assertEqual(self.hoisted(self.main('int s = 0, i; for(i = 0; i < 3; i++) ' + statement)), [])
+        # a pure invariant expression inside it still moves
+        value, = self.hoisted(self.main('int s = 0, i; for(i = 0; i < 3; i++) s += (g = g + 1, a * b);'))
+        self.assertEqual(value.op.type, MUL_OP)
+        self.assertOutput("""
+        #include <stdio.h>
+        int cnt = 0;
+        int main(){
+            int i, s = 0;
+            for(i = 0; i < 3; i++){
+                s += (printf("hi "), 4) * 2;
+                s += (cnt = cnt + 1, 3) * 2;
+            }
+            printf("%d %d", s, cnt);
+            return 0;
+        }
+        """, 'hi hi hi 42 3')
+
+    def test_strength_reduction(self):
+        statements = self.main(
+            'int s = 0, i; for(i = 0; i < a; i += 2){ s = s + i * 6; if(i * 6 > b) s++; } return s;', True
+        )
+        self.assertEqual(len(self.hoisted(statements)), 1)
+        self.assertFalse([
+            node for node in walk(CompoundStmt(statements, 0)) if isinstance(node, BinOp) and node.op.type == MUL_OP
+        ])
+        self.assertIn('Reduced 2 x `i * 6` to additions', self.output.getvalue())
+        # one multiplication replaced by one addition does not pay
+        statements = self.main('int s = 0, i; for(i = 0; i < a; i++) s = s + i * 6; return s;', True)
+        self.assertEqual(self.hoisted(statements), [])
+        self.assertNotIn('Reduced', self.output.getvalue())
+
+    def test_report(self):
+        self.main('int s = 0; while(s < 100) s = s + a * b; return s;', True)
+        self.assertIn('Hoisted `a * b` out of the loop at line 1', self.output.getvalue())
+        self.main('int s = 0; while(s < 100) s = s + a * b; return s;')
+        self.assertNotIn('Hoisted', self.output.getvalue())
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int g = 2, n = 7;
+        int f(int k){ g = g + k; return g; }
+        int main(){
+            int i, j, s = 0, t = 0;
+            for(i = 0; i < 40; i += 3){
+                j = 0;
+                while(j < n){
+                    s = s + i * 5 + (n * g) % 11 + j * 4;
+                    if(j * 4 > i * 5) t = t + j * 4 - n / 2;
+                    j++;
+                }
+                if(i % 9 == 0) f(1);
+            }
+            printf("%d %d %d", s, t, g);
+            return 0;
+        }
+        """
+        self.assertOutput(text, '11354 117 7')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import io
+import math
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.interpreter.interpreter import ENGINES
+from interpreter.interpreter.bytecode import bind
+from interpreter.syntax_analysis.tree import FunctionCall, walk
+from interpreter.utils.registry import library
+from interpreter.__builtins__ import math as cmath
+
+
+class MathTestCase(unittest.TestCase):
+    def analyze(self, text):
+        tree = Parser(RegexLexer(text)).parse()
+        with redirect_stdout(io.StringIO()):
+            SemanticAnalyzer.analyze(tree)
+        return tree
+
+    def test_signatures(self):
+        self.assertIs(library('math')['sin'].function, math.sin)
+        self.assertIs(library('math')['floor'].function, cmath.floor)
+        self.assertEqual(repr(library('math')['ldexp']), 'double ldexp(double, int)')
+        self.assertTrue(all(signature.pure for signature in library('math')))
+
+    def test_functions(self):
+        self.assertEqual(cmath.floor(-2.5), -3.0)
+        self.assertIsInstance(cmath.ceil(2.1), float)
+        self.assertEqual(cmath.round(2.5), 3.0)
+        self.assertEqual(cmath.round(-2.5), -3.0)
+        self.assertEqual(cmath.round(0.49999999999999994), 0.0)
+        self.assertEqual(cmath.fmin(float('nan'), 1.0), 1.0)
+        self.assertEqual(cmath.fmax(1.0, float('nan')), 1.0)
+        self.assertEqual(cmath.fdim(1.0, 3.0), 0.0)
+        self.assertAlmostEqual(cmath.cbrt(-27.0), -3.0)
+
+    def test_bind(self):
+        tree = self.analyze("""
+        #include <math.h>
+        int main(){
+            int n = 2;
+            double x = 0.5;
+            x = pow(n, x) + ldexp(x, n);
+            return 0;
+        }
+        """)
+        calls = {node.name: node for node in walk(tree) if isinstance(node, FunctionCall)}
+        function, args, conversions = bind(library('math')['pow'], calls['pow'])
+        self.assertIs(function, math.pow)
+        self.assertEqual(len(args), 2)
+        # only the int argument is converted to double
+        self.assertIsNotNone(conversions[0])
+        self.assertIsNone(conversions[1])
+        self.assertEqual(conversions[0](3), 3.0)
+        self.assertEqual(bind(library('math')['ldexp'], calls['ldexp'])[2], [None, None])
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        #include <math.h>
+        int main(){
+            int i, n = 3;
+            double s = 0.0;
+            for(i = 1; i < 50; i++){
+                s = s + sqrt(i) * sin(i) + pow(i % 7, 2) - fabs(cos(s)) + floor(i / 3.0) - fmin(i, 5);
+            }
+            printf("%.6f %.1f %.1f %.1f %.1f %.4f %.4f %d", s, round(2.5), round(-2.5), trunc(-2.7),
+                   ceil(n / 2), atan2(1, n), ldexp(1.5, n), (int)fmod(17, 5));
+            return 0;
+        }
+        """
+        outputs = dict()
+        for name, engine in ENGINES.items():
+            tree = self.analyze(text)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                engine().interpret(tree)
+            outputs[name] = output.getvalue()
+        self.assertEqual(set(outputs.values()), {outputs['tree']}, outputs)
+        self.assertTrue(outputs['tree'].endswith(' 3.0 -3.0 -2.0 1.0 0.3218 12.0000 2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
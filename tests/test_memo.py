@@ -0,0 +1,67 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.syntax_analysis.tree import FunctionDecl
+from interpreter.interpreter.interpreter import Interpreter, ENGINES
+from interpreter.interpreter.memo import Cache, Memo, MISSING
+from helpers import analyze, execute
+
+
+class MemoTestCase(unittest.TestCase):
+    def test_purity(self):
+        tree = analyze("""
+        #include <stdio.h>
+        #include <math.h>
+        int constant = 3, counter = 0;
+        int fib(int n){ return n < 2 ? n : fib(n - 1) + fib(n - 2); }
+        double root(double x){ int k = constant; return sqrt(x) * k + fib(3); }
+        int count(){ counter++; return counter; }
+        int total(int n){ return n + counter; }
+        int print(int n){ printf("%d", n); return n; }
+        int indirect(int n){ return print(n) + fib(n); }
+        int main(){ return count(); }
+        """)
+        pure = {child.func_name: child.pure for child in tree.children if isinstance(child, FunctionDecl)}
+        self.assertEqual(pure, dict(
+            fib=True, root=True, count=False, total=False, print=False, indirect=False, main=False
+        ))
+
+    def test_cache(self):
+        cache = Cache('f', 2)
+        cache.put((1, ), 10)
+        cache.put((2, ), 20)
+        self.assertEqual(cache.get((1, )), 10)
+        cache.put((3, ), 30)
+        # (2, ) was used least recently
+        self.assertIs(cache.get((2, )), MISSING)
+        self.assertEqual(cache.get((3, )), 30)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int calls = 0;
+        int fib(int n){ return n < 2 ? n : fib(n - 1) + fib(n - 2); }
+        int counted(int n){ calls++; return n; }
+        int main(){
+            printf("%d %d %d", fib(40), counted(1) + counted(1), calls);
+            return 0;
+        }
+        """
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                memo = Memo(100)
+                self.assertEqual(execute(analyze(text), engine, memo), '102334155 2 2')
+                self.assertEqual(list(memo.caches), ['fib'])
+                self.assertEqual((memo.caches['fib'].hits, memo.caches['fib'].misses), (38, 41))
+
+    def test_report(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Interpreter.run('int sq(int n){ return n * n; } int main(){ return sq(2) + sq(2); }', 'vm', memo_size=10)
+        self.assertIn('Memoization of sq: 1 hits, 1 misses, 1 results kept', output.getvalue())
+        self.assertIn('status 8', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
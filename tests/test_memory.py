@@ -1,31 +1,46 @@
 import unittest
-from interpreter.interpreter.memory import Memory
+from interpreter.interpreter.memory import Memory, StackOverflowError
+from interpreter.semantic_analysis.table import GLOBAL_FRAME, LOCAL_FRAME
 
 class TestMemory(unittest.TestCase):
 
     def test_memory(self):
-        memory = Memory()
-        memory.declare('a')
-        memory['a'] = 1
-        memory.declare('b')
-        memory['b'] = 2
-        memory['a'] = 3
-        memory.declare('z')
-        memory['z'] = 3
-        memory.new_frame('main')
-        memory.declare('a')
-        memory['a'] = 1
-        memory['b'] = 2
-        memory['a'] = 3
-        memory.new_scope()
-        memory.declare('a')
-        memory['a'] = 2
-        memory.new_frame('test')
-        memory.declare('a')
-        memory['a'] = 2
+        memory = Memory(3)
+        memory[GLOBAL_FRAME, 0] = 1
+        memory[GLOBAL_FRAME, 1] = 2
+        memory[GLOBAL_FRAME, 0] = 3
+        memory[GLOBAL_FRAME, 2] = 3
+        values = memory.new_frame('main', 2)
+        values[0] = 1
+        memory[LOCAL_FRAME, 1] = 2
+        memory[LOCAL_FRAME, 0] = 3
+        self.assertEqual(memory[GLOBAL_FRAME, 0], 3)
+        self.assertEqual(memory[LOCAL_FRAME, 0], 3)
+        memory.new_frame('test', 1)
+        memory[LOCAL_FRAME, 0] = 2
+        self.assertEqual(memory[LOCAL_FRAME, 0], 2)
+        memory.del_frame()
+        self.assertEqual(memory[LOCAL_FRAME, 0], 3)
+        self.assertEqual(memory[LOCAL_FRAME, 1], 2)
+        memory[GLOBAL_FRAME, 2] = 5
+        self.assertEqual(memory[GLOBAL_FRAME, 2], 5)
         memory.del_frame()
-        memory.del_scope()
-        memory['s'] = 5
-        print(memory['z'])
+        self.assertIs(memory.frames[LOCAL_FRAME], memory.global_frame.values)
         print(memory)
 
+    def test_recursion(self):
+        memory = Memory()
+        for depth in range(3):
+            memory.new_frame('f', 1)[0] = depth
+        for depth in reversed(range(3)):
+            self.assertEqual(memory[LOCAL_FRAME, 0], depth)
+            memory.del_frame()
+
+    def test_stack_size(self):
+        memory = Memory(stack_size=10)
+        memory.new_frame('f', 4)
+        memory.new_frame('f', 4)
+        with self.assertRaises(StackOverflowError):
+            memory.new_frame('f', 0)
+        memory.del_frame()
+        memory.new_frame('f', 4)
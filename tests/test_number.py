@@ -0,0 +1,39 @@
+import unittest
+from interpreter.interpreter.number import *
+
+
+class TestNumber(unittest.TestCase):
+
+    def test_divide(self):
+        self.assertEqual(divide(7, 2), 3)
+        self.assertEqual(divide(-7, 2), -3)
+        self.assertEqual(divide(7, -2), -3)
+        self.assertEqual(divide(-8, 2), -4)
+        self.assertEqual(divide(7.0, 2), 3.5)
+
+    def test_modulo(self):
+        self.assertEqual(modulo(7, 3), 1)
+        self.assertEqual(modulo(-7, 3), -1)
+        self.assertEqual(modulo(7, -3), 1)
+        self.assertRaises(TypeError, modulo, 7.5, 2)
+
+    def test_conversion(self):
+        self.assertEqual(promote('char', 'int'), 'int')
+        self.assertEqual(promote('double', 'int'), 'double')
+        self.assertIsNone(conversion('int', 'char'))
+        self.assertIsNone(conversion('void', 'int'))
+        self.assertIsNone(conversion('int', None))
+        self.assertIs(conversion('int', 'double'), int)
+        self.assertIs(conversion('float', 'int'), float)
+
+    def test_specialized_operators(self):
+        self.assertIs(OPERATORS[DIV_OP, 'int', 'char'], int_divide)
+        self.assertIs(OPERATORS[MOD_OP, 'int', 'int'], int_modulo)
+        self.assertEqual(OPERATORS[DIV_OP, 'double', 'int'](7.0, 2), 3.5)
+        self.assertEqual(OPERATORS[DIV_OP, None, 'int'](-7, 2), -3)
+        self.assertEqual(OPERATORS[ADD_OP, 'int', 'int'](2, 3), 5)
+        self.assertRaises(TypeError, OPERATORS[MOD_OP, 'float', 'int'], 7.5, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.lexical_analysis.token_type import *
+from interpreter.syntax_analysis.tree import *
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.optimization.optimizer import Optimizer
+from interpreter.interpreter.interpreter import ENGINES
+
+
+class OptimizationTestCase(unittest.TestCase):
+    def optimize(self, text, level):
+        tree = Parser(RegexLexer(text)).parse()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            SemanticAnalyzer.analyze(tree)
+            tree = Optimizer.optimize(tree, level)
+        return tree, output.getvalue()
+
+    def body(self, text, level=2):
+        """ Statements of main, assigning globals keeps them alive """
+        tree, _ = self.optimize('int x; double d; int main(){ %s }' % text, level)
+        return tree.children[-1].body.children
+
+    def test_folding(self):
+        statement, = self.body('x = (2 + 3) * 4 - -(7 / 2) + (int)2.5;', level=1)
+        self.assertIsInstance(statement.right, Num)
+        self.assertEqual(statement.right.value, 25)
+        statement, = self.body('d = 1 + 0.5 * 3;', level=1)
+        self.assertEqual(statement.right.value, 2.5)
+        self.assertEqual(statement.right.ctype, 'float')
+        statement, = self.body('x = 1 < 2 && (0 || 3);', level=1)
+        self.assertEqual(statement.right.value, 1)
+        # error is left to the execution
+        statement, = self.body('x = 1 / 0;', level=1)
+        self.assertIsInstance(statement.right, BinOp)
+
+    def test_simplification(self):
+        first, second, third = self.body('x = x * 1 + 0; d = x + 0.0; if(!!(x < 3)) x = 0;')
+        self.assertIsInstance(first.right, Var)
+        # the identity would turn the double into an int
+        self.assertIsInstance(second.right, BinOp)
+        self.assertIsInstance(third.condition, BinOp)
+        self.assertEqual(third.condition.op.type, LT_OP)
+
+    def test_pruning(self):
+        statement, = self.body('if(1 > 2) x = 1; else x = 2; if(0) x = 3;')
+        self.assertEqual(statement.right.value, 2)
+        statement, = self.body('x = 2 - 1 ? 5 : x;')
+        self.assertEqual(statement.right.value, 5)
+        self.assertEqual(self.body('if(0) x = 3;', level=1)[0].condition.value, 0)
+
+    def test_report(self):
+        _, report = self.optimize('int main(){ return (1 + 2); }', 1)
+        self.assertIn('Optimization -O1: 10 -> 6 nodes (4 removed)', report)
+        # inlining adds the nodes of the body
+        _, report = self.optimize('int f(int x, int y){ if(x < y) return x; return y; } '
+                                  'int main(int a, int b){ return f(a, b) + f(b, a); }', 2)
+        self.assertIn('Optimization -O2: 40 -> 42 nodes (2 added)', report)
+        _, report = self.optimize('int main(){ return (1 + 2); }', 0)
+        self.assertEqual(report, '')
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int main(){
+            int i, s = 0;
+            for(i = 0; i < 10 * 2; i++){
+                if(!!(i % 3 == 0) && 1)
+                    s += i * 1 + (2 - 2);
+                else if(0)
+                    s = -1;
+            }
+            printf("%d %d %f", s, -7 / 2 + 0, (double)(1 + 2) / 2);
+            return 0;
+        }
+        """
+        for name, engine in ENGINES.items():
+            for level in (0, 1, 2):
+                with self.subTest(engine=name, level=level):
+                    tree, _ = self.optimize(text, level)
+                    output = io.StringIO()
+                    with redirect_stdout(output):
+                        engine().interpret(tree)
+                    self.assertEqual(output.getvalue(), '63 -3 1.500000')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.interpreter.interpreter import Interpreter, ENGINES
+from interpreter.utils.output import FormatError, Output, printer, stdout, translate
+
+
+class OutputTestCase(unittest.TestCase):
+    def test_buffer(self):
+        sink = io.BytesIO()
+        output = Output(sink, size=8)
+        output.write('abc')
+        output.write('\n')
+        self.assertEqual(sink.getvalue(), b'')
+        output.write('defgh')
+        self.assertEqual(sink.getvalue(), b'abc\ndefgh')
+        output.write('ij')
+        output.flush()
+        self.assertEqual(sink.getvalue(), b'abc\ndefghij')
+
+    def test_interactive(self):
+        sink = io.BytesIO()
+        output = Output(sink, interactive=True)
+        output.write('a')
+        self.assertEqual(sink.getvalue(), b'')
+        output.write('b\n')
+        self.assertEqual(sink.getvalue(), b'ab\n')
+
+    def test_translate(self):
+        self.assertEqual(translate('%d %5.2lf %ld %c%%'), ('%d %5.2f %d %c%%', 4))
+        self.assertEqual(translate('%-*.*s %.f'), ('%-*.*s %.0f', 4))
+        with self.assertRaises(FormatError):
+            translate('%p')
+        with self.assertRaises(FormatError):
+            translate('100%')
+        with self.assertRaises(FormatError):
+            printer('%d %d', 1)
+        self.assertIs(printer('%d items', 1), printer('%d items', 1))
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int main(){
+            int i, n = 0;
+            double d = 2.5;
+            for(i = 0; i < 3; i++)
+                n += printf("%d:%c ", i, 'a' + i);
+            printf("%5.2lf|%-4ld|%%|%x\\n", d, 42, 255);
+            return n;
+        }
+        """
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                tree = Parser(RegexLexer(text)).parse()
+                SemanticAnalyzer.analyze(tree)
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    status = engine().interpret(tree)
+                self.assertEqual(output.getvalue(), '0:a 1:b 2:c  2.50|42  |%|ff\n')
+                self.assertEqual(status, 12)
+
+    def test_sink(self):
+        sink = io.BytesIO()
+        messages = io.StringIO()
+        with redirect_stdout(messages):
+            Interpreter.run('#include <stdio.h>\nint main(){ printf("%d\\n", 7); return 0; }', output=sink)
+        stdout.open()
+        self.assertEqual(sink.getvalue(), b'7\n')
+        self.assertIn('status 0', messages.getvalue())
+        self.assertNotIn('7', messages.getvalue())
+
+    def test_format_error(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Interpreter.run('#include <stdio.h>\nint main(){ printf("%d %d", 7); return 0; }', 'vm')
+        self.assertIn('[FormatError]', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
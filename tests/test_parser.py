@@ -1,4 +1,5 @@
 import unittest
+from interpreter.lexical_analysis.token_type import *
 from interpreter.lexical_analysis.lexer import Lexer
 from interpreter.syntax_analysis.parser import Parser
 from interpreter.syntax_analysis.parser import SyntaxError
@@ -122,3 +123,45 @@ class ParserTestCase(unittest.TestCase):
         """)
         parser.parse()
 
+
+    def test_lookahead(self):
+        parser = self.makeParser("""
+            int a;
+            int main(){
+                a = (int)2.5 + (a);
+            }
+        """)
+        self.assertEqual(parser.peek(2).type, SEMICOLON)
+        self.assertEqual(parser.current_token.type, INT)
+        tree = parser.parse()
+        self.assertIsInstance(tree.children[0], VarDecl)
+        self.assertIsInstance(tree.children[1], FunctionDecl)
+        assign = tree.children[1].body.children[0].children[0]
+        self.assertIsInstance(assign, Assign)
+        self.assertIsInstance(assign.right.left, UnOp)
+        self.assertEqual(assign.right.left.op.type, INT)
+
+    def test_operator_precedence(self):
+        parser = self.makeParser("""
+            int main(){
+                a = b || c && d << 1 + 2 * 3;
+                a = b ? c : d ? e : f;
+                a = b - c - d;
+            }
+        """)
+        body = parser.parse().children[0].body.children
+        expr = body[0].children[0].right
+        self.assertEqual(expr.op.type, LOG_OR_OP)
+        self.assertEqual(expr.right.op.type, LOG_AND_OP)
+        self.assertEqual(expr.right.right.op.type, LEFT_OP)
+        self.assertEqual(expr.right.right.right.op.type, ADD_OP)
+        self.assertEqual(expr.right.right.right.right.op.type, MUL_OP)
+
+        expr = body[1].children[0].right
+        self.assertIsInstance(expr, TerOp)
+        self.assertIsInstance(expr.fexpression, TerOp)
+
+        expr = body[2].children[0].right
+        self.assertEqual(expr.op.type, SUB_OP)
+        self.assertEqual(expr.left.op.type, SUB_OP)
+        self.assertIsInstance(expr.right, Var)
@@ -0,0 +1,64 @@
+import glob
+import unittest
+
+from interpreter.lexical_analysis.token_type import *
+from interpreter.lexical_analysis.lexer import Lexer, LexicalError
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+
+
+class RegexLexerTestCase(unittest.TestCase):
+
+    def check_list(self, *args, lexer=None):
+        for token_type in args:
+            token = lexer.get_next_token
+            self.assertEqual(token.type, token_type)
+        token = lexer.get_next_token
+        self.assertEqual(token.type, EOF)
+
+    def test_longest_match(self):
+        lexer = RegexLexer('<<= << <= < >>= >> >= > ++ += + && &= & || |= |')
+        self.check_list(
+            LEFT_ASSIGN, LEFT_OP, LE_OP, LT_OP, RIGHT_ASSIGN, RIGHT_OP, GE_OP, GT_OP,
+            INC_OP, ADD_ASSIGN, ADD_OP, LOG_AND_OP, AND_ASSIGN, AND_OP, LOG_OR_OP, OR_ASSIGN, OR_OP,
+            lexer=lexer
+        )
+
+    def test_reserved_words(self):
+        lexer = RegexLexer('if iff else for while int integer')
+        self.check_list(
+            IF, ID, ELSE, FOR, WHILE, INT, ID,
+            lexer=lexer
+        )
+
+    def test_constants(self):
+        lexer = RegexLexer('12 12.5 \'a\' \'\\n\' "a\\nb"')
+        values = [lexer.get_next_token.value for _ in range(5)]
+        self.assertEqual(values, [12, 12.5, ord('a'), ord('\n'), 'a\nb'])
+
+    def test_line_tracking(self):
+        lexer = RegexLexer('a // comment\n b /* multi\n line */ c\n\n d')
+        lines = []
+        for _ in range(4):
+            lexer.get_next_token
+            lines.append(lexer.line)
+        self.assertEqual(lines, [1, 2, 3, 5])
+
+    def test_errors(self):
+        for text in ('/* unterminated', '"unterminated', '\'ab\'', '$'):
+            with self.assertRaises(LexicalError):
+                RegexLexer(text).get_next_token
+
+    def test_same_stream_as_lexer(self):
+        for fname in sorted(glob.glob('example*.c')):
+            text = open(fname, 'r').read()
+            lexer, regex_lexer = Lexer(text), RegexLexer(text)
+            while True:
+                expected, token = lexer.get_next_token, regex_lexer.get_next_token
+                self.assertEqual((token.type, token.value), (expected.type, expected.value))
+                self.assertEqual(regex_lexer.line, lexer.line)
+                if token.type == EOF:
+                    break
+
+
+if __name__ == '__main__':
+    unittest.main()
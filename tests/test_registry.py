@@ -0,0 +1,126 @@
+import io
+import math
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer, SemanticError
+from interpreter.interpreter.interpreter import ENGINES
+from interpreter.interpreter.transpiler import PythonInterpreter, Transpiler
+from interpreter.utils import registry
+from interpreter.utils.registry import Signature, library
+from interpreter.__builtins__ import stdio
+
+
+class RegistryTestCase(unittest.TestCase):
+    def analyze(self, text):
+        tree = Parser(RegexLexer(text)).parse()
+        with redirect_stdout(io.StringIO()):
+            SemanticAnalyzer.analyze(tree)
+        return tree
+
+    def test_library(self):
+        self.assertIs(library('stdio'), library('stdio'))
+        self.assertEqual(sorted(signature.name for signature in library('stdio')), ['getchar', 'printf', 'scanf'])
+        # the builtin is the function of the module, not a wrapper
+        self.assertIs(library('stdio')['printf'].function, stdio.printf)
+        self.assertEqual(repr(library('stdio')['getchar']), 'char getchar()')
+        self.assertIsNone(library('nonexistent'))
+
+    def test_unknown_library(self):
+        with self.assertRaises(SemanticError):
+            self.analyze('#include <nonexistent.h>\nint main(){ return 0; }')
+
+    def test_bound_builtins(self):
+        code = Transpiler().transpile(self.analyze("""
+        #include <stdio.h>
+        #include <math.h>
+        int main(){ printf("%d", getchar()); return 0; }
+        """))
+        self.assertIn("getchar_b = _builtin('stdio', 'getchar')", code)
+        self.assertIn("_site0 = _specialize('stdio', 'printf', '%d', 1)", code)
+        self.assertNotIn('printf_b', code)
+        self.assertNotIn('scanf_b', code)
+        self.assertNotIn('sqrt_b', code)
+
+    def test_lazy_native(self):
+        signature = Signature('fabs', 'math:fabs', 'double', ['double'])
+        self.assertEqual(signature.native, 'math:fabs')
+        self.assertIs(signature.function, math.fabs)
+        self.assertIs(signature.native, math.fabs)
+
+
+EXTENSION = """
+from interpreter.utils.utils import definition
+
+
+@definition(return_type='int', arg_types=['int', 'int'], pure=True)
+def mix(a, b):
+    return (a * 31 + b) % 1000003
+
+
+@definition(return_type='double', arg_types=['double'], pure=True, native='math:floor')
+def whole(a):
+    pass
+"""
+
+
+class ExtensionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, 'hashing.py'), 'w') as file:
+            file.write(EXTENSION)
+        registry.PATH.insert(0, self.directory.name)
+        registry.LIBRARIES.pop('hashing', None)
+
+    def tearDown(self):
+        registry.PATH.remove(self.directory.name)
+        registry.LIBRARIES.pop('hashing', None)
+        self.directory.cleanup()
+
+    def test_library(self):
+        self.assertEqual(sorted(signature.name for signature in library('hashing')), ['mix', 'whole'])
+        self.assertEqual(repr(library('hashing')['mix']), 'int mix(int, int)')
+        self.assertIs(library('hashing')['whole'].function, math.floor)
+        # the shipped libraries come first
+        self.assertIs(library('stdio')['printf'].function, stdio.printf)
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        #include <hashing.h>
+        int main(){
+            int i, h = 0;
+            for(i = 0; i < 100; i++){
+                h = mix(h, i);
+            }
+            printf("%d %d", h, (int)whole(2.5));
+            return 0;
+        }
+        """
+        expected = 0
+        for i in range(100):
+            expected = (expected * 31 + i) % 1000003
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                tree = Parser(RegexLexer(text)).parse()
+                SemanticAnalyzer.analyze(tree)
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    engine().interpret(tree)
+                self.assertEqual(output.getvalue(), '{} 2'.format(expected))
+
+    def test_changed_signature(self):
+        text = '#include <hashing.h>\nint main(){ return mix(1, 2); }'
+        with tempfile.TemporaryDirectory() as cache:
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(repr(PythonInterpreter(cache).run_cached(text)), '33')
+                library('hashing')['mix'].arg_types = ['double', 'int']
+                # the cached program converted the arguments for the old signature
+                self.assertEqual(repr(PythonInterpreter(cache).run_cached(text)), '33.0')
+
+
+if __name__ == '__main__':
+    unittest.main()
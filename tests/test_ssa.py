@@ -0,0 +1,127 @@
+import unittest
+from interpreter.syntax_analysis.tree import *
+from interpreter.optimization.ir import Function, PHI, PARAM, STORE, READ
+from helpers import EngineTestCase, analyze
+
+
+class SSATestCase(EngineTestCase):
+    def function(self, text):
+        function = Function(analyze(text).children[-1])
+        function.ssa()
+        return function
+
+    def reads(self, function, name):
+        """ Definitions reaching the reads of the variable """
+        return [
+            instr.value.resolve() for instr in function.instrs
+            if instr.value.kind == READ and instr.node.value == name
+        ]
+
+    def main(self, text):
+        """ Statements of main optimized at level 2 """
+        return analyze('int g; int main(int a, int b){ %s }' % text, level=2).children[-1].body.children
+
+    def test_phi(self):
+        function = self.function("""
+        int main(int a){
+            int x = 1;
+            if(a) x = 2;
+            while(a) a = a - 1;
+            return x + a;
+        }""")
+        x, = self.reads(function, 'x')
+        self.assertEqual(x.kind, PHI)
+        self.assertEqual({operand.resolve().kind for operand in x.operands}, {STORE})
+        # loop phi of the parameter
+        condition, body, result = self.reads(function, 'a')[1:]
+        self.assertIs(condition, body)
+        self.assertIs(condition, result)
+        self.assertEqual(condition.kind, PHI)
+        self.assertEqual(condition.operands[0].resolve().kind, PARAM)
+
+    def test_trivial_phi(self):
+        function = self.function('int main(int a){ int x = a; while(a) a = a - 1; return x; }')
+        x, = self.reads(function, 'x')
+        self.assertEqual(x.kind, STORE)
+
+    def test_unreachable(self):
+        statements = self.main('g = 1; return g; g = 2;')
+        self.assertEqual(len(statements), 2)
+        loop, = self.main('while(1){ g = g + 1; break; g = 0; }')
+        self.assertEqual(len(loop.body.children), 2)
+
+    def test_dead_stores(self):
+        statements = self.main('int x = a * 2; x = 3; int y = g; g = y; return b;')
+        self.assertEqual([type(node) for node in statements], [VarDecl, VarDecl, Assign, Assign, ReturnStmt])
+        # calls have side effects, loops need their counters; f has a loop, so it is not inlined
+        tree = analyze(
+            'int g; int f(){ while(g > 9) g--; return g; } int main(int a){ int x = f(); int i; for(i = 0; i < a; i++) g = g + 1; }',
+            level=2
+        )
+        statements = tree.children[-1].body.children
+        self.assertIsInstance(statements[1].right, FunctionCall)
+        self.assertIsInstance(statements[3], ForStmt)
+
+    def test_common_subexpressions(self):
+        # x holds the value, y becomes a copy of x and is propagated
+        *_, result = self.main('int x = (a + b) * a; g = 1; int y = (a + b) * a; return x + y;')
+        self.assertEqual([result.expression.left.value, result.expression.right.value], ['x', 'x'])
+        # x changes in between, a temporary keeps the value
+        temp, _, x, _, _, g, _ = self.main('int x = (a + b) * a; g = x; x = g; g = (a + b) * a; return x;')
+        self.assertEqual(temp.var_node.value, 'cse')
+        self.assertIsInstance(x.right, Assign)
+        self.assertEqual(x.right.left.slot, temp.var_node.slot)
+        self.assertIsInstance(g.right, Var)
+        self.assertEqual(g.right.slot, temp.var_node.slot)
+
+    def test_side_effects(self):
+        # equal values, but both comma expressions assign g
+        statements = self.main('int x = (g = g + 1, 3) * a; int y = (g = g + 1, 3) * a; return x + y;')
+        self.assertEqual(len([
+            node for node in walk(CompoundStmt(statements, 0))
+            if isinstance(node, Assign) and node.left.value == 'g'
+        ]), 2)
+        self.assertOutput("""
+        #include <stdio.h>
+        int cnt = 0;
+        int main(){
+            int s = (cnt = cnt + 1, 3) * 2 + (cnt = cnt + 1, 3) * 2;
+            s = s + (printf("x"), 4) * 2 + (printf("x"), 4) * 2;
+            printf(" %d %d", s, cnt);
+            return 0;
+        }
+        """, 'xx 28 2')
+
+    def test_copies(self):
+        *_, result = self.main('int x = 5; int y = x; int z = a; return y + z;')
+        self.assertIsInstance(result.expression.left, Num)
+        self.assertEqual(result.expression.left.value, 5)
+        self.assertEqual(result.expression.right.value, 'a')
+        # z no longer holds the value of a
+        *_, result = self.main('int z = a; a = g; return z + a;')
+        self.assertEqual(result.expression.left.value, 'z')
+
+    def test_engines(self):
+        text = """
+        #include <stdio.h>
+        int g = 2;
+        int f(int n){ g = g + n; return g; }
+        int main(){
+            int i = 0, j, s = 0, t, k = 4;
+            while(i < 30){
+                t = (i + k) * (i - 1);
+                j = t;
+                s = s + j % 7 + (i + k) * (i - 1) % 5;
+                i++;
+            }
+            t = g * 2;
+            f(1);
+            printf("%d %d %d %d %d", s, i, t, g * 2, k > 3 ? k * k : 0);
+            return 0;
+            printf("unreachable");
+        }
+        """
+        self.assertOutput(text, '107 30 4 6 16')
+
+if __name__ == '__main__':
+    unittest.main()
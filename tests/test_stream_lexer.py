@@ -0,0 +1,56 @@
+import glob
+import io
+import mmap
+import tempfile
+import unittest
+
+from interpreter.lexical_analysis.token_type import *
+from interpreter.lexical_analysis.lexer import LexicalError
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.lexical_analysis.stream_lexer import StreamLexer
+
+
+class StreamLexerTestCase(unittest.TestCase):
+
+    def stream(self, lexer):
+        result = []
+        while True:
+            token = lexer.get_next_token
+            result.append((token.type, token.value, lexer.line))
+            if token.type == EOF:
+                return result
+
+    def test_same_stream_as_regex_lexer(self):
+        for fname in sorted(glob.glob('example*.c')):
+            text = open(fname, 'r').read()
+            expected = self.stream(RegexLexer(text))
+            for chunk_size in (1, 2, 7, 64, 1 << 16):
+                with open(fname, 'r') as file:
+                    self.assertEqual(self.stream(StreamLexer(file, chunk_size=chunk_size)), expected)
+
+    def test_binary_input(self):
+        text = 'int main(){ printf("ščć\\n"); /* ž */ return 0; }'
+        expected = self.stream(RegexLexer(text))
+        for chunk_size in (1, 3, 5):
+            source = io.BytesIO(text.encode('utf-8'))
+            self.assertEqual(self.stream(StreamLexer(source, chunk_size=chunk_size)), expected)
+
+    def test_mmap_input(self):
+        text = 'int a = 1;\n// comment\nint main(){\n    return a <<= 2;\n}\n'
+        with tempfile.TemporaryFile() as file:
+            file.write(text.encode('utf-8'))
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                tokens = self.stream(StreamLexer(source, chunk_size=4))
+        self.assertEqual(tokens, self.stream(RegexLexer(text)))
+
+    def test_errors(self):
+        for text in ('a /* unterminated', 'a "unterminated', 'a $'):
+            lexer = StreamLexer(io.StringIO(text), chunk_size=2)
+            lexer.get_next_token
+            with self.assertRaises(LexicalError):
+                lexer.get_next_token
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from interpreter.interpreter import transpiler
+from interpreter.interpreter.transpiler import PythonInterpreter
+
+PROGRAM = """
+#include <stdio.h>
+int main(){
+    int a, i;
+    double d = 7;
+    scanf("%d", &a);
+    for(i = 0; i < 5; i++){
+        if(i == 2)
+            continue;
+        a += i;
+    }
+    d /= 2;
+    a *= 1.5;
+    printf("%d %d %f %d %d", a, 7 / 2, d, -7 / 2, 7 % 3);
+    return 0;
+}
+"""
+
+
+class TranspilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache.cleanup)
+
+    def run_cached(self, text, stdin=''):
+        output = io.StringIO()
+        with mock.patch.object(sys, 'stdin', io.StringIO(stdin)), redirect_stdout(output):
+            status = PythonInterpreter(self.cache.name).run_cached(text)
+        return status, output.getvalue()
+
+    def test_program(self):
+        status, output = self.run_cached(PROGRAM, '3\n')
+        # values are converted to the type of the variable, division truncates
+        self.assertTrue(output.endswith('16 3 3.500000 -3 1'), output)
+        self.assertEqual(status, 0)
+
+    def test_cache(self):
+        expected = self.run_cached(PROGRAM, '3\n')
+        # cached program is not parsed again
+        with mock.patch.object(transpiler, 'Parser', side_effect=AssertionError('parsed')):
+            self.assertEqual(repr(self.run_cached(PROGRAM, '3\n')), repr(expected))
+            self.assertRaises(AssertionError, self.run_cached, PROGRAM + ' ', '3\n')
+            # code generated by another version may call a different runtime
+            with mock.patch.object(transpiler, 'VERSION', transpiler.VERSION + 1):
+                self.assertRaises(AssertionError, self.run_cached, PROGRAM, '3\n')
+
+    def test_cached_warnings(self):
+        text = 'int main(){ int a; a = 1.5; return a; }'
+        first = self.run_cached(text)
+        self.assertIn('Incompatible types', first[1])
+        self.assertEqual(repr(self.run_cached(text)), repr(first))
+
+
+if __name__ == '__main__':
+    unittest.main()
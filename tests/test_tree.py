@@ -0,0 +1,42 @@
+import unittest
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.syntax_analysis.tree import *
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+
+
+class CountingVisitor(NodeVisitor):
+    def visit_Program(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_FunctionDecl(self, node):
+        return node.func_name
+
+
+class NodeVisitorTestCase(unittest.TestCase):
+    def makeTree(self, text):
+        return Parser(RegexLexer(text)).parse()
+
+    def test_dispatch(self):
+        self.assertIs(CountingVisitor.dispatch[Program], CountingVisitor.visit_Program)
+        self.assertIs(CountingVisitor.dispatch[Num], NodeVisitor.generic_visit)
+        self.assertIsNot(CountingVisitor.dispatch, SemanticAnalyzer.dispatch)
+        tree = self.makeTree('int main(){ return 0; }')
+        self.assertEqual(CountingVisitor().visit(tree.children[0]), 'main')
+        self.assertRaises(Exception, CountingVisitor().visit, NoOp(1))
+
+    def test_profile(self):
+        tree = self.makeTree('int a; int main(){ a = 1 + 2; return a; }')
+        analyzer = SemanticAnalyzer()
+        counts = analyzer.profile()
+        analyzer.visit(tree)
+        self.assertEqual(counts['Program'], 1)
+        self.assertEqual(counts['Num'], 2)
+        self.assertEqual(counts['Var'], 2)
+        # typed nodes are still annotated when counting
+        self.assertEqual(tree.children[1].body.children[0].children[0].ctype, 'int')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from interpreter.lexical_analysis.regex_lexer import RegexLexer
+from interpreter.syntax_analysis.parser import Parser
+from interpreter.semantic_analysis.analyzer import SemanticAnalyzer
+from interpreter.interpreter.vm import VirtualMachine
+from interpreter.interpreter.memory import StackOverflowError
+from interpreter.interpreter.bytecode import Compiler, BINARY_LOCAL_CONST, INPLACE_LOCAL_CONST, CALL, TAIL_CALL
+
+
+class VirtualMachineTestCase(unittest.TestCase):
+    def execute(self, engine, text):
+        tree = Parser(RegexLexer(text)).parse()
+        SemanticAnalyzer.analyze(tree)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            status = engine().interpret(tree)
+        return status, output.getvalue()
+
+    def analyze(self, text):
+        tree = Parser(RegexLexer(text)).parse()
+        SemanticAnalyzer.analyze(tree)
+        return tree
+
+    def compile(self, text):
+        tree = Parser(RegexLexer(text)).parse()
+        SemanticAnalyzer.analyze(tree)
+        compiler = Compiler()
+        compiler.compile(tree)
+        return compiler.functions
+
+    def test_superinstructions(self):
+        main = self.compile("""
+        int main(){
+            int i, s = 0;
+            for(i = 0; i < 10; i++){
+                s += i;
+            }
+            return s;
+        }
+        """)['main']
+        self.assertIn(INPLACE_LOCAL_CONST, main.ops)
+        self.assertIn(BINARY_LOCAL_CONST, main.ops)
+
+        # `c` is a jump target of &&, so it must not be fused with `b`
+        main = self.compile("""
+        int main(){
+            int a = 1, b = 0, c = 5;
+            return (a && b) + c;
+        }
+        """)['main']
+        self.assertNotIn(BINARY_LOCAL_CONST, main.ops)
+        status, _ = self.execute(VirtualMachine, """
+        int main(){
+            int a = 1, b = 0, c = 5;
+            return (a && b) + c;
+        }
+        """)
+        self.assertEqual(status, 5)
+
+    def test_deep_recursion(self):
+        # far deeper than the Python stack allows
+        status, _ = self.execute(VirtualMachine, """
+        int depth(int n){ if(n == 0) return 0; return 1 + depth(n - 1); }
+        int main(){ return depth(100000) - 99990; }
+        """)
+        self.assertEqual(status, 10)
+
+    def test_tail_calls(self):
+        text = """
+        int sum(int n, int acc){ if(n == 0) return acc; return sum(n - 1, acc + n); }
+        double half(int n){ return n / 2.0; }
+        int rounded(int n){ return half(n); }
+        int main(){ return sum(100000, 0) % 1000 + rounded(5); }
+        """
+        functions = self.compile(text)
+        self.assertIn(TAIL_CALL, functions['sum'].ops)
+        self.assertNotIn(CALL, functions['sum'].ops)
+        # the result must be converted, the call is not a tail call
+        self.assertNotIn(TAIL_CALL, functions['rounded'].ops)
+        # tail calls reuse the stack, a few frames suffice
+        status = VirtualMachine(stack_size=20).interpret(self.analyze(text))
+        self.assertEqual(status, 2)
+
+    def test_stack_overflow(self):
+        tree = self.analyze('int f(int n){ return 1 + f(n + 1); } int main(){ return f(0); }')
+        with self.assertRaises(StackOverflowError):
+            VirtualMachine(stack_size=1000).interpret(tree)
+
+
+if __name__ == '__main__':
+    unittest.main()